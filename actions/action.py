@@ -1,7 +1,12 @@
 """
 Defines the action module for Coup. This module contains classes and functions related to player actions. 
+The cost, claim and blockers of every action come from the rule table in game/rules.py.
+Legality can be queried before anything changes: Action.can_execute, and get_legal_actions, get_legal_targets,
+get_legal_blockers and get_legal_blocks for the moves open to a player. Executing an illegal action still raises,
+but only as a broken invariant, never as the way to find out whether a move is legal.
 """
-from exceptions.game_exceptions import *
+from exceptions.game_exceptions import NotEnoughCoinsError, InvalidTargetError, InsufficientCoinsToStealError, DeckEmptyException, TargetNeeded
+from game.rules import ACTION_RULES, get_action_arguments
 
 class Action:
     """Initialises the parent action class. Contains all the necessary variables needed for actions"""
@@ -16,12 +21,31 @@ class Action:
         self.required_card = required_card
         self.needs_target = needs_target
 
+    def check(self):
+        """Returns the exception class of the first rule the action would break if executed now, or None. Only reads the game"""
+        if not self.player.can_lose_coins(self.coins_needed):
+            return NotEnoughCoinsError
+        if self.needs_target and self.target is None:
+            return TargetNeeded
+        if self.target is not None and not self.is_legal_target(self.target):
+            return InvalidTargetError
+        return None
+
+    def is_legal_target(self, target):
+        """Whether the action can target the player: an opponent still in the game"""
+        return target is not self.player and not target.is_eliminated
+
+    def can_execute(self):
+        """Whether the action can be executed now"""
+        return self.check() is None
+
     def execute(self):
-        """Checks if the action can be executed by performing checks. Raises error if it cannot perform the action"""
-        if self.player.get_coins() < self.coins_needed:
-            raise NotEnoughCoinsError(f"Need at least {self.coins_needed} coins to perform {self.action_name}.")
-        if self.target is not None and self.target.is_eliminated:
-            raise InvalidTargetError("Selected target is already eliminated!")
+        """Checks that the action can be executed. Raises the error of the rule it breaks if it cannot, which callers avoid by asking can_execute first"""
+        error = self.check()
+        if error is NotEnoughCoinsError:
+            raise NotEnoughCoinsError(self.coins_needed, f"Need at least {self.coins_needed} coins to perform {self.action_name}.")
+        if error is not None:
+            raise error()
 
     def perform_action(self):
         """Performs the action"""
@@ -30,7 +54,7 @@ class Action:
 class Income(Action):
     """Income action which makes a player gain 1 coin"""
     def __init__(self, game, player):
-        super().__init__(game, player, action_name='Income')
+        super().__init__(game, player, **get_action_arguments('Income'))
 
     def perform_action(self):
         super().execute()
@@ -39,8 +63,8 @@ class Income(Action):
 class ForeignAid(Action):
     """Foreign Aid action which allows a  player to gain 2 coins. Can be blocked by Duke"""
     def __init__(self, game, player):
-        super().__init__(game, player, is_blockable=True, action_name='Foreign Aid')
-        self.can_block = ["Duke"]
+        super().__init__(game, player, **get_action_arguments('Foreign Aid'))
+        self.can_block = list(ACTION_RULES['Foreign Aid']['can_block'])
 
     def perform_action(self):
         super().execute()
@@ -49,7 +73,7 @@ class ForeignAid(Action):
 class Coup(Action):
     """Coup action which requires 7 coins and will eliminate a valid target"""
     def __init__(self, game, player, target):
-        super().__init__(game, player, target, coins_needed=7, action_name='Coup', needs_target=True)
+        super().__init__(game, player, target, **get_action_arguments('Coup'))
 
     def perform_action(self):
         super().execute()
@@ -59,7 +83,7 @@ class Coup(Action):
 class Tax(Action): #is blockable false
     """Tax action which allows a player to gain 3 coins by claiming Duke"""
     def __init__(self, game, player):
-        super().__init__(game, player, requires_influence=True, action_name='Tax', required_card="Duke")
+        super().__init__(game, player, **get_action_arguments('Tax'))
 
     def perform_action(self):
         super().execute()
@@ -68,8 +92,8 @@ class Tax(Action): #is blockable false
 class Assassinate(Action):
     """Assassinate action which allows a player to assassinate a valid target, paying a fee of 3 coins. It can be blocked by Contessa"""
     def __init__(self, game, player, target):
-        super().__init__(game, player, target, coins_needed=3, requires_influence=True, is_blockable=True, action_name='Assassinate', required_card='Assassin', needs_target=True)
-        self.can_block = ["Contessa"]
+        super().__init__(game, player, target, **get_action_arguments('Assassinate'))
+        self.can_block = list(ACTION_RULES['Assassinate']['can_block'])
 
     def perform_action(self):
         super().execute()
@@ -79,16 +103,19 @@ class Assassinate(Action):
 class Steal(Action):
     """Steal action which allows a player to steal 2 coins from a valid target. Can be blocked by Captain or Ambassador"""
     def __init__(self, game, player, target):
-        super().__init__(game, player, target, is_blockable=True, requires_influence=True, action_name='Steal', required_card="Captain", needs_target=True)
-        self.can_block = ["Captain", "Ambassador"]
+        super().__init__(game, player, target, **get_action_arguments('Steal'))
+        self.can_block = list(ACTION_RULES['Steal']['can_block'])
+
+    def check(self):
+        error = super().check()
+        if error is None and self.target.get_coins() == 0:
+            return InsufficientCoinsToStealError
+        return error
 
     def perform_action(self):
         super().execute()
 
         target_coins = self.target.get_coins()
-        if target_coins == 0:
-            raise InsufficientCoinsToStealError("Target has no coins to steal from.")
-
         if target_coins >= 2:
             stolen_coins = 2
         else:  
@@ -101,11 +128,16 @@ class Steal(Action):
 class Exchange(Action):
     """Exchange action which allows a player to draw upto 2 cards from the deck and return upto 2 cards back to the deck."""
     def __init__(self, game, player):
-        super().__init__(game, player, requires_influence=True, action_name='Exchange', required_card="Ambassador")
+        super().__init__(game, player, **get_action_arguments('Exchange'))
+
+    def check(self):
+        error = super().check()
+        if error is None and not self.game.deck.cards:
+            return DeckEmptyException
+        return error
 
     def perform_action(self):
-        if len(self.game.deck.cards) < 1:
-            raise DeckEmptyException("Not enough cards in the deck to perform an exchange.")
+        super().execute()
 
         if len(self.game.deck.cards) == 1:
             drawn_cards = [self.game.deck.draw_card()]
@@ -122,4 +154,47 @@ class Contessa(Action): #is blockable false
         super().__init__(game, player, requires_influence=True, action_name='Contessa', required_card="Contessa")
 
     def perform_action(self):
-        super().execute()
\ No newline at end of file
+        super().execute()
+
+ACTION_CLASSES = {"Income": Income, "Foreign Aid": ForeignAid, "Coup": Coup, "Tax": Tax,
+                  "Assassinate": Assassinate, "Steal": Steal, "Exchange": Exchange}
+
+def get_opponents(game, player):
+    """The player's opponents still in the game, in seat order"""
+    return [other for other in game.players if other is not player and not other.is_eliminated]
+
+def get_legal_targets(game, player, action_name):
+    """The players the action can target now, in seat order: the opponents still in the game, those with coins for Steal"""
+    rules = ACTION_RULES[action_name]
+    if not rules["needs_target"]:
+        return []
+    return [other for other in get_opponents(game, player) if not rules["steal"] or other.get_coins() > 0]
+
+def get_legal_actions(game, player):
+    """The (action name, target) pairs the player can take now, in the order of ACTION_RULES as SimulationState.get_legal_actions"""
+    coins = player.get_coins()
+    legal_actions = []
+    for action_name, rules in ACTION_RULES.items():
+        if coins < rules["coins_needed"]:
+            continue
+        if rules["needs_target"]:
+            legal_actions.extend((action_name, target) for target in get_legal_targets(game, player, action_name))
+        elif not rules["exchange"] or game.deck.cards:
+            legal_actions.append((action_name, None))
+    return legal_actions
+
+def get_legal_blockers(game, action):
+    """The players who can block the action: every opponent for Foreign Aid, the target for the other blockable actions"""
+    if not action.is_blockable:
+        return []
+    if not action.needs_target:
+        return get_opponents(game, action.player)
+    if action.target is None or action.target.is_eliminated:
+        return []
+    return [action.target]
+
+def get_legal_blocks(game, action, blocker):
+    """The cards the blocker can claim to block the action, none if they cannot block it"""
+    if blocker not in get_legal_blockers(game, action):
+        return []
+    return list(ACTION_RULES[action.action_name]["can_block"])
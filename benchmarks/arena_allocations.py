@@ -0,0 +1,57 @@
+"""
+Compares the allocations of building a new table for every game (setup_ai_game) with resetting a
+GameArena in place, using tracemalloc. Reports the memory blocks allocated while preparing each game
+and the memory still held after the game.
+"""
+import contextlib
+import os
+import tracemalloc
+
+from game.arena import GameArena
+from main import setup_ai_game
+from players.registry import create_ai_player
+
+AI_TYPES = ["3", "4", "3", "4"]
+
+def count_new_blocks(before, after):
+    """Number of memory blocks allocated between the two snapshots and still alive"""
+    return sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+def measure(prepare_game, num_games):
+    """Returns the average blocks allocated to prepare a game and the average memory growth per game in bytes"""
+    setup_blocks = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        prepare_game().play_game()  # Warm up caches and imports
+        tracemalloc.start()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        for _ in range(num_games):
+            before = tracemalloc.take_snapshot()
+            game = prepare_game()
+            after = tracemalloc.take_snapshot()
+            setup_blocks += count_new_blocks(before, after)
+            game.play_game()
+        growth = tracemalloc.get_traced_memory()[0] - start_memory
+        tracemalloc.stop()
+    return setup_blocks / num_games, growth / num_games
+
+def main(num_games=50):
+    fresh_blocks, fresh_growth = measure(lambda: setup_ai_game(len(AI_TYPES), AI_TYPES), num_games)
+
+    arena = GameArena([create_ai_player(ai_type, seat=i + 1) for i, ai_type in enumerate(AI_TYPES)])
+    arena_state = {"first": True}
+
+    def prepare_arena_game():
+        if arena_state["first"]:
+            arena.game.setup()
+            arena_state["first"] = False
+        else:
+            arena.game.reset()
+        arena.game.setup_ai_players()
+        return arena.game
+
+    arena_blocks, arena_growth = measure(prepare_arena_game, num_games)
+    print(f"New table per game: {fresh_blocks:.0f} blocks allocated per setup, {fresh_growth:.0f} bytes retained per game")
+    print(f"Reused arena:       {arena_blocks:.0f} blocks allocated per setup, {arena_growth:.0f} bytes retained per game")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compares two ways of finding out which moves are legal, on the positions of random games played by the full Game:
+executing every candidate (action, target) and catching the GameException of an illegal one, which is how a
+move had to be probed before, and asking Action.can_execute or get_legal_actions (actions/action.py), which only
+read the game. Both must agree on every position.
+"""
+import argparse
+import contextlib
+import os
+import time
+
+from actions.action import ACTION_CLASSES, get_legal_actions
+from exceptions.game_exceptions import GameException
+from game.rules import ACTION_RULES
+from main import setup_ai_arena
+
+def get_candidates(game, player):
+    """Every (action name, target) the player could ask for: each targeted action against every other seat"""
+    candidates = []
+    for action_name, rules in ACTION_RULES.items():
+        if rules["needs_target"]:
+            candidates.extend((action_name, other) for other in game.players if other is not player)
+        else:
+            candidates.append((action_name, None))
+    return candidates
+
+def build_action(game, player, action_name, target):
+    if ACTION_RULES[action_name]["needs_target"]:
+        return ACTION_CLASSES[action_name](game, player, target)
+    return ACTION_CLASSES[action_name](game, player)
+
+def probe_by_exception(game, player, candidates):
+    """The legal candidates, found by executing each and catching the error of the illegal ones"""
+    legal_actions = []
+    for action_name, target in candidates:
+        try:
+            build_action(game, player, action_name, target).execute()
+        except GameException:
+            continue
+        legal_actions.append((action_name, target))
+    return legal_actions
+
+def probe_by_query(game, player, candidates):
+    """The legal candidates, found by asking each whether it can execute"""
+    return [(action_name, target) for action_name, target in candidates if build_action(game, player, action_name, target).can_execute()]
+
+class ProbeTimer:
+    """Probes every position both ways as it is played, timing each style and counting where they disagree"""
+    def __init__(self, game, repeats):
+        self.game = game
+        self.repeats = repeats
+        self.positions = 0
+        self.candidates = 0
+        self.legal = 0
+        self.mismatches = 0
+        self.exception_time = 0.0
+        self.query_time = 0.0
+        self.legal_actions_time = 0.0
+
+    def time(self, probe, player, candidates=None):
+        start_time = time.perf_counter()
+        for _ in range(self.repeats):
+            result = probe(self.game, player, candidates) if candidates is not None else probe(self.game, player)
+        return result, time.perf_counter() - start_time
+
+    def probe(self, player):
+        candidates = get_candidates(self.game, player)
+        by_exception, exception_time = self.time(probe_by_exception, player, candidates)
+        by_query, query_time = self.time(probe_by_query, player, candidates)
+        legal_actions, legal_actions_time = self.time(get_legal_actions, player)
+        if by_query != by_exception or sorted(legal_actions, key=str) != sorted(by_exception, key=str):
+            self.mismatches += 1
+        self.positions += 1
+        self.candidates += len(candidates)
+        self.legal += len(by_exception)
+        self.exception_time += exception_time
+        self.query_time += query_time
+        self.legal_actions_time += legal_actions_time
+
+def play_games(num_games, num_players, repeats, seed=0):
+    """Plays random games by the full Game, probing the legal moves of every turn before the player chooses"""
+    arena = setup_ai_arena(num_players, ["4"] * num_players)
+    game = arena.game
+    timer = ProbeTimer(game, repeats)
+    for player in game.players:
+        def choose_action(player=player, choose=player.choose_action):
+            timer.probe(player)
+            return choose()
+        player.choose_action = choose_action
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for game_number in range(num_games):
+            arena.play_game(seed + game_number)
+    return timer
+
+def main():
+    parser = argparse.ArgumentParser(description="Time probing move legality by catching exceptions against the legality queries.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=10, help="Times each position is probed while timing")
+    args = parser.parse_args()
+
+    timer = play_games(args.games, args.players, args.repeats)
+    probes = timer.candidates * timer.repeats
+    print(f"{timer.positions} positions, {timer.candidates / timer.positions:.1f} candidates each, "
+          f"{1 - timer.legal / timer.candidates:.0%} of them illegal")
+    print(f"  execute and catch: {probes / timer.exception_time:,.0f} candidates/s")
+    print(f"  can_execute:       {probes / timer.query_time:,.0f} candidates/s ({timer.exception_time / timer.query_time:.1f}x faster)")
+    print(f"  get_legal_actions: {timer.positions * timer.repeats / timer.legal_actions_time:,.0f} positions/s "
+          f"({timer.exception_time / timer.legal_actions_time:.1f}x faster than probing every candidate)")
+    print(f"{timer.mismatches} positions where the styles disagree")
+    if timer.mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
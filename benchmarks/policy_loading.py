@@ -0,0 +1,122 @@
+"""
+Compares loading a policy from a memory-mapped policy file (game/policy_file.py) with unpickling a dictionary
+of the same policy, in worker processes started the way a tournament starts them: the load time, the time of a
+lookup and the memory of every worker. The resident set (RSS) counts every page a worker touches, shared or not,
+so the proportional set (PSS, shared pages divided between the processes using them) and the private memory are
+reported as well where Linux provides them.
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from game.policy_file import PolicyFile, write_policy_file
+
+NUM_CHOICES = 3
+
+def get_key(index):
+    """A synthetic information-set key shaped like the solver's"""
+    return f"challenge|Tax|Duke|{index % 3}|{index % 7}|{index // 7 % 7}|1|{index}"
+
+def write_policies(num_keys, pickle_path, policy_path):
+    """Writes the same random policy as a pickled dictionary and as a policy file"""
+    rng = random.Random(0)
+    policy = {}
+    for index in range(num_keys):
+        weights = [rng.random() for _ in range(NUM_CHOICES)]
+        total = sum(weights)
+        policy[get_key(index)] = tuple(weight / total for weight in weights)
+    with open(pickle_path, "wb") as pickle_file:
+        pickle.dump(policy, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+    write_policy_file(policy_path, policy, NUM_CHOICES)
+
+def get_memory():
+    """Returns the RSS, PSS and private memory of this process in MB, None where they cannot be read"""
+    memory = {"Rss": None, "Pss": None, "Private": None}
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            private = 0
+            for line in smaps:
+                field, value = line.split(":", 1)
+                if field in ("Rss", "Pss"):
+                    memory[field] = int(value.split()[0]) / 1024
+                elif field in ("Private_Clean", "Private_Dirty"):
+                    private += int(value.split()[0]) / 1024
+            memory["Private"] = private
+    except OSError:
+        import resource  # Not on Windows, where none of the three is read
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["Rss"] = max_rss / 1024 / (1024 if os.uname().sysname == "Darwin" else 1)
+    return memory
+
+def run_worker(policy_format, path, num_keys, num_lookups, start_event, results):
+    """Loads the policy, looks random keys up and reports the times and the memory the policy added"""
+    rng = random.Random(1)
+    keys = [get_key(rng.randrange(num_keys)) for _ in range(num_lookups)]
+    start_event.wait()
+    base_memory = get_memory()
+    start_time = time.perf_counter()
+    if policy_format == "pickle":
+        with open(path, "rb") as policy_file:
+            policy = pickle.load(policy_file)
+    else:
+        policy = PolicyFile(path)
+    load_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for key in keys:
+        policy.get(key)
+    lookup_time = (time.perf_counter() - start_time) / len(keys)
+    memory = get_memory()
+    results.put({"load": load_time, "lookup": lookup_time,
+                 **{field: None if memory[field] is None or base_memory[field] is None else memory[field] - base_memory[field]
+                    for field in memory}})
+
+def measure(policy_format, path, num_keys, num_lookups, workers, context):
+    """Starts the workers together and returns the average of their reports"""
+    start_event = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=run_worker, args=(policy_format, path, num_keys, num_lookups, start_event, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    start_event.set()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {field: None if any(report[field] is None for report in reports) else sum(report[field] for report in reports) / workers
+            for field in reports[0]}
+
+def format_memory(value):
+    return "n/a" if value is None else f"{value:.1f} MB"
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare loading policies from memory-mapped policy files and from pickled dictionaries.")
+    parser.add_argument("--keys", type=int, default=500000, help="Information sets in the policy")
+    parser.add_argument("--lookups", type=int, default=200000, help="Lookups made by every worker")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # Fork where the platform has it, as tournament workers are started. The policies are built in a child process
+    # so the workers do not inherit them
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+    with tempfile.TemporaryDirectory() as folder:
+        pickle_path = os.path.join(folder, "policy.pickle")
+        policy_path = os.path.join(folder, "policy.bin")
+        writer = context.Process(target=write_policies, args=(args.keys, pickle_path, policy_path))
+        writer.start()
+        writer.join()
+        print(f"{args.keys} information sets: pickled dictionary {os.path.getsize(pickle_path) / 2 ** 20:.1f} MB, "
+              f"policy file {os.path.getsize(policy_path) / 2 ** 20:.1f} MB")
+        print(f"{args.workers} workers, {args.lookups} lookups each, memory added by loading and looking up:")
+        for name, policy_format, path in (("Pickled dictionary", "pickle", pickle_path), ("Policy file", "mmap", policy_path)):
+            report = measure(policy_format, path, args.keys, args.lookups, args.workers, context)
+            print(f"{name}: load {report['load'] * 1000:.1f} ms, lookup {report['lookup'] * 1e6:.2f} us, "
+                  f"RSS {format_memory(report['Rss'])}, PSS {format_memory(report['Pss'])}, "
+                  f"private {format_memory(report['Private'])} per worker")
+
+if __name__ == "__main__":
+    main()
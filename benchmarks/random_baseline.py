@@ -0,0 +1,130 @@
+"""
+Compares the random baseline played by the full Game (RandomAIPlayer seats at a GameArena) with the same
+baseline played by the simulation core (BatchedRandomPolicy, game/random_policy.py): the games per second of
+each, and the distribution of play, so a baseline matchup can be moved to the simulation core without changing
+what it measures. RandomPolicy, which picks uniformly among (action, target) pairs instead, is timed as well.
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+from collections import Counter
+
+from game.events import ActionDeclared, BlockDeclared, ChallengeIssued
+from game.random_policy import BatchedRandomPolicy
+from game.simulation import RandomPolicy, SimulationState
+from main import setup_ai_arena
+
+class PlayCounter:
+    """Counts the declared actions, challenges and blocks, the winning seats and the rounds of a run of games"""
+    def __init__(self):
+        self.actions = Counter()
+        self.challenges = 0
+        self.blocks = 0
+        self.wins = Counter()
+        self.rounds = 0
+        self.games = 0
+
+    def count_challenge(self, event=None):
+        self.challenges += 1
+
+    def count_block(self, event=None):
+        self.blocks += 1
+
+    def add_game(self, winner, rounds):
+        self.wins[winner] += 1
+        self.rounds += rounds
+        self.games += 1
+
+    def summary(self, num_players):
+        num_actions = sum(self.actions.values())
+        return {"actions": {action_name: count / num_actions for action_name, count in self.actions.items()},
+                "challenges per action": self.challenges / num_actions,
+                "blocks per action": self.blocks / num_actions,
+                "wins": [self.wins[seat] / self.games for seat in range(num_players)],
+                "draws": self.wins[None] / self.games,
+                "rounds": self.rounds / self.games}
+
+class CountingPolicy(BatchedRandomPolicy):
+    """BatchedRandomPolicy that counts its decisions into a PlayCounter"""
+    def __init__(self, counter, seed=None):
+        super().__init__(seed)
+        self.counter = counter
+
+    def choose_action(self, state, seat, legal_actions=None):
+        action_name, target = super().choose_action(state, seat, legal_actions)
+        self.counter.actions[action_name] += 1
+        return action_name, target
+
+    def challenge(self, state, seat, claimant, card_name):
+        challenged = super().challenge(state, seat, claimant, card_name)
+        if challenged:
+            self.counter.count_challenge()
+        return challenged
+
+    def block(self, state, seat, player, action_name, can_block):
+        card_name = super().block(state, seat, player, action_name, can_block)
+        if card_name is not None:
+            self.counter.count_block()
+        return card_name
+
+def play_full_games(num_games, num_players, counter=None, seed=0):
+    arena = setup_ai_arena(num_players, ["4"] * num_players)
+    game = arena.game
+    if counter is not None:
+        game.events.subscribe(ActionDeclared, lambda event: counter.actions.update([event.action]))
+        game.events.subscribe(ChallengeIssued, counter.count_challenge)
+        game.events.subscribe(BlockDeclared, counter.count_block)
+    start_time = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for game_number in range(num_games):
+            arena.play_game(seed + game_number)
+            if counter is not None:
+                winner = arena.get_winner()
+                counter.add_game(None if winner is None else game.players.index(winner), game.current_round)
+    return num_games / (time.perf_counter() - start_time)
+
+def play_simulated_games(num_games, num_players, policy, counter=None, seed=0):
+    rng = random.Random(seed)
+    policies = [policy] * num_players
+    start_time = time.perf_counter()
+    for _ in range(num_games):
+        state = SimulationState.new_game(num_players, rng)
+        winner = state.play(policies)
+        if counter is not None:
+            counter.add_game(winner, state.current_round)
+    return num_games / (time.perf_counter() - start_time)
+
+def print_comparison(full_summary, simulated_summary):
+    print(f"{'':24}{'Full game':>12}{'Simulated':>12}")
+    for action_name in sorted(full_summary["actions"]):
+        print(f"{action_name:24}{full_summary['actions'][action_name]:12.3f}{simulated_summary['actions'].get(action_name, 0.0):12.3f}")
+    for field in ("challenges per action", "blocks per action", "draws", "rounds"):
+        print(f"{field.capitalize():24}{full_summary[field]:12.3f}{simulated_summary[field]:12.3f}")
+    for seat, (full_rate, simulated_rate) in enumerate(zip(full_summary["wins"], simulated_summary["wins"])):
+        print(f"{f'Seat {seat + 1} wins':24}{full_rate:12.3f}{simulated_rate:12.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the random baseline in the full game and in the simulation core.")
+    parser.add_argument("--games", type=int, default=2000, help="Games timed in the full game")
+    parser.add_argument("--simulated-games", type=int, default=20000, help="Games timed and compared in the simulation core")
+    parser.add_argument("--players", type=int, default=4)
+    args = parser.parse_args()
+
+    full_rate = play_full_games(args.games, args.players)
+    random_rate = play_simulated_games(args.simulated_games, args.players, RandomPolicy(random.Random(1)))
+    batched_rate = play_simulated_games(args.simulated_games, args.players, BatchedRandomPolicy(seed=1))
+    print(f"Full game, RandomAIPlayer:          {full_rate:.0f} games/s")
+    print(f"Simulation core, RandomPolicy:        {random_rate:.0f} games/s ({random_rate / full_rate:.1f}x)")
+    print(f"Simulation core, BatchedRandomPolicy: {batched_rate:.0f} games/s ({batched_rate / full_rate:.1f}x, "
+          f"{batched_rate / random_rate:.2f}x RandomPolicy)")
+
+    full_counter, simulated_counter = PlayCounter(), PlayCounter()
+    play_full_games(args.games, args.players, full_counter)
+    play_simulated_games(args.simulated_games, args.players, CountingPolicy(simulated_counter, seed=2), simulated_counter)
+    print(f"\nDistribution of play over {args.games} full and {args.simulated_games} simulated games:")
+    print_comparison(full_counter.summary(args.players), simulated_counter.summary(args.players))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures how fast the binary result store can be written and aggregated. Fills a temporary store with
+synthetic 4-player results, then times the vectorised NumPy scan, the analytics, the stdlib mmap scan and, for
+comparison, parsing the same results from JSON lines.
+"""
+import json
+import os
+import random
+import tempfile
+import time
+
+from evaluation.result_store import ResultStore
+
+AI_NAMES = ["AIPlayerMonte", "AIPlayerOldMonte", "AIPlayerRuleBased", "RandomAIPlayer"]
+
+def make_result(rng, seed):
+    return {
+        "seed": seed,
+        "ai_types": [rng.choice(AI_NAMES) for _ in range(4)],
+        "winner": rng.randrange(4),
+        "reason": 0,
+        "turns": [rng.randrange(20) for _ in range(4)],
+        "actions": [rng.randrange(20) for _ in range(4)],
+        "challenges": [rng.randrange(5) for _ in range(4)],
+        "successful_challenges": [rng.randrange(3) for _ in range(4)],
+        "blocks": [rng.randrange(5) for _ in range(4)],
+        "rounds": rng.randrange(100)
+    }
+
+def timed(function):
+    start_time = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start_time
+
+def main(num_games=1000000, batch_size=10000):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as folder:
+        store = ResultStore(os.path.join(folder, "results.bin"))
+        json_path = os.path.join(folder, "results.jsonl")
+        write_time = 0.0
+        with open(json_path, "w") as json_file:
+            for start in range(0, num_games, batch_size):
+                batch = [make_result(rng, seed) for seed in range(start, min(start + batch_size, num_games))]
+                _, elapsed = timed(lambda: store.append(batch))
+                write_time += elapsed
+                json_file.writelines(json.dumps(result) + "\n" for result in batch)
+        print(f"Appended {len(store)} games at {len(store) / write_time:.0f} games/s "
+              f"({os.path.getsize(store.path) / 1e6:.1f} MB, JSON lines: {os.path.getsize(json_path) / 1e6:.1f} MB)")
+
+        try:
+            import numpy  # noqa: F401
+            _, elapsed = timed(store.summarize)
+            print(f"NumPy memmap scan: {elapsed:.3f}s")
+            from evaluation.analytics import analyze_store
+            _, elapsed = timed(lambda: analyze_store(store))
+            print(f"Analytics (seats, matchups, game lengths, challenges): {elapsed:.3f}s")
+        except ImportError:
+            print("NumPy memmap scan: skipped, NumPy is not installed")
+
+        def stdlib_scan():
+            wins = {}
+            for record in store.iter_records():
+                if record[2] >= 0:
+                    name = store.ai_type_names[record[4 + record[2]]]
+                    wins[name] = wins.get(name, 0) + 1
+            return wins
+        _, elapsed = timed(stdlib_scan)
+        print(f"Stdlib mmap scan (wins only): {elapsed:.3f}s")
+
+        def json_scan():
+            wins = {}
+            with open(json_path) as json_file:
+                for line in json_file:
+                    result = json.loads(line)
+                    name = result["ai_types"][result["winner"]]
+                    wins[name] = wins.get(name, 0) + 1
+            return wins
+        _, elapsed = timed(json_scan)
+        print(f"JSON lines parse (wins only): {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
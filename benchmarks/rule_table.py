@@ -0,0 +1,90 @@
+"""
+Checks that AIPlayerRuleTable (players/rule_table_player.py) makes the same decisions as AIPlayerRuleBased, and
+compares their speed. The same seeded games are played by a table of rule-based players and by a table of
+table-backed players, and every event the games publish must match: every action, target, challenge, block,
+lost influence and coin. Games are played with and without card beliefs, which decide some challenges, and
+with the endgame table when training/endgame_solver.py has written one.
+"""
+import argparse
+import contextlib
+import os
+import time
+
+from game.arena import GameArena
+from game.events import GameEvent
+from players.registry import create_ai_player
+
+DECISIONS = ["choose_action", "wants_to_challenge", "wants_to_block", "get_block_choice"]
+
+def time_decisions(player, timings):
+    """Wraps the decision methods of the player to add the time they take to timings"""
+    for method_name in DECISIONS:
+        def timed(*args, method=getattr(player, method_name), **kwargs):
+            start_time = time.perf_counter()
+            result = method(*args, **kwargs)
+            timings[0] += time.perf_counter() - start_time
+            return result
+        setattr(player, method_name, timed)
+
+def play_games(ai_type, num_games, num_players, setup_players, seed=0, record=True):
+    """
+    Plays seeded games and returns the events of every game, the games played per second and the seconds
+    spent deciding per game
+    """
+    players = [create_ai_player(ai_type, name=f"AI Player {seat}") for seat in range(1, num_players + 1)]
+    timings = [0.0]
+    for player in players:
+        time_decisions(player, timings)
+    arena = GameArena(players, setup_players=setup_players)
+    events = []
+    if record:
+        arena.game.events.subscribe(GameEvent, lambda event: events[-1].append(repr(event)))
+    start_time = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for game_number in range(num_games):
+            events.append([])
+            arena.play_game(seed + game_number)
+    return events, num_games / (time.perf_counter() - start_time), timings[0] / num_games
+
+def compare_decisions(num_games, num_players, setup_players, seed=0):
+    """Returns the number of games whose events differ, printing the first difference"""
+    rule_events, _, _ = play_games("AIPlayerRuleBased", num_games, num_players, setup_players, seed)
+    table_events, _, _ = play_games("AIPlayerRuleTable", num_games, num_players, setup_players, seed)
+    mismatches = 0
+    for game_number, (rule_game, table_game) in enumerate(zip(rule_events, table_events)):
+        if rule_game != table_game:
+            if not mismatches:
+                index = next((index for index, (rule_event, table_event) in enumerate(zip(rule_game, table_game)) if rule_event != table_event),
+                             min(len(rule_game), len(table_game)))
+                print(f"  Game {seed + game_number} differs at event {index}:")
+                print(f"    rule-based: {rule_game[index] if index < len(rule_game) else 'end of game'}")
+                print(f"    rule table: {table_game[index] if index < len(table_game) else 'end of game'}")
+            mismatches += 1
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the compiled rule tables play like AIPlayerRuleBased, and time both.")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = False
+    for num_players in (2, 3, 4):
+        for setup_players in (False, True):
+            mismatches = compare_decisions(args.games, num_players, setup_players, args.seed)
+            failed = failed or mismatches
+            print(f"{num_players} players, {'with' if setup_players else 'without'} card beliefs: "
+                  f"{args.games - mismatches}/{args.games} games identical")
+
+    for setup_players in (False, True):
+        _, rule_rate, rule_time = play_games("AIPlayerRuleBased", args.games, 4, setup_players, args.seed, record=False)
+        _, table_rate, table_time = play_games("AIPlayerRuleTable", args.games, 4, setup_players, args.seed, record=False)
+        print(f"4 players, {'with' if setup_players else 'without'} card beliefs:")
+        print(f"  AIPlayerRuleBased {rule_rate:.0f} games/s, deciding {rule_time * 1000:.2f} ms per game")
+        print(f"  AIPlayerRuleTable {table_rate:.0f} games/s, deciding {table_time * 1000:.2f} ms per game "
+              f"({rule_time / table_time:.1f}x faster)")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Compares how many random games per second the full Game (with RandomAIPlayer seats) and the lightweight
+simulation core in game/simulation.py can play. Both resolve actions through the same rule table.
+"""
+import contextlib
+import os
+import random
+import time
+
+from game.simulation import RandomPolicy, SimulationState
+from main import setup_ai_game
+
+def time_full_games(num_games, num_players):
+    start_time = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(num_games):
+            game = setup_ai_game(num_players, ["4"] * num_players)
+            game.play_game()
+    return num_games / (time.perf_counter() - start_time)
+
+def time_simulated_games(num_games, num_players, seed=0):
+    rng = random.Random(seed)
+    policies = [RandomPolicy(rng)] * num_players
+    start_time = time.perf_counter()
+    for _ in range(num_games):
+        SimulationState.new_game(num_players, rng).play(policies)
+    return num_games / (time.perf_counter() - start_time)
+
+def main(num_games=2000, num_players=4):
+    full_rate = time_full_games(num_games, num_players)
+    simulated_rate = time_simulated_games(num_games, num_players)
+    print(f"Full game:       {full_rate:.0f} games/s")
+    print(f"Simulation core: {simulated_rate:.0f} games/s ({simulated_rate / full_rate:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Measures cold-start import time with python -X importtime for the modules that the interactive menu
+and the training workers load first.
+"""
+import subprocess
+import sys
+
+MODULES = ["main", "game.game", "training.self_play"]
+
+def measure_import_time(module_name, repeats=5):
+    """Returns the best cumulative import time of the module in milliseconds, each run in a fresh interpreter"""
+    best = None
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                                   capture_output=True, text=True, check=True)
+        for line in completed.stderr.splitlines():
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2] == module_name:
+                cumulative = int(parts[1]) / 1000
+                best = cumulative if best is None else min(best, cumulative)
+    return best
+
+def main():
+    for module_name in MODULES:
+        print(f"{module_name}: {measure_import_time(module_name):.1f} ms")
+
+if __name__ == "__main__":
+    main()
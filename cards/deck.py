@@ -7,9 +7,11 @@ from cards.card import Card
 from exceptions.game_exceptions import GameException, NoCardsLeftInDeck
 
 class Deck:
-    def __init__(self):
-        """Initialises a new deck of cards."""
+    def __init__(self, rng=None):
+        """Initialises a new deck of cards. A seeded random generator can be passed in to make games reproducible."""
+        self.rng = rng if rng is not None else random.SystemRandom()
         self.cards = []  # Starts with an empty list of cards
+        self.all_cards = []  # Every card that belongs to the deck, wherever it currently is
         self.set_up_deck()
 
     def set_up_deck(self):
@@ -18,12 +20,19 @@ class Deck:
         number_of_each_character = 3
         for character in characters:
             for _ in range(number_of_each_character):
-                self.cards.append(Card(character))
+                card = Card(character)
+                self.cards.append(card)
+                self.all_cards.append(card)
         self.shuffle()  # Shuffles the deck after initialization
 
+    def reset(self):
+        """Gathers every card back into the deck and shuffles it, reusing the same Card objects."""
+        self.cards[:] = self.all_cards
+        self.shuffle()
+
     def shuffle(self):
-        """Shuffles the deck using a random generator."""
-        random.SystemRandom().shuffle(self.cards)
+        """Shuffles the deck using the deck's random generator."""
+        self.rng.shuffle(self.cards)
 
     def draw_card(self):
         """Removes and returns the top card of the deck. Raises an exception if the deck is empty."""
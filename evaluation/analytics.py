@@ -0,0 +1,149 @@
+"""
+Analytics over a result store: win rates by seat, a matchup matrix between AI types, the distribution of game
+lengths and how often each AI type's challenges succeed. The records are read from the NumPy memmap in chunks and
+every chunk is aggregated with bincounts and matrix products, so tens of millions of games are scanned with
+bounded memory and without a Python loop per game. Requires NumPy.
+"""
+import argparse
+import os
+
+import numpy
+
+from evaluation.result_store import MAX_SEATS, TERMINATION_REASONS, ResultStore
+
+CHUNK_SIZE = 1 << 20  # Records aggregated at a time
+
+class ResultAnalytics:
+    def __init__(self, ai_type_names):
+        """Empty counts for a store holding the given AI types"""
+        self.ai_type_names = list(ai_type_names)
+        num_types = max(len(self.ai_type_names), 1)
+        self.games = 0
+        self.seat_games = numpy.zeros(MAX_SEATS + 1, dtype=numpy.int64)  # Indexed by number of players
+        self.seat_wins = numpy.zeros((MAX_SEATS + 1, MAX_SEATS), dtype=numpy.int64)  # Number of players, seat
+        self.matchup_games = numpy.zeros((num_types, num_types), dtype=numpy.int64)
+        self.matchup_wins = numpy.zeros((num_types, num_types), dtype=numpy.int64)
+        self.rounds = numpy.zeros(0, dtype=numpy.int64)  # Games by number of rounds
+        self.reasons = numpy.zeros(len(TERMINATION_REASONS), dtype=numpy.int64)
+        self.challenges = numpy.zeros(num_types, dtype=numpy.int64)
+        self.successful_challenges = numpy.zeros(num_types, dtype=numpy.int64)
+
+    def add(self, records):
+        """Aggregates a chunk of records, a NumPy array with the fields of RECORD_DTYPE"""
+        num_games = len(records)
+        if num_games == 0:
+            return
+        num_types = len(self.challenges)
+        num_players = records["num_players"].astype(numpy.int64)
+        winner = records["winner"].astype(numpy.int64)
+        seated = numpy.arange(MAX_SEATS)[None, :] < num_players[:, None]
+        has_winner = winner >= 0
+        self.games += num_games
+
+        self.seat_games += numpy.bincount(num_players, minlength=MAX_SEATS + 1)
+        self.seat_wins += numpy.bincount(num_players[has_winner] * MAX_SEATS + winner[has_winner],
+                                         minlength=(MAX_SEATS + 1) * MAX_SEATS).reshape(MAX_SEATS + 1, MAX_SEATS)
+
+        # Seats of every AI type in every game, and the type of the winning seat
+        types = records["ai_types"].astype(numpy.int64)
+        rows = numpy.broadcast_to(numpy.arange(num_games)[:, None], types.shape)
+        seat_counts = numpy.bincount((rows * num_types + types)[seated],
+                                     minlength=num_games * num_types).reshape(num_games, num_types)
+        winning_type = numpy.zeros((num_games, num_types), dtype=numpy.int64)
+        winning_type[numpy.flatnonzero(has_winner), types[has_winner, winner[has_winner]]] = 1
+
+        # A matchup (a, b) is a game with a seat of type a and another seat of type b, won by a when a type a seat won.
+        # float32 products are exact while a chunk has fewer than 2**24 games
+        present = (seat_counts > 0).astype(numpy.float32)
+        self.matchup_games += (present.T @ present).astype(numpy.int64)
+        numpy.fill_diagonal(self.matchup_games, self.matchup_games.diagonal() - present.sum(axis=0).astype(numpy.int64)
+                            + (seat_counts >= 2).sum(axis=0))
+        opponents = ((seat_counts - winning_type) > 0).astype(numpy.float32)
+        self.matchup_wins += (winning_type.astype(numpy.float32).T @ opponents).astype(numpy.int64)
+
+        rounds = numpy.bincount(records["rounds"])
+        if len(rounds) > len(self.rounds):
+            rounds[:len(self.rounds)] += self.rounds
+            self.rounds = rounds
+        else:
+            self.rounds[:len(rounds)] += rounds
+        self.reasons += numpy.bincount(records["reason"], minlength=len(self.reasons))[:len(self.reasons)]
+
+        seated_types = types[seated]
+        self.challenges += numpy.bincount(seated_types, weights=records["challenges"][seated],
+                                          minlength=num_types).astype(numpy.int64)
+        self.successful_challenges += numpy.bincount(seated_types, weights=records["successful_challenges"][seated],
+                                                     minlength=num_types).astype(numpy.int64)
+
+    def get_seat_win_rates(self):
+        """Returns, for every number of players that has been played, the win rate of each seat"""
+        return {num_players: self.seat_wins[num_players, :num_players] / self.seat_games[num_players]
+                for num_players in range(2, MAX_SEATS + 1) if self.seat_games[num_players]}
+
+    def get_matchup_matrix(self):
+        """
+        Returns the matrix of win rates between AI types: entry (a, b) is the share of the games with a seat of
+        type a and another seat of type b that a type a seat won. NaN where the types never met.
+        """
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return numpy.where(self.matchup_games > 0, self.matchup_wins / self.matchup_games, numpy.nan)
+
+    def get_game_length_distribution(self, percentiles=(10, 50, 90, 99)):
+        """Returns the rounds histogram, the mean, the requested percentiles and the games by termination reason"""
+        games = int(self.rounds.sum())
+        cumulative = numpy.cumsum(self.rounds)
+        return {
+            "histogram": self.rounds,
+            "mean": float(numpy.arange(len(self.rounds)) @ self.rounds / games) if games else 0.0,
+            "percentiles": {percentile: int(numpy.searchsorted(cumulative, games * percentile / 100))
+                            for percentile in percentiles} if games else {},
+            "reasons": {TERMINATION_REASONS[reason]: int(count) for reason, count in enumerate(self.reasons)}
+        }
+
+    def get_challenge_success_rates(self):
+        """Returns the challenges, successful challenges and success rate of every AI type that challenged"""
+        return {name: (int(self.challenges[code]), int(self.successful_challenges[code]),
+                       self.successful_challenges[code] / self.challenges[code])
+                for code, name in enumerate(self.ai_type_names) if self.challenges[code]}
+
+def analyze_store(store, chunk_size=CHUNK_SIZE):
+    """Aggregates every record of a ResultStore, one chunk of the memmap at a time"""
+    records = store.load_array()
+    analytics = ResultAnalytics(store.read_header())
+    for start in range(0, len(records), chunk_size):
+        analytics.add(numpy.asarray(records[start:start + chunk_size]))
+    return analytics
+
+def print_analytics(analytics):
+    print(f"\n{analytics.games} games")
+    print("\nWin rate by seat:")
+    for num_players, win_rates in analytics.get_seat_win_rates().items():
+        print(f"  {num_players} players ({analytics.seat_games[num_players]} games): "
+              + ", ".join(f"seat {seat + 1} {win_rate:.1%}" for seat, win_rate in enumerate(win_rates)))
+
+    names = analytics.ai_type_names
+    if names:
+        print("\nMatchups (row's win rate in games with the column):")
+        width = max(max(len(name) for name in names), len("100.0%")) + 2
+        print(" " * width + "".join(name[:width - 2].rjust(width) for name in names))
+        for name, row in zip(names, analytics.get_matchup_matrix()):
+            print(name.ljust(width) + "".join(("-" if numpy.isnan(win_rate) else f"{win_rate:.1%}").rjust(width) for win_rate in row))
+
+    distribution = analytics.get_game_length_distribution()
+    print(f"\nRounds: mean {distribution['mean']:.1f}, "
+          + ", ".join(f"p{percentile} {rounds}" for percentile, rounds in distribution["percentiles"].items()))
+    print("Games ended by " + ", ".join(f"{reason}: {count}" for reason, count in distribution["reasons"].items()))
+
+    print("\nChallenge success:")
+    for name, (challenges, successful_challenges, success_rate) in analytics.get_challenge_success_rates().items():
+        print(f"  {name}: {successful_challenges} of {challenges} challenges won ({success_rate:.1%})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Win rates by seat, matchups, game lengths and challenge success from a result store.")
+    parser.add_argument("path", nargs="?", default=os.path.join("evaluations", "results.bin"))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Records aggregated at a time")
+    args = parser.parse_args()
+    print_analytics(analyze_store(ResultStore(args.path), args.chunk_size))
+
+if __name__ == "__main__":
+    main()
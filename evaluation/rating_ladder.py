@@ -0,0 +1,194 @@
+"""
+Persistent Elo rating ladder for AI variants, stored in SQLite. A variant is an AI type, optionally with a
+tuned AIPlayerMonte profile. Instead of a full round-robin, each batch plays the matchups whose result is
+least predictable, so a new variant only needs enough games to be placed on the ladder.
+"""
+import argparse
+import json
+import math
+import sqlite3
+import time
+
+from players.registry import describe_ai_types
+
+INITIAL_RATING = 1500.0
+
+class RatingLadder:
+    def __init__(self, path="rating_ladder.db"):
+        """Opens the ladder database, creating the tables on first use"""
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS variants (
+                name TEXT PRIMARY KEY,
+                ai_type TEXT NOT NULL,
+                profile TEXT,
+                rating REAL NOT NULL,
+                games INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS matches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch INTEGER NOT NULL,
+                first_seat TEXT NOT NULL,
+                second_seat TEXT NOT NULL,
+                winner TEXT,
+                played_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rating_history (
+                batch INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                rating REAL NOT NULL,
+                games INTEGER NOT NULL
+            );
+        """)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def add_variant(self, name, ai_type, profile=None, rating=INITIAL_RATING):
+        """Adds a variant to the ladder. The profile is a dictionary for AIPlayerMonte.apply_profile"""
+        self.connection.execute(
+            "INSERT INTO variants (name, ai_type, profile, rating, games) VALUES (?, ?, ?, ?, 0)",
+            (name, ai_type, json.dumps(profile) if profile else None, rating))
+        self.connection.commit()
+
+    def get_variants(self):
+        """Returns every variant sorted by rating"""
+        rows = self.connection.execute("SELECT name, ai_type, profile, rating, games FROM variants ORDER BY rating DESC")
+        return [{
+            "name": name,
+            "ai_type": ai_type,
+            "profile": json.loads(profile) if profile else None,
+            "rating": rating,
+            "games": games
+        } for name, ai_type, profile, rating, games in rows]
+
+    def get_last_batch(self):
+        row = self.connection.execute("SELECT MAX(batch) FROM rating_history").fetchone()
+        return row[0] or 0
+
+    @staticmethod
+    def expected_score(rating, opponent_rating):
+        """Elo expected score of a player against an opponent"""
+        return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+    @staticmethod
+    def k_factor(games):
+        """New variants move quickly, established ones settle"""
+        return max(16.0, 64.0 / math.sqrt(1 + games / 10))
+
+    def schedule_matchups(self, num_matchups):
+        """
+        Picks the most informative pairings. A pairing is informative when its result is hard to predict
+        (expected score close to 0.5) and when either variant has played few games.
+        """
+        variants = self.get_variants()
+        candidates = []
+        for i, first in enumerate(variants):
+            for second in variants[i + 1:]:
+                expected = self.expected_score(first["rating"], second["rating"])
+                uncertainty = 1 / math.sqrt(1 + first["games"]) + 1 / math.sqrt(1 + second["games"])
+                candidates.append((expected * (1 - expected) * uncertainty, first, second))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [(first, second) for _, first, second in candidates[:num_matchups]]
+
+    def record_batch(self, results):
+        """
+        Applies the Elo updates for a batch of (first, second, winner) results, where winner is the name of the
+        winning variant or None for a draw. The ratings are updated game by game and written once per batch.
+        """
+        batch = self.get_last_batch() + 1
+        variants = {variant["name"]: variant for variant in self.get_variants()}
+        updated = set()
+
+        for first, second, winner in results:
+            first_variant, second_variant = variants[first], variants[second]
+            expected = self.expected_score(first_variant["rating"], second_variant["rating"])
+            score = 0.5 if winner is None else (1.0 if winner == first else 0.0)
+            first_change = self.k_factor(first_variant["games"]) * (score - expected)
+            second_change = self.k_factor(second_variant["games"]) * (expected - score)
+            first_variant["rating"] += first_change
+            second_variant["rating"] += second_change
+            first_variant["games"] += 1
+            second_variant["games"] += 1
+            updated.update((first, second))
+            self.connection.execute(
+                "INSERT INTO matches (batch, first_seat, second_seat, winner, played_at) VALUES (?, ?, ?, ?, ?)",
+                (batch, first, second, winner, time.time()))
+
+        for name in updated:
+            variant = variants[name]
+            self.connection.execute("UPDATE variants SET rating = ?, games = ? WHERE name = ?",
+                                    (variant["rating"], variant["games"], name))
+            self.connection.execute("INSERT INTO rating_history (batch, name, rating, games) VALUES (?, ?, ?, ?)",
+                                    (batch, name, variant["rating"], variant["games"]))
+        self.connection.commit()
+        return batch
+
+    def get_history(self, name):
+        """Returns the (batch, rating) history of a variant"""
+        rows = self.connection.execute("SELECT batch, rating FROM rating_history WHERE name = ? ORDER BY batch", (name,))
+        return rows.fetchall()
+
+def play_match(setup_ai_game, first, second):
+    """Plays one game between two variants and returns the name of the winner, or None"""
+    game = setup_ai_game(2, [first["ai_type"], second["ai_type"]])
+    for player, variant in zip(game.players, [first, second]):
+        if variant["profile"] and hasattr(player, "apply_profile"):
+            player.apply_profile(variant["profile"])
+    game.play_game()
+    remaining_players = game.players_remaining()
+    if len(remaining_players) == 1:
+        return [first, second][game.players.index(remaining_players[0])]["name"]
+    return None
+
+def run_ladder(ladder, setup_ai_game, batches=5, matchups_per_batch=3, games_per_matchup=10):
+    """Runs batches of the most informative matchups, alternating seats, and updates the ratings after each batch"""
+    for _ in range(batches):
+        results = []
+        for first, second in ladder.schedule_matchups(matchups_per_batch):
+            for game_index in range(games_per_matchup):
+                seats = (first, second) if game_index % 2 == 0 else (second, first)
+                winner = play_match(setup_ai_game, *seats)
+                results.append((seats[0]["name"], seats[1]["name"], winner))
+        if not results:
+            print("At least two variants are needed to run the ladder.")
+            return
+        batch = ladder.record_batch(results)
+        print(f"Batch {batch}: {len(results)} games played.")
+
+def print_ladder(ladder):
+    print("\nRating Ladder:")
+    for rank, variant in enumerate(ladder.get_variants(), start=1):
+        print(f"{rank}. {variant['name']} (AI type {variant['ai_type']}): {variant['rating']:.0f} after {variant['games']} games")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain an Elo rating ladder of AI variants.")
+    parser.add_argument("--db", default="rating_ladder.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_parser = subparsers.add_parser("add", help="Add a variant")
+    add_parser.add_argument("name")
+    add_parser.add_argument("--type", required=True, help=describe_ai_types())
+    add_parser.add_argument("--profile", help="Profile file for AIPlayerMonte, written by training.self_play")
+    run_parser = subparsers.add_parser("run", help="Play batches and update the ratings")
+    run_parser.add_argument("--batches", type=int, default=5)
+    run_parser.add_argument("--matchups", type=int, default=3)
+    run_parser.add_argument("--games", type=int, default=10)
+    subparsers.add_parser("show", help="Show the ladder")
+    args = parser.parse_args()
+
+    ladder = RatingLadder(args.db)
+    if args.command == "add":
+        profile = None
+        if args.profile:
+            with open(args.profile) as profile_file:
+                profile = json.load(profile_file)
+        ladder.add_variant(args.name, args.type, profile)
+    elif args.command == "run":
+        from main import setup_ai_game
+        run_ladder(ladder, setup_ai_game, args.batches, args.matchups, args.games)
+    print_ladder(ladder)
+    ladder.close()
+
+if __name__ == "__main__":
+    main()
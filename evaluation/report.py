@@ -0,0 +1,81 @@
+"""
+Report stage for the AI evaluation. Reads the aggregated results (or a results file written by the evaluation)
+and renders the charts. matplotlib is only imported here, inside the worker processes that draw the charts,
+so playing games never pays for it.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# (results key, y label, title, file name, multiplier applied to the per-game average)
+CHARTS = [
+    ("win_counts", "Win Percentage", "Win Percentage of AI Players", "win_percentage.png", 100),
+    ("total_turns", "Average Turns Played", "Average Turns Played by AI Players", "average_turns_played.png", 1),
+    ("total_actions", "Average Actions Played", "Average Actions Played by AI Players", "average_actions_played.png", 1),
+    ("total_challenges", "Average Challenges Made", "Average Challenges Made by AI Players", "average_challenges_made.png", 1),
+    ("total_blocks", "Average Blocks Made", "Average Blocks Made by AI Players", "average_blocks_made.png", 1),
+]
+
+def write_results(path, results):
+    """Saves the aggregated evaluation results so the report can be rendered separately"""
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+
+def load_results(path):
+    with open(path) as results_file:
+        return json.load(results_file)
+
+def render_chart(task):
+    """Draws a single bar chart with the non-interactive backend and returns the file it was saved to"""
+    labels, values, ylabel, title, output_file, figsize = task
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=figsize)
+    plt.bar(labels, values)
+    plt.xlabel("AI Player")
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
+    plt.tight_layout()  # Adjust layout to prevent clipping of labels
+    plt.savefig(output_file)
+    plt.close()
+    return output_file
+
+def render_report(results, output_folder="evaluations", figsize=(14, 8), workers=None):
+    """
+    Renders every chart for the results, in parallel. results is either the dictionary built by the
+    evaluation or the path of a results file.
+    """
+    if isinstance(results, str):
+        results = load_results(results)
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    num_games = results["num_games"]
+    tasks = []
+    for key, ylabel, title, file_name, multiplier in CHARTS:
+        totals = results[key]
+        values = [total / num_games * multiplier for total in totals.values()]
+        tasks.append((list(totals.keys()), values, ylabel, title, os.path.join(output_folder, file_name), tuple(figsize)))
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(tasks), os.cpu_count() or 1)) as executor:
+        return list(executor.map(render_chart, tasks))
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the AI evaluation charts from a results file.")
+    parser.add_argument("results", nargs="?", default=os.path.join("evaluations", "results.json"))
+    parser.add_argument("--output", default="evaluations")
+    parser.add_argument("--width", type=float, default=14)
+    parser.add_argument("--height", type=float, default=8)
+    args = parser.parse_args()
+    for output_file in render_report(args.results, args.output, (args.width, args.height)):
+        print(f"Saved {output_file}")
+
+if __name__ == "__main__":
+    main()
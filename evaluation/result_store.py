@@ -0,0 +1,234 @@
+"""
+Append-only binary store of game results. Every game is one fixed-width record, so the file can be read
+through mmap (or a NumPy memmap) and aggregated with a scan, without parsing anything. Several processes can
+append to the same file: every batch of records is written at the end of the file under an exclusive file lock.
+
+File layout: a header with the names of the AI types seen so far, then the records. A record holds the seed,
+the number of players, the winning seat (-1 for none), the termination reason, and per seat (up to four):
+the AI type, turns, actions, challenges, successful challenges and blocks, then the number of rounds played.
+Challenges count challenges of blocks as well as of actions.
+"""
+import argparse
+import contextlib
+import mmap
+import os
+import struct
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MAGIC = b"CPRS"
+VERSION = 2  # Version 2 added the successful challenges
+MAX_SEATS = 4
+MAX_AI_TYPES = 16
+NAME_SIZE = 32
+HEADER = struct.Struct(f"<4sHHB{MAX_AI_TYPES * NAME_SIZE}s")  # magic, version, record size, AI types, names
+HEADER_SIZE = 1024  # Leaves room to grow the header
+RECORD = struct.Struct(f"<QBbBx{MAX_SEATS}B{MAX_SEATS}H{MAX_SEATS}H{MAX_SEATS}H{MAX_SEATS}H{MAX_SEATS}HHxx")
+
+# Termination reasons
+ELIMINATION = 0
+ROUND_LIMIT = 1
+TERMINATION_REASONS = {ELIMINATION: "elimination", ROUND_LIMIT: "round limit"}
+
+# The record layout as a NumPy dtype, used by load_array
+RECORD_DTYPE = [
+    ("seed", "<u8"),
+    ("num_players", "u1"),
+    ("winner", "i1"),
+    ("reason", "u1"),
+    ("padding", "u1"),
+    ("ai_types", "u1", (MAX_SEATS,)),
+    ("turns", "<u2", (MAX_SEATS,)),
+    ("actions", "<u2", (MAX_SEATS,)),
+    ("challenges", "<u2", (MAX_SEATS,)),
+    ("successful_challenges", "<u2", (MAX_SEATS,)),
+    ("blocks", "<u2", (MAX_SEATS,)),
+    ("rounds", "<u2"),
+    ("padding2", "<u2")
+]
+
+@contextlib.contextmanager
+def file_lock(descriptor):
+    """Holds an exclusive lock on the file while the block runs"""
+    if fcntl is not None:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(descriptor, fcntl.LOCK_UN)
+    else:
+        import msvcrt
+        os.lseek(descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+
+class ResultStore:
+    def __init__(self, path):
+        """Opens the store, creating it with an empty header if it does not exist yet"""
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        descriptor = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            with file_lock(descriptor):
+                self.ensure_header(descriptor)
+        finally:
+            os.close(descriptor)
+        self.ai_type_names = self.read_header()
+
+    def ensure_header(self, descriptor):
+        """Writes the empty header if the file is new. Must be called with the lock held"""
+        if os.fstat(descriptor).st_size < HEADER_SIZE:
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            os.write(descriptor, self.pack_header([]).ljust(HEADER_SIZE, b"\0"))
+
+    @staticmethod
+    def pack_header(ai_type_names):
+        names = b"".join(name.encode()[:NAME_SIZE].ljust(NAME_SIZE, b"\0") for name in ai_type_names)
+        return HEADER.pack(MAGIC, VERSION, RECORD.size, len(ai_type_names), names)
+
+    def read_header(self):
+        """Returns the AI type names in the header"""
+        with open(self.path, "rb") as store_file:
+            header = store_file.read(HEADER.size)
+        magic, version, record_size, num_names, names = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a result store for this version of the game.")
+        return [names[i * NAME_SIZE:(i + 1) * NAME_SIZE].rstrip(b"\0").decode() for i in range(num_names)]
+
+    def get_ai_type_code(self, ai_type_name, descriptor):
+        """Returns the code of an AI type, adding the name to the header under the lock if it is new"""
+        if ai_type_name not in self.ai_type_names:
+            self.ai_type_names = self.read_header()  # Another process may have added it
+        if ai_type_name not in self.ai_type_names:
+            if len(self.ai_type_names) >= MAX_AI_TYPES:
+                raise ValueError(f"A result store can only hold {MAX_AI_TYPES} AI types.")
+            self.ai_type_names.append(ai_type_name)
+            os.lseek(descriptor, 0, os.SEEK_SET)
+            os.write(descriptor, self.pack_header(self.ai_type_names))
+        return self.ai_type_names.index(ai_type_name)
+
+    def pack_record(self, result, descriptor):
+        """Packs a result dictionary, see build_result, into a record"""
+        num_players = len(result["ai_types"])
+        if num_players > MAX_SEATS:
+            raise ValueError(f"A result store can only hold games of up to {MAX_SEATS} players.")
+        padding = [0] * (MAX_SEATS - num_players)
+        codes = [self.get_ai_type_code(ai_type, descriptor) for ai_type in result["ai_types"]]
+        return RECORD.pack(result["seed"], num_players, -1 if result["winner"] is None else result["winner"], result["reason"],
+                           *(codes + padding), *(result["turns"] + padding), *(result["actions"] + padding),
+                           *(result["challenges"] + padding), *(result["successful_challenges"] + padding),
+                           *(result["blocks"] + padding), result["rounds"])
+
+    def append(self, results):
+        """Appends the results as one write, so a batch from one process is never interleaved with another's"""
+        descriptor = os.open(self.path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        try:
+            with file_lock(descriptor):
+                data = b"".join(self.pack_record(result, descriptor) for result in results)
+                os.lseek(descriptor, 0, os.SEEK_END)
+                os.write(descriptor, data)
+        finally:
+            os.close(descriptor)
+
+    def __len__(self):
+        return max(0, os.path.getsize(self.path) - HEADER_SIZE) // RECORD.size
+
+    def iter_records(self):
+        """Yields every record as a tuple in the order of RECORD, reading through mmap"""
+        if len(self) == 0:
+            return
+        with open(self.path, "rb") as store_file, mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ) as records:
+            end = HEADER_SIZE + len(self) * RECORD.size
+            yield from RECORD.iter_unpack(memoryview(records)[HEADER_SIZE:end])
+
+    def load_array(self):
+        """Returns the records as a read-only NumPy memmap with the fields of RECORD_DTYPE. Requires NumPy"""
+        import numpy
+        return numpy.memmap(self.path, dtype=numpy.dtype(RECORD_DTYPE), mode="r", offset=HEADER_SIZE, shape=(len(self),))
+
+    def summarize(self):
+        """
+        Aggregates every game by AI type: games, wins and the turn, action, challenge and block totals.
+        Uses a vectorised scan of the memmap when NumPy is installed.
+        """
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        self.ai_type_names = self.read_header()
+        totals = {name: {"games": 0, "wins": 0, "turns": 0, "actions": 0, "challenges": 0, "blocks": 0} for name in self.ai_type_names}
+        if len(self) == 0:
+            return totals
+
+        if numpy is not None:
+            records = self.load_array()
+            seats = numpy.arange(MAX_SEATS)
+            seated = seats[None, :] < records["num_players"][:, None]
+            won = seats[None, :] == records["winner"][:, None]
+            types = records["ai_types"][seated]
+            num_types = len(self.ai_type_names)
+            counts = {
+                "games": numpy.bincount(types, minlength=num_types),
+                "wins": numpy.bincount(records["ai_types"][won], minlength=num_types)
+            }
+            for field in ("turns", "actions", "challenges", "blocks"):
+                counts[field] = numpy.bincount(types, weights=records[field][seated], minlength=num_types)
+            for code, name in enumerate(self.ai_type_names):
+                for field, values in counts.items():
+                    totals[name][field] = int(values[code])
+            return totals
+
+        for record in self.iter_records():
+            num_players, winner = record[1], record[2]
+            for seat in range(num_players):
+                name = self.ai_type_names[record[4 + seat]]
+                totals[name]["games"] += 1
+                totals[name]["wins"] += seat == winner
+                for offset, field in ((1, "turns"), (2, "actions"), (3, "challenges"), (5, "blocks")):
+                    totals[name][field] += record[4 + MAX_SEATS * offset + seat]
+        return totals
+
+def build_result(game, ai_types, seed=0):
+    """Builds the result dictionary of a finished game for ResultStore.append"""
+    remaining_players = game.players_remaining()
+    winner = game.players.index(remaining_players[0]) if len(remaining_players) == 1 else None
+    summaries = [game.log_manager.get_player_summary(player.name) for player in game.players]
+    return {
+        "seed": seed,
+        "ai_types": list(ai_types),
+        "winner": winner,
+        "reason": ROUND_LIMIT if game.current_round > game.max_rounds else ELIMINATION,
+        "turns": [player.turns_played for player in game.players],
+        "actions": [player.actions_played for player in game.players],
+        "challenges": [summary["challenges_made"] for summary in summaries],
+        "successful_challenges": [summary["successful_challenges"] for summary in summaries],
+        "blocks": [player.blocks_made for player in game.players],
+        "rounds": min(game.current_round, 0xFFFF)
+    }
+
+def print_summary(store):
+    print(f"\n{len(store)} games in {store.path}")
+    for name, totals in store.summarize().items():
+        games = totals["games"]
+        if games:
+            print(f"{name}: {totals['wins'] / games:.1%} wins over {games} games, "
+                  f"{totals['turns'] / games:.2f} turns, {totals['actions'] / games:.2f} actions, "
+                  f"{totals['challenges'] / games:.2f} challenges, {totals['blocks'] / games:.2f} blocks per game")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a result store written by the AI evaluation.")
+    parser.add_argument("path", nargs="?", default=os.path.join("evaluations", "results.bin"))
+    args = parser.parse_args()
+    print_summary(ResultStore(args.path))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Confidence-aware evaluation of AI players. Games are played one at a time with the seat order rotated,
+and a sequential probability ratio test stops the run as soon as one AI is significantly better than
+its fair share of wins, or as soon as it is clear that none of them is.
+"""
+import math
+
+def wilson_interval(wins, games, z=1.96):
+    """Returns the Wilson score interval (low, high) for a win rate. z=1.96 gives a 95% interval"""
+    if games == 0:
+        return 0.0, 1.0
+    win_rate = wins / games
+    denominator = 1 + z * z / games
+    centre = (win_rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(win_rate * (1 - win_rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+class SequentialProbabilityRatioTest:
+    """
+    Wald's SPRT on a win rate. H0: the AI wins its fair share p0, H1: it wins p0 + delta.
+    """
+    def __init__(self, p0, delta, alpha, beta):
+        self.p0 = p0
+        self.p1 = min(p0 + delta, 0.99)
+        self.upper_bound = math.log((1 - beta) / alpha)  # Accept H1 above this
+        self.lower_bound = math.log(beta / (1 - alpha))  # Accept H0 below this
+        self.win_step = math.log(self.p1 / self.p0)
+        self.loss_step = math.log((1 - self.p1) / (1 - self.p0))
+        self.log_likelihood_ratio = 0.0
+        self.result = None
+
+    def record(self, won):
+        """Adds the outcome of one game to the test. Once a bound is crossed the decision is final and later games are ignored"""
+        if self.result is not None:
+            return
+        self.log_likelihood_ratio += self.win_step if won else self.loss_step
+        if self.log_likelihood_ratio >= self.upper_bound:
+            self.result = "better"
+        elif self.log_likelihood_ratio <= self.lower_bound:
+            self.result = "not better"
+
+    def decision(self):
+        """Returns 'better', 'not better' or None if the test needs more games"""
+        return self.result
+
+def rotate_seats(ai_types, game_index):
+    """Returns the seat order for the game, and for each seat the index of the AI sitting in it"""
+    num_players = len(ai_types)
+    slots = [(seat + game_index) % num_players for seat in range(num_players)]
+    return [ai_types[slot] for slot in slots], slots
+
+def run_sequential_evaluation(setup_ai_game, ai_types, max_games=1000, delta=0.1, alpha=0.05, beta=0.05, z=1.96):
+    """
+    Evaluates the AI types against each other using games built by setup_ai_game(num_players, ai_types).
+    Each AI is tested against its fair share of wins (1 / number of players). The error rates are split
+    across the AIs so the run as a whole keeps the requested alpha.
+    Stops when one AI is significantly better, when every AI is significantly not better, or after max_games.
+    Returns the results, including how many games were saved compared with a fixed run of max_games.
+    """
+    num_players = len(ai_types)
+    fair_share = 1 / num_players
+    tests = [SequentialProbabilityRatioTest(fair_share, delta, alpha / num_players, beta) for _ in ai_types]
+    wins = [0] * num_players
+    games_played = 0
+    stopping_reason = "maximum games reached"
+
+    while games_played < max_games:
+        seat_types, slots = rotate_seats(ai_types, games_played)
+        print(f"\nEvaluating Game {games_played + 1}")
+        game = setup_ai_game(num_players, seat_types)
+        game.play_game()
+        games_played += 1
+
+        remaining_players = game.players_remaining()
+        winning_slot = None
+        if len(remaining_players) == 1:
+            winning_slot = slots[game.players.index(remaining_players[0])]
+            wins[winning_slot] += 1
+        for slot, test in enumerate(tests):
+            test.record(slot == winning_slot)
+
+        decisions = [test.decision() for test in tests]
+        if "better" in decisions:
+            stopping_reason = "significantly better AI found"
+            break
+        if all(decision == "not better" for decision in decisions):
+            stopping_reason = "no AI is significantly better"
+            break
+
+    results = []
+    for slot, ai_type in enumerate(ai_types):
+        low, high = wilson_interval(wins[slot], games_played, z)
+        results.append({
+            "slot": slot + 1,
+            "ai_type": ai_type,
+            "wins": wins[slot],
+            "win_rate": wins[slot] / games_played if games_played else 0.0,
+            "interval": (low, high),
+            "log_likelihood_ratio": tests[slot].log_likelihood_ratio,
+            "decision": tests[slot].decision()
+        })
+
+    return {
+        "results": results,
+        "games_played": games_played,
+        "max_games": max_games,
+        "games_saved": max_games - games_played,
+        "compute_saved": (max_games - games_played) / max_games if max_games else 0.0,
+        "stopping_reason": stopping_reason
+    }
+
+def print_sequential_results(summary, ai_type_names=None):
+    """Prints the evaluation summary"""
+    print("\nSequential Evaluation Results:")
+    print(f"Stopped after {summary['games_played']} games ({summary['stopping_reason']}).")
+    for result in summary["results"]:
+        name = ai_type_names.get(result["ai_type"], result["ai_type"]) if ai_type_names else result["ai_type"]
+        low, high = result["interval"]
+        print(f"AI {result['slot']} ({name}): {result['wins']} wins, win rate {result['win_rate']:.2%} "
+              f"(CI {low:.2%} - {high:.2%}), test: {result['decision'] or 'undecided'}")
+    print(f"Games saved compared with a fixed run of {summary['max_games']}: "
+          f"{summary['games_saved']} ({summary['compute_saved']:.0%}).")
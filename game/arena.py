@@ -0,0 +1,51 @@
+"""
+Represents a reusable game arena. The same Game, Deck and players are reset in place between games,
+so running a tournament does not build a new table for every game.
+"""
+import random
+
+from cards.deck import Deck
+from game.game import Game
+
+class GameArena:
+    def __init__(self, players, deck=None, setup_players=True, log_window=None):
+        """
+        Seats the players at a single table. The AI players initialise their card probabilities after every
+        deal, as they do at a table built by setup_game, unless setup_players is False. log_window bounds the
+        action log of every game, see LogManager.
+        """
+        self.game = Game(deck if deck is not None else Deck(), log_window)
+        self.game.players = players
+        for player in players:
+            player.game = self.game
+        self.setup_players = setup_players
+        self.games_played = 0
+
+    def play_game(self, seed=None):
+        """
+        Resets the table in place (or deals the first game), plays the game and returns it.
+        With a seed the game is reproducible: the same seed plays the same game at any arena with the same
+        players, whether it is the first game or a later one.
+        """
+        game = self.game
+        if seed is not None:
+            random.seed(seed)
+            game.deck.rng = random.Random(seed)
+        if self.games_played:
+            game.reset()
+        else:
+            if seed is not None:
+                game.deck.reset()  # Gathers the cards back in order, the deck was shuffled when it was built
+            game.setup()
+        if self.setup_players:
+            game.setup_ai_players()
+        game.play_game()
+        self.games_played += 1
+        return game
+
+    def get_winner(self):
+        """Returns the winner of the last game, or None if there was no single winner"""
+        remaining_players = self.game.players_remaining()
+        if len(remaining_players) == 1:
+            return remaining_players[0]
+        return None
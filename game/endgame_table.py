@@ -0,0 +1,106 @@
+"""
+Lookup table for 2-player endgames, solved offline by training/endgame_solver.py. The file is a small header
+followed by fixed-width records of unsigned 16-bit win probabilities, one record per public state
+(own coins, opponent coins, own cards, opponent cards). It is memory-mapped, so looking a state up is a
+single index calculation and processes playing in parallel share the same pages.
+"""
+import mmap
+import os
+import struct
+
+from game.rules import ACTION_RULES
+
+DEFAULT_TABLE_PATH = os.path.join("training_runs", "endgame_table.bin")
+
+MAGIC = b"CPET"
+VERSION = 1
+BYTE_ORDER_MARK = 0xFEFF  # Read back as 0xFFFE when the file was written on a machine with the other byte order
+HEADER = struct.Struct("=4sHHHH")  # magic, version, byte order mark, max coins, number of actions
+
+MAX_COINS = 12  # Nobody can start an action with more, a player with 10 or more has to coup first
+ACTION_NAMES = list(ACTION_RULES)
+RECORD_SIZE = 1 + len(ACTION_NAMES)  # State value, then the value of every action
+ILLEGAL = 0xFFFF  # Stored for actions that cannot be taken in the state
+SCALE = 0xFFFE  # A win probability of 1
+
+def state_index(my_coins, opponent_coins, my_cards, opponent_cards):
+    """Position of a state's record, counted in records"""
+    return ((min(my_coins, MAX_COINS) * (MAX_COINS + 1) + min(opponent_coins, MAX_COINS)) * 2 + my_cards - 1) * 2 + opponent_cards - 1
+
+NUM_STATES = state_index(MAX_COINS, MAX_COINS, 2, 2) + 1
+
+def write_endgame_table(path, state_values, action_values):
+    """
+    Writes the table. state_values is indexed by state_index and action_values holds, for every state,
+    a dictionary of the win probability of each legal action.
+    """
+    from array import array
+    records = array("H")
+    for index in range(NUM_STATES):
+        records.append(round(state_values[index] * SCALE))
+        for action_name in ACTION_NAMES:
+            value = action_values[index].get(action_name)
+            records.append(ILLEGAL if value is None else round(value * SCALE))
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, MAX_COINS, len(ACTION_NAMES)))
+        records.tofile(table_file)
+    os.replace(temp_path, path)
+
+class EndgameTable:
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        """Maps the table file into memory and checks that it matches this version of the rules"""
+        with open(path, "rb") as table_file:
+            self.map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order_mark, max_coins, num_actions = HEADER.unpack_from(self.map)
+        if (magic, version, byte_order_mark, max_coins, num_actions) != (MAGIC, VERSION, BYTE_ORDER_MARK, MAX_COINS, len(ACTION_NAMES)):
+            self.map.close()
+            raise ValueError(f"{path} is not an endgame table for this version of the game.")
+        self.records = memoryview(self.map)[HEADER.size:].cast("H")
+
+    def get_state_value(self, my_coins, opponent_coins, my_cards, opponent_cards):
+        """Win probability of the player about to take their turn, before any forced coup"""
+        return self.records[state_index(my_coins, opponent_coins, my_cards, opponent_cards) * RECORD_SIZE] / SCALE
+
+    def get_action_values(self, my_coins, opponent_coins, my_cards, opponent_cards):
+        """Win probability after each legal action, assuming both players continue to play the table's strategy"""
+        start = state_index(my_coins, opponent_coins, my_cards, opponent_cards) * RECORD_SIZE + 1
+        action_values = {}
+        for action_name, value in zip(ACTION_NAMES, self.records[start:start + len(ACTION_NAMES)]):
+            if value != ILLEGAL:
+                action_values[action_name] = value / SCALE
+        return action_values
+
+    def score_actions(self, player, game_state):
+        """
+        Returns the action values for the player when only one opponent is left, otherwise None.
+        Uses only public information from the game state, and the player's own coins and cards.
+        The solver does not model challenges, so actions claiming a character the player does not hold are left out.
+        """
+        opponents = [player_data for player_data in game_state["players"].values()
+                     if player_data["name"] != player.name and not player_data["is_eliminated"]]
+        if len(opponents) != 1 or not player.hand or not opponents[0]["card_count"]:
+            return None
+        opponent = opponents[0]
+        action_values = self.get_action_values(player.get_coins(), opponent["coins"], min(len(player.hand), 2), min(opponent["card_count"], 2))
+        for action_name in list(action_values):
+            required_card = ACTION_RULES[action_name]["required_card"]
+            if required_card and not player.has_card(required_card):
+                del action_values[action_name]
+        return action_values
+
+    def close(self):
+        self.records.release()
+        self.map.close()
+
+_loaded_tables = {}
+
+def load_endgame_table(path=DEFAULT_TABLE_PATH):
+    """Returns the table at path, mapped once per process, or None if it has not been generated"""
+    if path not in _loaded_tables:
+        _loaded_tables[path] = EndgameTable(path) if os.path.exists(path) else None
+    return _loaded_tables[path]
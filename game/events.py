@@ -0,0 +1,89 @@
+"""
+Represents the events emitted by the game and the bus that delivers them. Every state change is published
+as a typed event, so loggers, AIs, metrics and recorders can follow the game incrementally instead of
+re-reading the action log. Events only hold player and card names, never the objects themselves.
+"""
+
+class GameEvent:
+    """Base class of every event"""
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+class ActionDeclared(GameEvent):
+    """A player has declared the action they will take this turn"""
+    def __init__(self, player, action, target=None):
+        self.player = player
+        self.action = action
+        self.target = target
+
+class ChallengeIssued(GameEvent):
+    """A player has challenged another player's claim to a card, either an action claim or a block"""
+    def __init__(self, challenger, challenged, card):
+        self.challenger = challenger
+        self.challenged = challenged
+        self.card = card
+
+class BlockDeclared(GameEvent):
+    """A player has blocked an action by claiming a card"""
+    def __init__(self, blocker, player, action, card):
+        self.blocker = blocker
+        self.player = player
+        self.action = action
+        self.card = card
+
+class CardRevealed(GameEvent):
+    """A player has shown a card to win a challenge. The card is then swapped for a new one from the deck"""
+    def __init__(self, player, card):
+        self.player = player
+        self.card = card
+
+class InfluenceLost(GameEvent):
+    """A player has lost one of their influences"""
+    def __init__(self, player, card):
+        self.player = player
+        self.card = card
+
+class CoinsChanged(GameEvent):
+    """A player's coins have changed by amount, leaving them with coins"""
+    def __init__(self, player, amount, coins):
+        self.player = player
+        self.amount = amount
+        self.coins = coins
+
+class PlayerEliminated(GameEvent):
+    """A player has lost their last influence"""
+    def __init__(self, player):
+        self.player = player
+
+class ActionResolved(GameEvent):
+    """An action has been fully resolved. log_entry is the entry added to the action log"""
+    def __init__(self, log_entry):
+        self.log_entry = log_entry
+
+class GameOver(GameEvent):
+    """The game has ended. winner is None if the game was stopped without a single player left"""
+    def __init__(self, winner):
+        self.winner = winner
+
+class EventBus:
+    def __init__(self):
+        """Initialises the bus without any subscribers"""
+        self.subscribers = {}  # event class -> handlers, GameEvent receives every event
+
+    def subscribe(self, event_type, handler):
+        """Calls handler(event) for every published event of event_type. Subscribe to GameEvent for all events"""
+        self.subscribers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        """Stops calling the handler for event_type"""
+        handlers = self.subscribers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event):
+        """Delivers the event to the handlers of its type, then to the handlers of every event"""
+        for handler in self.subscribers.get(type(event), ()):
+            handler(event)
+        for handler in self.subscribers.get(GameEvent, ()):
+            handler(event)
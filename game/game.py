@@ -2,26 +2,35 @@
 Represents the main game class for Coup, handling the game state, player actions, and game flow.
 """
 
-from players.player import Player
-from players.ai_player import *
-from cards.deck import Deck
-from actions.action import *
-from exceptions.game_exceptions import *
+from contextlib import contextmanager
+
+from actions.action import Coup, get_legal_blockers
+from game.events import EventBus, ActionDeclared, ChallengeIssued, BlockDeclared, CardRevealed, ActionResolved, GameOver
 from game.log_manager import LogManager
+from game.public_beliefs import PublicBeliefService
+from game.rules import (resolve_action, NOT_CHALLENGED, CHALLENGER_WINS, PLAYER_WINS, PLAYER_WINS_GAME_OVER,
+                        PLAYER_WINS_TARGET_ELIMINATED, NOT_BLOCKED, BLOCKED, BLOCKER_WINS, BLOCKER_LOSES,
+                        BLOCKER_LOSES_TARGET_ELIMINATED)
 
 class Game:
     """
     Initialises the game with a set of players and a deck of cards.
     """
-    def __init__(self, deck):
+    def __init__(self, deck, log_window=None):
+        """log_window keeps only that many recent entries in the action log, see LogManager"""
         self.players = []
         self.deck = deck
         self.current_player_index = 0
         self.game_over = False
         self.current_round = 1
-        self.log_manager = LogManager()
+        self.events = EventBus()  # Every state change is published here, see game/events.py
+        self.log_manager = LogManager(log_window)
+        self.events.subscribe(ActionResolved, self.log_manager.on_action_resolved)
+        self.public_beliefs = PublicBeliefService(self.log_manager)  # Public evidence shared by every AI at the table
         self.last_action = None
         self.max_rounds = 100
+        self._public_state = None  # Shared snapshot of the public state while a decision window is open
+
     def setup(self):
         """
         Sets up the game by shuffling the deck and dealing cards and coins to each player.
@@ -32,6 +41,15 @@ class Game:
             player.add_card(self.deck.draw_card())
             player.add_card(self.deck.draw_card())
 
+    def setup_ai_players(self):
+        """
+        Lets every AI player at the table initialise its beliefs about the hands just dealt.
+        """
+        for player in self.players:
+            if not player.is_human():
+                player.game = self
+                player.setup()
+
     def setup_ai_game(self, ai_players):
         """
         Sets up the AIPlayers for the game and adds cards to their hand.
@@ -109,7 +127,7 @@ class Game:
             'remaining_players': [p.name for p in self.players_remaining()],
             'all_lost_influences': self.get_all_lost_influences()
         }
-        self.log_manager.log_action(log_entry)
+        self.events.publish(ActionResolved(log_entry))
 
     def get_player_by_name(self, player_name):
         """
@@ -171,6 +189,8 @@ class Game:
             self.next_player()
 
         self.end_game()
+        remaining_players = self.players_remaining()
+        self.events.publish(GameOver(remaining_players[0].name if len(remaining_players) == 1 else None))
 
     def terminate_game(self):
         """
@@ -209,115 +229,61 @@ class Game:
     def execute_action(self, player, action=None):
         """
         Manages the execution of a player's action, including challenges and blocks.
+        The challenge and block windows are resolved by the rule table in game/rules.py.
         """
         if not action:
             action = player.choose_action()
         if action:
+            action.execute()  # Raises before anything changes if the player chose an illegal action
             player.actions_played += 1
             print(f"Debug: Action chosen - {action.action_name}, Target - {getattr(action.target, 'name', 'No Target')}")
             self.last_action = action
             target_description = f" on {action.target.name}" if action.target else ""
             print(f"\n{player.name} is attempting to perform {action.action_name}{target_description}.")
-
-            action_result = 'not performed'
-            challenge_outcome_result = None
-
-            # If action requires an influence, then prompt players if they wish to challenge
-            if action.requires_influence:
-                challenger = self.prompt_challenge(player, action)
-                # If there is a challenger
-                if challenger:
-                    challenger.challenges_made += 1
-                    # Handle the challenge and return the result. (Handle challenge deals with losing influence, swapping card etc)
-                    challenge_result, card_shown, card_eliminated = self.handle_challenge(player, challenger, action.required_card)
-                    if not challenge_result: # If Challenger has won, The player has lost a card (handled above), and the turn has ended
-                        challenge_outcome_result = 'challenge lost'
-                        print(f"Turn ends. {challenger.name} has won the challenge.")
-                        self.log_action(player, action, target=action.target, challenge=challenger, challenge_outcome=challenge_outcome_result, action_result=action_result, card_eliminated=card_eliminated, card_shown=card_shown)
-                        return
-                    else: # If player has won the challenge. (Challenger has lost an influence. this happened in handle challenge)
-                        challenge_outcome_result = 'challenge won'
-                        # Going to say action is performed due to the target being eliminated or game ends. So it can be techincally performed
-                        if self.is_game_over(): # Check if 1 player remaining, if so then the game is over. (Turn ends here)
-                            self.game_over = True
-                            self.log_action(player, action, target=action.target, challenge=challenger, challenge_outcome=challenge_outcome_result, action_result='performed', card_eliminated=card_eliminated, card_shown=card_shown)
-                            return
-                        if action.target and action.target.is_eliminated: # If there is a target, and target is eliminated, then the turn ends.
-                            action_result = 'target eliminated'
-                            print(f"Turn ends. {action.target.name} has been eliminated.")
-                            self.log_action(player, action, target=action.target, challenge=challenger, challenge_outcome=challenge_outcome_result, action_result='performed', card_eliminated=card_eliminated, card_shown=card_shown)
-                            return
-                        
-            if action.is_blockable:
-                self.handle_block_phase(action, player)
-            else:
-                self.log_action(player, action, action_result='performed')
-                action.perform_action()
-
-    def handle_block_phase(self, action, player):
-        """
-        Handles the block phase of the action section. Also allows for counter-challenges (challenging the blocker)
-        """
-        blocker, blocker_claim_card = self.prompt_block(player, action)
-
-        # If there is a player who wishes to block (they become blocker)
-        if blocker:
-            blocker.blocks_made += 1
-            print(f"{blocker.name} has chosen to block with {blocker_claim_card}.")
-            # Prompts the player to counter the block (the player can choose if they want to challenge the blocker and the blockers card that they block with)
-            if player.wants_to_challenge(blocker_claim_card, blocker):
-                blocker_wins_challenge, card_shown, card_eliminated = self.handle_challenge(blocker, player, blocker_claim_card)
-                if blocker_wins_challenge: # If the blocker wins the challenge against the player, the block is successful (blocker swaps their shown card and the player loses an influence)
-                    self.log_action(player, action, target=action.target, challenge=player, challenge_outcome='challenge lost', action_result='not performed', blocker=blocker, blocker_claim=blocker_claim_card, block_outcome='blocker wins challenge', card_eliminated=card_eliminated, card_shown=card_shown)
-                    print(f"Turn ends. {blocker.name} has successfully defended their claim and blocked the action.")
-                    return
-                else: # If the blocker has lost the challenge against the player, then the player can continue with the action as long as the blocker (target) is still alive.
-                    if action.target and action.target.is_eliminated:
-                        self.log_action(player, action, target=action.target, challenge=player, challenge_outcome='challenge won', action_result='target eliminated', blocker=blocker, blocker_claim=blocker_claim_card, block_outcome='blocker lost challenge', card_eliminated=card_eliminated, card_shown=card_shown)
-                        print(f"Turn ends. {action.target.name} has been eliminated.")
-                        return
-                    else:
-                        print(f"{player.name} has won the challenge and moves to perform {action.action_name}.")
-                        self.log_action(player, action, target=action.target, challenge=player, challenge_outcome='challenge won', action_result='performed', blocker=blocker, blocker_claim=blocker_claim_card, block_outcome='blocker lost challenge', card_eliminated=card_eliminated, card_shown=card_shown)
-                        action.perform_action()
-                        return
-            else: # The player does not wish to challenge the blocker, the turn ends here.
-                print("Turn ends. Blocker's claim is unchallenged.")
-                self.log_action(player, action, target=action.target, action_result='not performed', blocker=blocker, blocker_claim=blocker_claim_card, block_outcome='blocker not challenged')
-                return
-        else: # No blocker, so the player can perform the action
-            print(f"No blocker, {player.name} will perform {action.action_name}.")
-            self.log_action(player, action, target=action.target, action_result='performed')
-            action.perform_action()
+            self.events.publish(ActionDeclared(player.name, action.action_name, action.target.name if action.target else None))
+            resolve_action(action.action_name, TurnResolver(self, player, action))
     
     def prompt_challenge(self, current_player, action):
         """
-        Prompts for a challenge against a player's action.
+        Prompts for a challenge against a player's action, in seat order until someone challenges.
         """
-        for player in self.players_remaining():
-            if player != current_player:
-                if not player.is_human():
-                    if player.wants_to_challenge(action):
-                        print(f"{player.name} (AI) is challenging the action.")
-                        return player
-                    else:
-                        print(f"{player.name} (AI) does not challenge the action.")
-                else:
-                    if player.wants_to_challenge(action):
-                        print(f"{player.name} is challenging the action.")
-                        return player
+        with self.decision_window():
+            for player in self.players_remaining():
+                if player != current_player:
+                    if not player.is_human():
+                        if player.wants_to_challenge(action):
+                            print(f"{player.name} (AI) is challenging the action.")
+                            return player
+                        else:
+                            print(f"{player.name} (AI) does not challenge the action.")
                     else:
-                        print(f"{player.name} does not challenge the action.")
+                        if player.wants_to_challenge(action):
+                            print(f"{player.name} is challenging the action.")
+                            return player
+                        else:
+                            print(f"{player.name} does not challenge the action.")
 
         return None
+
+    @contextmanager
+    def decision_window(self):
+        """
+        Nothing changes the game state during a challenge or block window, so every player asked reads the
+        same public snapshot, built once when the window opens.
+        """
+        self._public_state = self.build_public_game_state()
+        try:
+            yield
+        finally:
+            self._public_state = None
     
     def prompt_block(self, player, action):
         """
         Prompts for block against a player's action.
         """
         if action.action_name == "Foreign Aid": # Prompt block to all players, they can block claiming the Duke card.
-            for potential_blocker in self.players_remaining():
-                if potential_blocker != player:
+            with self.decision_window():
+                for potential_blocker in get_legal_blockers(self, action):
                     # If the player is an AI
                     if not player.is_human():
                         print(f"\n{potential_blocker.name}, {player.name} is attempting Foreign Aid. Do you want to block by claiming Duke? (y/n)")
@@ -368,6 +334,7 @@ class Game:
             #  If the  player has the card then they win the challenge
             card_shown = card_name
             print(f"\n{player.name} has successfully shown {card_name} and wins challenge.")
+            self.events.publish(CardRevealed(player.name, card_name))
             player.swap_card(player.get_card_index(card_name))
             card_eliminated = challenger.lose_influence()
             challenge_result = True
@@ -398,9 +365,9 @@ class Game:
             'influences_lost': player.influences_lost
         }
     
-    def get_game_state_for_ai(self, ai_player):
+    def build_public_game_state(self):
         """
-        Get the overall state of the game for the AI including the action log
+        Build the part of the game state that every player can see. Hands are hidden.
         """
         players_list = [{
             'name': player.name,
@@ -408,22 +375,47 @@ class Game:
             'card_count': len(player.hand),
             'is_eliminated': player.is_eliminated,
             'influences_lost': player.influences_lost,
-            'hand': [card.name for card in player.hand] if player == ai_player else None
+            'hand': None
         } for player in self.players]
 
-        players_dict = {player['name']: player for player in players_list}
-
         return {
-            'players_list': players_list,  # Keep the list for compatibility
-            'players': players_dict,  # Add a dictionary for direct access
+            'players_list': players_list,
             'all_lost_influences': self.get_all_lost_influences(),
             'current_player': self.players[self.current_player_index].name,
             'deck_size': len(self.deck.cards),
-            'action_log': self.log_manager.get_action_log(),  # Provide the complete action log
+            'action_log': self.log_manager.get_action_log(),
             'round': self.current_round
         }
 
+    def get_game_state_for_ai(self, ai_player):
+        """
+        Get the overall state of the game for the AI including the action log.
+        Reuses the shared snapshot when one is open for a challenge or block window.
+        """
+        public_state = self._public_state if self._public_state is not None else self.build_public_game_state()
+
+        players_list = []
+        for player, player_data in zip(self.players, public_state['players_list']):
+            if player == ai_player:
+                player_data = dict(player_data, hand=[card.name for card in player.hand])
+            players_list.append(player_data)
+
+        players_dict = {player['name']: player for player in players_list}
+
+        return {
+            'players_list': players_list,  # Keep the list for compatibility
+            'players': players_dict,  # Add a dictionary for direct access
+            'all_lost_influences': public_state['all_lost_influences'][:],
+            'current_player': public_state['current_player'],
+            'deck_size': public_state['deck_size'],
+            'action_log': public_state['action_log'],  # Provide the action log (the recent entries when a window is set)
+            'round': public_state['round']
+        }
+
     def reset(self):
+        """
+        Resets the game in place, reusing the deck, players and log manager, and deals a new game.
+        """
         self.current_player_index = 0
         self.game_over = False
         self.current_round = 1
@@ -431,5 +423,93 @@ class Game:
         for player in self.players:
             player.reset()
         self.deck.reset()
-        self.log_manager = LogManager()
-        self.setup()
\ No newline at end of file
+        self.log_manager.clear()
+        self.setup()
+
+class TurnResolver:
+    """
+    Decides the challenge and block windows of one action at a full game, for resolve_action.
+    Holds who challenged and blocked so the end of the resolution can be logged.
+    """
+    def __init__(self, game, player, action):
+        self.game = game
+        self.player = player
+        self.action = action
+        self.challenger = None
+        self.blocker = None
+        self.blocker_claim = None
+        self.card_shown = None
+        self.card_eliminated = None
+
+    def challenge_window(self):
+        """Prompts the other players to challenge the claim and resolves the challenge"""
+        game, player, action = self.game, self.player, self.action
+        challenger = game.prompt_challenge(player, action)
+        if not challenger:
+            return NOT_CHALLENGED
+        challenger.challenges_made += 1
+        game.events.publish(ChallengeIssued(challenger.name, player.name, action.required_card))
+        self.challenger = challenger
+        # Handle the challenge and return the result. (Handle challenge deals with losing influence, swapping card etc)
+        challenge_result, self.card_shown, self.card_eliminated = game.handle_challenge(player, challenger, action.required_card)
+        if not challenge_result: # If Challenger has won, The player has lost a card (handled above), and the turn has ended
+            print(f"Turn ends. {challenger.name} has won the challenge.")
+            return CHALLENGER_WINS
+        if game.is_game_over(): # Check if 1 player remaining, if so then the game is over. (Turn ends here)
+            return PLAYER_WINS_GAME_OVER
+        if action.target and action.target.is_eliminated: # If there is a target, and target is eliminated, then the turn ends.
+            print(f"Turn ends. {action.target.name} has been eliminated.")
+            return PLAYER_WINS_TARGET_ELIMINATED
+        return PLAYER_WINS
+
+    def block_window(self):
+        """Prompts for a block against the action"""
+        game, player, action = self.game, self.player, self.action
+        blocker, blocker_claim = game.prompt_block(player, action)
+        if not blocker:
+            print(f"No blocker, {player.name} will perform {action.action_name}.")
+            return NOT_BLOCKED
+        blocker.blocks_made += 1
+        print(f"{blocker.name} has chosen to block with {blocker_claim}.")
+        game.events.publish(BlockDeclared(blocker.name, player.name, action.action_name, blocker_claim))
+        self.blocker = blocker
+        self.blocker_claim = blocker_claim
+        return BLOCKED
+
+    def counter_challenge_window(self):
+        """Lets the player challenge the blocker's claim (counter-challenge) and resolves it"""
+        game, player, action = self.game, self.player, self.action
+        if not player.wants_to_challenge(self.blocker_claim, self.blocker):
+            print("Turn ends. Blocker's claim is unchallenged.")
+            return NOT_CHALLENGED
+        game.events.publish(ChallengeIssued(player.name, self.blocker.name, self.blocker_claim))
+        self.challenger = player
+        blocker_wins_challenge, self.card_shown, self.card_eliminated = game.handle_challenge(self.blocker, player, self.blocker_claim)
+        if blocker_wins_challenge: # The block is successful (blocker swaps their shown card and the player loses an influence)
+            print(f"Turn ends. {self.blocker.name} has successfully defended their claim and blocked the action.")
+            return BLOCKER_WINS
+        if action.target and action.target.is_eliminated:
+            print(f"Turn ends. {action.target.name} has been eliminated.")
+            return BLOCKER_LOSES_TARGET_ELIMINATED
+        print(f"{player.name} has won the challenge and moves to perform {action.action_name}.")
+        return BLOCKER_LOSES
+
+    def finish(self, terminal_name, terminal):
+        """Logs the resolution and performs the action if the rules allow it"""
+        game, action = self.game, self.action
+        if terminal["game_over"]:
+            game.game_over = True
+        challenged = terminal["challenge"]
+        blocked = terminal["block_outcome"] is not None
+        game.log_action(self.player, action,
+                        target=action.target if terminal["target"] else None,
+                        challenge=self.challenger if challenged else None,
+                        challenge_outcome=terminal["challenge_outcome"],
+                        blocker=self.blocker if blocked else None,
+                        blocker_claim=self.blocker_claim if blocked else None,
+                        block_outcome=terminal["block_outcome"],
+                        action_result=terminal["action_result"],
+                        card_shown=self.card_shown if challenged else None,
+                        card_eliminated=self.card_eliminated if challenged else None)
+        if terminal["perform"]:
+            action.perform_action()
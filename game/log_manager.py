@@ -1,15 +1,125 @@
 """
 Represents the class for LogManager which handles  the action log.
+With a window set, only the most recent log entries are kept. Every entry is also folded into a
+per-player summary as it is logged, so the evidence from older entries is not lost when they are dropped.
 """
+
+# The character each action claims
+ACTION_CARDS = {
+    "Tax": "Duke",
+    "Assassinate": "Assassin",
+    "Steal": "Captain",
+    "Exchange": "Ambassador"
+}
+
 class LogManager:
-    def __init__(self):
-        """Initialises the action log"""
-        self.action_log = []
+    def __init__(self, window=None):
+        """Initialises the action log. window is the number of recent entries to keep, None keeps all of them"""
+        self.window = window
+        self.clear()
 
     def log_action(self, log_entry):
-        """Adds a log to the action log"""
+        """Adds a log to the action log and folds it into the player summaries"""
         self.action_log.append(log_entry)
+        self.entries_logged += 1
+        self.summarize(log_entry)
+        if self.window is not None and len(self.action_log) > self.window:
+            del self.action_log[:len(self.action_log) - self.window]
+
+    def on_action_resolved(self, event):
+        """Logs the entry of an ActionResolved event published by the game"""
+        self.log_action(event.log_entry)
 
     def get_action_log(self):
-        """Returns the action log"""
-        return self.action_log
\ No newline at end of file
+        """Returns the action log, only the recent entries when a window is set"""
+        return self.action_log
+
+    def clear(self):
+        """Starts a new action log. The previous log is left untouched for anyone still holding it"""
+        self.action_log = []
+        self.entries_logged = 0
+        self.player_summaries = {}
+
+    def get_player_summary(self, player_name):
+        """
+        Returns the summary of everything the player has done in the game. The summary holds:
+        actions - number of times each action was attempted
+        claims - cards claimed through an action that was neither challenged nor blocked
+        blocks - cards claimed through a block that was not challenged
+        lost_claims - cards claimed through an action or block that lost a challenge
+        shown_cards - cards revealed to win a challenge
+        challenges_made, challenges_won, challenges_lost - challenge counts, defending a claim included
+        successful_challenges - challenges made by the player that they won
+        The claims, blocks and lost_claims are about the hand the player holds now: they start over when the
+        hand is replaced by an exchange or by showing a card to win a challenge.
+        """
+        summary = self.player_summaries.get(player_name)
+        if summary is None:
+            summary = {
+                "actions": {},
+                "claims": {},
+                "blocks": {},
+                "lost_claims": {},
+                "shown_cards": set(),
+                "challenges_made": 0,
+                "challenges_won": 0,
+                "challenges_lost": 0,
+                "successful_challenges": 0
+            }
+            self.player_summaries[player_name] = summary
+        return summary
+
+    def summarize(self, log_entry):
+        """Folds a single log entry into the player summaries"""
+        player_name = log_entry["player"]
+        if player_name is None:
+            return
+        action_name = log_entry["action"]
+        challenger = log_entry["challenge"]
+        blocker = log_entry["blocker"]
+        blocker_claim = log_entry["blocker_claim"]
+        block_outcome = log_entry["block_outcome"]
+        card_shown = log_entry["card_shown"]
+        claimed_card = ACTION_CARDS.get(action_name)
+
+        summary = self.get_player_summary(player_name)
+        add_count(summary["actions"], action_name)
+
+        if challenger is None and block_outcome is None:
+            if claimed_card:
+                add_count(summary["claims"], claimed_card)
+        elif block_outcome == "blocker not challenged":
+            add_count(self.get_player_summary(blocker)["blocks"], blocker_claim)
+        elif block_outcome == "blocker lost challenge":
+            add_count(self.get_player_summary(blocker)["lost_claims"], blocker_claim)
+        elif log_entry["challenge_outcome"] == "challenge lost" and claimed_card:
+            add_count(summary["lost_claims"], claimed_card)
+
+        if challenger is not None:
+            # The outcome is always given from the point of view of the player taking the turn. Their opponent
+            # in the challenge is the blocker when the block was challenged, otherwise the challenger
+            opponent = blocker if block_outcome is not None else challenger
+            winner, loser = (player_name, opponent) if log_entry["challenge_outcome"] == "challenge won" else (opponent, player_name)
+            self.get_player_summary(challenger)["challenges_made"] += 1
+            self.get_player_summary(winner)["challenges_won"] += 1
+            self.get_player_summary(loser)["challenges_lost"] += 1
+            if winner == challenger:
+                self.get_player_summary(challenger)["successful_challenges"] += 1
+
+        if card_shown is not None:
+            # The blocker shows the card when they defend a block, otherwise the player who claimed the action does
+            shown_by = blocker if block_outcome == "blocker wins challenge" else player_name
+            self.get_player_summary(shown_by)["shown_cards"].add(card_shown)
+            clear_hand_evidence(self.get_player_summary(shown_by))  # The card went back to the deck for a new one
+
+        if action_name == "Exchange" and log_entry["action_result"] == "performed":
+            clear_hand_evidence(summary)
+
+def add_count(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+def clear_hand_evidence(summary):
+    """Forgets the claims about the player's hand once it has been replaced"""
+    summary["claims"].clear()
+    summary["blocks"].clear()
+    summary["lost_claims"].clear()
@@ -0,0 +1,115 @@
+"""
+Binary file format for learned or solved policies. A policy maps information-set keys (strings) to the
+probabilities of a fixed number of choices. The file is an open addressing hash table: a header, then the 64-bit
+hashes of the keys (BLAKE2b, so they are the same in every process), then the probabilities of every slot
+quantised to bytes summing to 255. Empty slots hold the hash 0. The file is memory-mapped, so workers forked
+for a tournament share its pages instead of each unpickling a copy, and a lookup hashes the key once and
+probes a few slots of a table at most half full.
+"""
+import hashlib
+import mmap
+import os
+import struct
+
+DEFAULT_POLICY_PATH = os.path.join("training_runs", "cfr_policy.bin")
+
+MAGIC = b"CPPF"
+VERSION = 1
+BYTE_ORDER_MARK = 0xFEFF  # Read back as 0xFFFE when the file was written on a machine with the other byte order
+HEADER = struct.Struct("=4sHHQQH6x")  # magic, version, byte order mark, number of slots, number of keys, choices per slot
+QUANTUM = 255  # The quantised probabilities of a slot sum to this
+
+def hash_key(key):
+    """Stable 64-bit hash of an information-set key, never 0 as that marks an empty slot"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+def quantize(probabilities, num_choices):
+    """
+    Rounds the probabilities to bytes that sum to QUANTUM, giving the remainders to the largest fractions
+    so that every choice keeps as much of its probability as a byte allows.
+    """
+    probabilities = list(probabilities[:num_choices]) + [0.0] * (num_choices - len(probabilities))
+    total = sum(max(probability, 0.0) for probability in probabilities)
+    if total <= 0:
+        probabilities, total = [1.0] * num_choices, float(num_choices)
+    scaled = [max(probability, 0.0) * QUANTUM / total for probability in probabilities]
+    quantized = [int(value) for value in scaled]
+    by_remainder = sorted(range(num_choices), key=lambda index: scaled[index] - quantized[index], reverse=True)
+    for index in by_remainder[:QUANTUM - sum(quantized)]:
+        quantized[index] += 1
+    return quantized
+
+def write_policy_file(path, policies, num_choices):
+    """Writes the policies, a dictionary of key -> probabilities of up to num_choices choices"""
+    from array import array
+    num_slots = 1
+    while num_slots < 2 * len(policies):  # At most half full, so probes stay short
+        num_slots *= 2
+    mask = num_slots - 1
+    hashes = array("Q", bytes(8 * num_slots))
+    probabilities = bytearray(num_slots * num_choices)
+    for key, key_probabilities in policies.items():
+        key_hash = hash_key(key)
+        slot = key_hash & mask
+        while hashes[slot]:
+            if hashes[slot] == key_hash:
+                raise ValueError(f"The key {key!r} has the same hash as another key.")
+            slot = (slot + 1) & mask
+        hashes[slot] = key_hash
+        probabilities[slot * num_choices:(slot + 1) * num_choices] = bytes(quantize(key_probabilities, num_choices))
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as policy_file:
+        policy_file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, num_slots, len(policies), num_choices))
+        hashes.tofile(policy_file)
+        policy_file.write(probabilities)
+    os.replace(temp_path, path)
+
+class PolicyFile:
+    def __init__(self, path=DEFAULT_POLICY_PATH):
+        """Maps the policy file into memory"""
+        with open(path, "rb") as policy_file:
+            self.map = mmap.mmap(policy_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order_mark, self.num_slots, self.num_keys, self.num_choices = HEADER.unpack_from(self.map)
+        if (magic, version, byte_order_mark) != (MAGIC, VERSION, BYTE_ORDER_MARK):
+            self.map.close()
+            raise ValueError(f"{path} is not a policy file for this version of the game.")
+        self.mask = self.num_slots - 1
+        hashes_end = HEADER.size + 8 * self.num_slots
+        self.hashes = memoryview(self.map)[HEADER.size:hashes_end].cast("Q")
+        self.probabilities = memoryview(self.map)[hashes_end:hashes_end + self.num_slots * self.num_choices]
+
+    def get(self, key):
+        """Returns the probabilities of the choices for the key, or None if the policy does not have it"""
+        key_hash = hash_key(key)
+        slot = key_hash & self.mask
+        while True:
+            slot_hash = self.hashes[slot]
+            if slot_hash == key_hash:
+                start = slot * self.num_choices
+                return [value / QUANTUM for value in self.probabilities[start:start + self.num_choices]]
+            if not slot_hash:
+                return None
+            slot = (slot + 1) & self.mask
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.num_keys
+
+    def close(self):
+        self.hashes.release()
+        self.probabilities.release()
+        self.map.close()
+
+_loaded_policies = {}
+
+def load_policy_file(path=DEFAULT_POLICY_PATH):
+    """Returns the policy at path, mapped once per process, or None if it has not been generated"""
+    if path not in _loaded_policies:
+        _loaded_policies[path] = PolicyFile(path) if os.path.exists(path) else None
+    return _loaded_policies[path]
@@ -0,0 +1,83 @@
+"""
+Represents the table-level public belief service. The public evidence comes from the per-player summaries
+the LogManager keeps as entries are logged, so it is shared by every AI at the table and each AI only has to
+condition on its own hand. The summaries cover the whole game even when the log only keeps recent entries.
+
+Beliefs are Bayesian posteriors over the composition of a player's hand. The prior is the multivariate
+hypergeometric chance of drawing the hand from the cards the AI cannot see, and every claim multiplies in its
+likelihood: a claim that went unchallenged is made with the card, or as a bluff with the probability in
+BLUFF_LIKELIHOODS, and a claim that lost a challenge rules the card out. Only the claims made since the player's
+hand was last replaced count, as an exchange or a card shown to win a challenge (which is shuffled back into the
+deck) can change the hand. What the player kept from an exchange is not modelled, so those claims are dropped.
+"""
+from itertools import combinations_with_replacement
+from math import comb
+
+from game.rules import CARD_NAMES
+
+# Likelihood of claiming a character without holding it, relative to claiming it with the card.
+# Contessa is bluffed most, as it is the only defence against an assassination
+BLUFF_LIKELIHOODS = {"Duke": 0.4, "Assassin": 0.25, "Captain": 0.35, "Ambassador": 0.3, "Contessa": 0.5}
+
+# Every possible hand of one or two cards, as the number of copies of each character
+HAND_COMPOSITIONS = {
+    hand_size: [tuple(hand.count(card_index) for card_index in range(len(CARD_NAMES)))
+                for hand in combinations_with_replacement(range(len(CARD_NAMES)), hand_size)]
+    for hand_size in (1, 2)
+}
+
+class PublicBeliefService:
+    def __init__(self, log_manager):
+        """Reads the public evidence from the log manager of the table"""
+        self.log_manager = log_manager
+
+    def get_hand_likelihoods(self, player_name, hand_size):
+        """Returns the likelihood of the player's public claims for every hand composition of hand_size cards"""
+        compositions = HAND_COMPOSITIONS[hand_size]
+        summary = self.log_manager.player_summaries.get(player_name)
+        if summary is None:
+            return [1.0] * len(compositions)
+
+        likelihoods = []
+        for composition in compositions:
+            likelihood = 1.0
+            for card_index, card_name in enumerate(CARD_NAMES):
+                held = composition[card_index] > 0
+                claims = summary["claims"].get(card_name, 0) + summary["blocks"].get(card_name, 0)
+                if claims and not held:
+                    likelihood *= BLUFF_LIKELIHOODS[card_name] ** claims
+                if held and summary["lost_claims"].get(card_name):
+                    likelihood = 0.0
+            likelihoods.append(likelihood)
+        return likelihoods
+
+    def get_card_probabilities(self, player_name, unseen_counts, hand_size):
+        """
+        Returns, for every character, the posterior probability that any one of the player's cards is that
+        character. unseen_counts holds the copies of each character the AI cannot see, hand_size the number
+        of cards the player has left.
+        """
+        if hand_size <= 0:
+            return {card_name: 0.0 for card_name in CARD_NAMES}
+        hand_size = min(hand_size, 2)
+        counts = [unseen_counts.get(card_name, 0) for card_name in CARD_NAMES]
+        total_hands = comb(sum(counts), hand_size)
+        compositions = HAND_COMPOSITIONS[hand_size]
+        priors = []
+        for composition in compositions:
+            ways = 1
+            for count, copies in zip(counts, composition):
+                ways *= comb(count, copies)
+            priors.append(ways / total_hands if total_hands else 0.0)
+
+        posteriors = [prior * likelihood for prior, likelihood in zip(priors, self.get_hand_likelihoods(player_name, hand_size))]
+        total = sum(posteriors)
+        if total <= 0:
+            # The evidence contradicts every possible hand, which the bluff likelihoods cannot explain, so keep the prior
+            posteriors, total = priors, sum(priors)
+        if total <= 0:
+            return {card_name: 0.0 for card_name in CARD_NAMES}
+
+        return {card_name: sum(posterior * composition[card_index] for posterior, composition in zip(posteriors, compositions))
+                / (total * hand_size)
+                for card_index, card_name in enumerate(CARD_NAMES)}
@@ -0,0 +1,125 @@
+"""
+Random baseline shared by RandomAIPlayer and the simulation core (game/simulation.py). Uniform floats are
+generated a block at a time by RandomBuffer, by NumPy when it is installed and by the random module otherwise, and
+every decision takes the next one, so a block of turns is drawn in one call instead of several random-module calls
+per decision. The legal actions come from masks precomputed from the rules, so choosing an action does not build
+the list of every legal (action, target) pair.
+"""
+import random
+
+from game.rules import ACTION_RULES
+
+BLOCK_SIZE = 256  # Floats generated at a time, about what a seat draws in a game
+
+# Legal-move masks: Income, Foreign Aid, Tax and Exchange are always legal, and there is one bit for each of the
+# actions that need coins or a target. RANDOM_ACTIONS holds the legal actions of every mask
+ASSASSINATE_LEGAL = 1
+COUP_LEGAL = 2
+STEAL_LEGAL = 4
+RANDOM_ACTIONS = [("Income", "Foreign Aid", "Tax", "Exchange")
+                  + tuple(action_name for bit, action_name in ((ASSASSINATE_LEGAL, "Assassinate"), (COUP_LEGAL, "Coup"), (STEAL_LEGAL, "Steal"))
+                          if mask & bit)
+                  for mask in range(8)]
+STEAL_MIN_COINS = 2  # A random player only steals from targets with a full steal to take
+
+def get_legal_mask(coins, target_coins):
+    """The mask of the actions that need coins or a target, given the coins of the opponents still in the game"""
+    mask = 0
+    if target_coins:
+        if coins >= ACTION_RULES["Assassinate"]["coins_needed"]:
+            mask |= ASSASSINATE_LEGAL
+        if coins >= ACTION_RULES["Coup"]["coins_needed"]:
+            mask |= COUP_LEGAL
+        if max(target_coins) >= STEAL_MIN_COINS:
+            mask |= STEAL_LEGAL
+    return mask
+
+class RandomBuffer:
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        """
+        A buffer seeded with seed. Without a seed it is seeded from the random module when the first number is
+        drawn, so a game seeded through random.seed draws the same numbers whenever the buffer was built.
+        """
+        self.block_size = block_size
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Starts a new stream, dropping the numbers left in the current block"""
+        self.seed = seed
+        self.generator = None
+        self.values = []
+        self.position = 0
+
+    def fill(self):
+        if self.generator is None:
+            seed = self.seed if self.seed is not None else random.getrandbits(64)
+            try:
+                import numpy
+            except ImportError:
+                numpy = None
+            self.generator = numpy.random.default_rng(seed) if numpy is not None else random.Random(seed)
+        if isinstance(self.generator, random.Random):
+            self.values = [self.generator.random() for _ in range(self.block_size)]
+        else:
+            self.values = self.generator.random(self.block_size).tolist()
+        self.position = 0
+
+    def random(self):
+        """The next uniform float in [0, 1)"""
+        if self.position == len(self.values):
+            self.fill()
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def randrange(self, n):
+        """A uniform integer in [0, n)"""
+        return int(self.random() * n)
+
+    def choice(self, sequence):
+        return sequence[int(self.random() * len(sequence))]
+
+    def sample(self, sequence, k):
+        """k distinct items in random order, by a partial Fisher-Yates shuffle"""
+        items = list(sequence)
+        for index in range(k):
+            swap = index + int(self.random() * (len(items) - index))
+            items[index], items[swap] = items[swap], items[index]
+        return items[:k]
+
+class BatchedRandomPolicy:
+    """
+    Policy for the simulation core that plays exactly like RandomAIPlayer: a uniformly random legal action, then a
+    uniformly random target, every challenge and block with probability one half. One policy can play every seat,
+    sharing one buffer, so large baseline matchups draw their random numbers in blocks of block_size. The draws
+    are a small part of a simulated game, so this is about as fast as RandomPolicy, not faster.
+    """
+    uses_legal_actions = False  # SimulationState.play_turn does not need to list the legal actions for it
+
+    def __init__(self, seed=None, block_size=4096):
+        self.buffer = RandomBuffer(seed, block_size)
+
+    def choose_action(self, state, seat, legal_actions=None):
+        targets = [other for other in state.players_remaining() if other != seat]
+        coins = state.coins
+        action_name = self.buffer.choice(RANDOM_ACTIONS[get_legal_mask(coins[seat], [coins[target] for target in targets])])
+        if not ACTION_RULES[action_name]["needs_target"]:
+            return action_name, None
+        if action_name == "Steal":
+            targets = [target for target in targets if coins[target] >= STEAL_MIN_COINS]
+        return action_name, self.buffer.choice(targets)
+
+    def choose_coup_target(self, state, seat, targets):
+        return self.buffer.choice(targets)
+
+    def challenge(self, state, seat, claimant, card_name):
+        return self.buffer.random() < 0.5
+
+    def block(self, state, seat, player, action_name, can_block):
+        return self.buffer.choice(can_block) if self.buffer.random() < 0.5 else None
+
+    def choose_influence_to_lose(self, state, seat):
+        return self.buffer.randrange(len(state.hands[seat]))
+
+    def choose_exchange(self, state, seat, cards, keep):
+        return self.buffer.sample(cards, keep)
@@ -0,0 +1,131 @@
+"""
+The rules of Coup as data. ACTION_RULES holds what every action costs, claims, can be blocked by and does.
+RESOLUTION_TABLE holds the precomputed transitions of the resolution state machine for every action: the claim,
+the challenge window, the block window and the counter-challenge of a block. Game runs the machine on the full
+player and card objects and game/simulation.py runs it on plain lists, so both follow exactly the same rules.
+"""
+
+CARD_NAMES = ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]
+
+# coins_needed - coins the player must have to take the action
+# cost - coins paid when the action is performed
+# gain - coins gained when the action is performed
+# steal - most coins taken from the target
+# kills - the target loses an influence
+# exchange - the player draws up to two cards and returns the same number
+ACTION_RULES = {
+    "Income": {"coins_needed": 0, "required_card": "", "can_block": [], "requires_influence": False,
+               "is_blockable": False, "needs_target": False, "cost": 0, "gain": 1, "steal": 0, "kills": False, "exchange": False},
+    "Foreign Aid": {"coins_needed": 0, "required_card": "", "can_block": ["Duke"], "requires_influence": False,
+                    "is_blockable": True, "needs_target": False, "cost": 0, "gain": 2, "steal": 0, "kills": False, "exchange": False},
+    "Coup": {"coins_needed": 7, "required_card": "", "can_block": [], "requires_influence": False,
+             "is_blockable": False, "needs_target": True, "cost": 7, "gain": 0, "steal": 0, "kills": True, "exchange": False},
+    "Tax": {"coins_needed": 0, "required_card": "Duke", "can_block": [], "requires_influence": True,
+            "is_blockable": False, "needs_target": False, "cost": 0, "gain": 3, "steal": 0, "kills": False, "exchange": False},
+    "Assassinate": {"coins_needed": 3, "required_card": "Assassin", "can_block": ["Contessa"], "requires_influence": True,
+                    "is_blockable": True, "needs_target": True, "cost": 3, "gain": 0, "steal": 0, "kills": True, "exchange": False},
+    "Steal": {"coins_needed": 0, "required_card": "Captain", "can_block": ["Captain", "Ambassador"], "requires_influence": True,
+              "is_blockable": True, "needs_target": True, "cost": 0, "gain": 0, "steal": 2, "kills": False, "exchange": False},
+    "Exchange": {"coins_needed": 0, "required_card": "Ambassador", "can_block": [], "requires_influence": True,
+                 "is_blockable": False, "needs_target": False, "cost": 0, "gain": 0, "steal": 0, "kills": False, "exchange": True}
+}
+
+# A player with this many coins must coup before taking their action
+FORCED_COUP_COINS = 10
+
+def get_action_arguments(action_name):
+    """Returns the Action constructor arguments for the action, taken from its rules"""
+    rules = ACTION_RULES[action_name]
+    return {
+        "coins_needed": rules["coins_needed"],
+        "is_blockable": rules["is_blockable"],
+        "requires_influence": rules["requires_influence"],
+        "action_name": action_name,
+        "required_card": rules["required_card"],
+        "needs_target": rules["needs_target"]
+    }
+
+# Decision windows of the resolution machine
+CHALLENGE_WINDOW = "challenge window"
+BLOCK_WINDOW = "block window"
+COUNTER_CHALLENGE_WINDOW = "counter-challenge window"
+
+# The method of the resolver that decides each window
+WINDOW_HANDLERS = {
+    CHALLENGE_WINDOW: "challenge_window",
+    BLOCK_WINDOW: "block_window",
+    COUNTER_CHALLENGE_WINDOW: "counter_challenge_window"
+}
+
+# Outcomes of the windows
+NOT_CHALLENGED = "not challenged"
+CHALLENGER_WINS = "challenger wins"
+PLAYER_WINS = "player wins"
+PLAYER_WINS_GAME_OVER = "player wins, game over"
+PLAYER_WINS_TARGET_ELIMINATED = "player wins, target eliminated"
+NOT_BLOCKED = "not blocked"
+BLOCKED = "blocked"
+BLOCKER_WINS = "blocker wins"
+BLOCKER_LOSES = "blocker loses"
+BLOCKER_LOSES_TARGET_ELIMINATED = "blocker loses, target eliminated"
+
+# How each resolution ends: the log entry written and whether the action is performed.
+# challenge - the log names the challenger and the cards shown and lost in the challenge
+# target - the log names the target
+# game_over - the game ends with the turn
+TERMINALS = {
+    "challenge lost": {"challenge": True, "challenge_outcome": "challenge lost", "action_result": "not performed",
+                       "block_outcome": None, "target": True, "perform": False, "game_over": False},
+    "challenge won, game over": {"challenge": True, "challenge_outcome": "challenge won", "action_result": "performed",
+                                 "block_outcome": None, "target": True, "perform": False, "game_over": True},
+    "challenge won, target eliminated": {"challenge": True, "challenge_outcome": "challenge won", "action_result": "performed",
+                                         "block_outcome": None, "target": True, "perform": False, "game_over": False},
+    # An action that cannot be blocked is logged without its target or an earlier challenge it survived
+    "performed unblockable": {"challenge": False, "challenge_outcome": None, "action_result": "performed",
+                              "block_outcome": None, "target": False, "perform": True, "game_over": False},
+    "performed": {"challenge": False, "challenge_outcome": None, "action_result": "performed",
+                  "block_outcome": None, "target": True, "perform": True, "game_over": False},
+    "blocked": {"challenge": False, "challenge_outcome": None, "action_result": "not performed",
+                "block_outcome": "blocker not challenged", "target": True, "perform": False, "game_over": False},
+    "block upheld": {"challenge": True, "challenge_outcome": "challenge lost", "action_result": "not performed",
+                     "block_outcome": "blocker wins challenge", "target": True, "perform": False, "game_over": False},
+    "block broken": {"challenge": True, "challenge_outcome": "challenge won", "action_result": "performed",
+                     "block_outcome": "blocker lost challenge", "target": True, "perform": True, "game_over": False},
+    "block broken, target eliminated": {"challenge": True, "challenge_outcome": "challenge won", "action_result": "target eliminated",
+                                        "block_outcome": "blocker lost challenge", "target": True, "perform": False, "game_over": False}
+}
+
+START = "start"
+
+def build_transitions(rules):
+    """Builds the transitions of the resolution machine for one action, keyed by (window, outcome)"""
+    after_claim = BLOCK_WINDOW if rules["is_blockable"] else "performed unblockable"
+    return {
+        START: CHALLENGE_WINDOW if rules["requires_influence"] else after_claim,
+        (CHALLENGE_WINDOW, NOT_CHALLENGED): after_claim,
+        (CHALLENGE_WINDOW, CHALLENGER_WINS): "challenge lost",
+        (CHALLENGE_WINDOW, PLAYER_WINS): after_claim,
+        (CHALLENGE_WINDOW, PLAYER_WINS_GAME_OVER): "challenge won, game over",
+        (CHALLENGE_WINDOW, PLAYER_WINS_TARGET_ELIMINATED): "challenge won, target eliminated",
+        (BLOCK_WINDOW, NOT_BLOCKED): "performed",
+        (BLOCK_WINDOW, BLOCKED): COUNTER_CHALLENGE_WINDOW,
+        (COUNTER_CHALLENGE_WINDOW, NOT_CHALLENGED): "blocked",
+        (COUNTER_CHALLENGE_WINDOW, BLOCKER_WINS): "block upheld",
+        (COUNTER_CHALLENGE_WINDOW, BLOCKER_LOSES): "block broken",
+        (COUNTER_CHALLENGE_WINDOW, BLOCKER_LOSES_TARGET_ELIMINATED): "block broken, target eliminated"
+    }
+
+RESOLUTION_TABLE = {action_name: build_transitions(rules) for action_name, rules in ACTION_RULES.items()}
+
+def resolve_action(action_name, resolver):
+    """
+    Runs the resolution machine for an action. The resolver decides each window through its challenge_window,
+    block_window and counter_challenge_window methods, which return an outcome, and applies the end of the
+    resolution in finish(terminal_name, terminal). Returns the name of the terminal reached.
+    """
+    transitions = RESOLUTION_TABLE[action_name]
+    state = transitions[START]
+    while state in WINDOW_HANDLERS:
+        state = transitions[(state, getattr(resolver, WINDOW_HANDLERS[state])())]
+    resolver.finish(state, TERMINALS[state])
+    return state
@@ -0,0 +1,247 @@
+"""
+Lightweight simulation core for rollouts. A table is a handful of plain lists (hands of card names, coins and the
+deck) and every action is resolved by the same rule table as Game, without Player, Card or Action objects and
+without printing or logging. Every decision is made by the policy of the seat, RandomPolicy plays uniformly
+random legal moves.
+"""
+import random
+
+from game.rules import (ACTION_RULES, CARD_NAMES, FORCED_COUP_COINS, resolve_action, NOT_CHALLENGED, CHALLENGER_WINS,
+                        PLAYER_WINS, PLAYER_WINS_GAME_OVER, PLAYER_WINS_TARGET_ELIMINATED, NOT_BLOCKED, BLOCKED,
+                        BLOCKER_WINS, BLOCKER_LOSES, BLOCKER_LOSES_TARGET_ELIMINATED)
+
+class SimulationState:
+    def __init__(self, hands, coins, deck, rng=None):
+        """
+        hands holds the card names of every seat, coins the coins of every seat and deck the card names left
+        in the deck, drawn from the end.
+        """
+        self.hands = hands
+        self.coins = coins
+        self.deck = deck
+        self.influences_lost = [[] for _ in hands]
+        self.current_player = 0
+        self.current_round = 1
+        self.game_over = False
+        self.rng = rng if rng is not None else random.Random()
+
+    @classmethod
+    def new_game(cls, num_players, rng=None):
+        """Deals a new game: a shuffled deck of three of each character, two cards and two coins per seat"""
+        rng = rng if rng is not None else random.Random()
+        deck = [card_name for card_name in CARD_NAMES for _ in range(3)]
+        rng.shuffle(deck)
+        hands = [[deck.pop(), deck.pop()] for _ in range(num_players)]
+        return cls(hands, [2] * num_players, deck, rng)
+
+    @classmethod
+    def from_game(cls, game, rng=None):
+        """
+        Copies a Game, seat for seat. The copy sees every hand and the order of the deck, so a rollout that
+        should not know the hidden cards has to replace them with a sample first.
+        """
+        state = cls([[card.name for card in player.hand] for player in game.players],
+                    [player.get_coins() for player in game.players],
+                    [card.name for card in game.deck.cards], rng)
+        state.influences_lost = [list(player.influences_lost) for player in game.players]
+        state.current_player = game.current_player_index
+        state.current_round = game.current_round
+        return state
+
+    def copy(self):
+        """Returns an independent copy that shares the random generator"""
+        state = SimulationState([list(hand) for hand in self.hands], list(self.coins), list(self.deck), self.rng)
+        state.influences_lost = [list(lost) for lost in self.influences_lost]
+        state.current_player = self.current_player
+        state.current_round = self.current_round
+        state.game_over = self.game_over
+        return state
+
+    def is_alive(self, seat):
+        return bool(self.hands[seat])
+
+    def players_remaining(self):
+        return [seat for seat, hand in enumerate(self.hands) if hand]
+
+    def is_game_over(self):
+        return len(self.players_remaining()) <= 1
+
+    def get_legal_actions(self, seat):
+        """Returns the (action name, target seat) pairs the seat can take. Steal needs a target with coins"""
+        coins = self.coins[seat]
+        opponents = [other for other in self.players_remaining() if other != seat]
+        legal_actions = []
+        for action_name, rules in ACTION_RULES.items():
+            if coins < rules["coins_needed"]:
+                continue
+            if not rules["needs_target"]:
+                legal_actions.append((action_name, None))
+            elif rules["steal"]:
+                legal_actions.extend((action_name, target) for target in opponents if self.coins[target] > 0)
+            else:
+                legal_actions.extend((action_name, target) for target in opponents)
+        return legal_actions
+
+    def lose_influence(self, seat, policies):
+        """The seat loses one of its cards, chosen by its policy when it has two. Returns the card lost"""
+        hand = self.hands[seat]
+        index = 0 if len(hand) == 1 else policies[seat].choose_influence_to_lose(self, seat)
+        card_name = hand.pop(index)
+        self.influences_lost[seat].append(card_name)
+        return card_name
+
+    def swap_card(self, seat, card_name):
+        """Returns a shown card to the deck, shuffles it and draws a replacement"""
+        self.hands[seat].remove(card_name)
+        self.deck.append(card_name)
+        self.rng.shuffle(self.deck)
+        self.hands[seat].append(self.deck.pop())
+
+    def handle_challenge(self, claimant, challenger, card_name, policies):
+        """
+        Resolves a challenge of the claimant's card. The loser of the challenge loses an influence.
+        Returns whether the claimant won, the card shown and the card eliminated.
+        """
+        if card_name in self.hands[claimant]:
+            self.swap_card(claimant, card_name)
+            return True, card_name, self.lose_influence(challenger, policies)
+        return False, None, self.lose_influence(claimant, policies)
+
+    def perform(self, seat, action_name, target, policies):
+        """Applies the effect of an action that has been allowed to go ahead"""
+        rules = ACTION_RULES[action_name]
+        if rules["kills"] and self.hands[target]:
+            self.lose_influence(target, policies)
+        self.coins[seat] += rules["gain"] - rules["cost"]
+        if rules["steal"]:
+            stolen_coins = min(rules["steal"], self.coins[target])
+            self.coins[target] -= stolen_coins
+            self.coins[seat] += stolen_coins
+        if rules["exchange"] and self.deck:
+            drawn_cards = [self.deck.pop() for _ in range(min(2, len(self.deck)))]
+            cards = self.hands[seat] + drawn_cards
+            kept_cards = policies[seat].choose_exchange(self, seat, cards, len(self.hands[seat]))
+            for card_name in kept_cards:
+                cards.remove(card_name)
+            self.hands[seat] = list(kept_cards)
+            for card_name in cards:
+                self.deck.append(card_name)
+                self.rng.shuffle(self.deck)
+
+    def play_turn(self, policies):
+        """Plays the turn of the current player, coups first when they have too many coins as Game does"""
+        seat = self.current_player
+        if self.coins[seat] >= FORCED_COUP_COINS:
+            targets = [other for other in self.players_remaining() if other != seat]
+            self.perform(seat, "Coup", policies[seat].choose_coup_target(self, seat, targets), policies)
+        if self.is_alive(seat):
+            policy = policies[seat]
+            # Policies that choose from their own legal-move tables say so, and are spared building the list
+            legal_actions = self.get_legal_actions(seat) if getattr(policy, "uses_legal_actions", True) else None
+            action_name, target = policy.choose_action(self, seat, legal_actions)
+            resolve_action(action_name, SimulationResolver(self, policies, seat, action_name, target))
+
+    def next_player(self):
+        """Advances to the next seat still in the game, counting rounds the same way as Game"""
+        num_players = len(self.hands)
+        self.current_player = (self.current_player + 1) % num_players
+        while not self.hands[self.current_player]:
+            self.current_player = (self.current_player + 1) % num_players
+            if self.current_player == 0:
+                self.current_round += 1
+
+    def play(self, policies, max_rounds=100):
+        """Plays the game out. Returns the winning seat, or None if the round limit stopped the game first"""
+        while not self.is_game_over():
+            if self.current_round > max_rounds:
+                return None
+            self.play_turn(policies)
+            if self.game_over:
+                break
+            self.current_round += 1
+            self.next_player()
+        remaining_players = self.players_remaining()
+        return remaining_players[0] if len(remaining_players) == 1 else None
+
+class SimulationResolver:
+    """Decides the challenge and block windows of one action in a SimulationState, for resolve_action"""
+    def __init__(self, state, policies, seat, action_name, target):
+        self.state = state
+        self.policies = policies
+        self.seat = seat
+        self.action_name = action_name
+        self.target = target
+        self.blocker = None
+        self.blocker_claim = None
+
+    def target_eliminated(self):
+        return self.target is not None and not self.state.is_alive(self.target)
+
+    def challenge_window(self):
+        state, seat = self.state, self.seat
+        card_name = ACTION_RULES[self.action_name]["required_card"]
+        for other in state.players_remaining():
+            if other != seat and self.policies[other].challenge(state, other, seat, card_name):
+                if not state.handle_challenge(seat, other, card_name, self.policies)[0]:
+                    return CHALLENGER_WINS
+                if state.is_game_over():
+                    return PLAYER_WINS_GAME_OVER
+                if self.target_eliminated():
+                    return PLAYER_WINS_TARGET_ELIMINATED
+                return PLAYER_WINS
+        return NOT_CHALLENGED
+
+    def block_window(self):
+        """Anyone can block Foreign Aid, the other actions can only be blocked by their target"""
+        state, seat = self.state, self.seat
+        can_block = ACTION_RULES[self.action_name]["can_block"]
+        if self.target is None:
+            blockers = [other for other in state.players_remaining() if other != seat]
+        else:
+            blockers = [self.target] if self.target != seat else []
+        for blocker in blockers:
+            card_name = self.policies[blocker].block(state, blocker, seat, self.action_name, can_block)
+            if card_name:
+                self.blocker = blocker
+                self.blocker_claim = card_name
+                return BLOCKED
+        return NOT_BLOCKED
+
+    def counter_challenge_window(self):
+        state, seat = self.state, self.seat
+        if not self.policies[seat].challenge(state, seat, self.blocker, self.blocker_claim):
+            return NOT_CHALLENGED
+        if state.handle_challenge(self.blocker, seat, self.blocker_claim, self.policies)[0]:
+            return BLOCKER_WINS
+        if self.target_eliminated():
+            return BLOCKER_LOSES_TARGET_ELIMINATED
+        return BLOCKER_LOSES
+
+    def finish(self, terminal_name, terminal):
+        if terminal["game_over"]:
+            self.state.game_over = True
+        if terminal["perform"]:
+            self.state.perform(self.seat, self.action_name, self.target, self.policies)
+
+class RandomPolicy:
+    """Makes every decision uniformly at random, choosing among the legal (action, target) pairs"""
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def choose_action(self, state, seat, legal_actions):
+        return self.rng.choice(legal_actions)
+
+    def choose_coup_target(self, state, seat, targets):
+        return self.rng.choice(targets)
+
+    def challenge(self, state, seat, claimant, card_name):
+        return self.rng.random() < 0.5
+
+    def block(self, state, seat, player, action_name, can_block):
+        return self.rng.choice(can_block) if self.rng.random() < 0.5 else None
+
+    def choose_influence_to_lose(self, state, seat):
+        return self.rng.randrange(len(state.hands[seat]))
+
+    def choose_exchange(self, state, seat, cards, keep):
+        return self.rng.sample(cards, keep)
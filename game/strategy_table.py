@@ -0,0 +1,160 @@
+"""
+Lookup table of challenge and block strategies, solved offline by training/cfr_solver.py. Every decision taken
+while an action resolves is an information set: the kind of decision, the action, the card claimed, what the
+deciding player holds of it, and the public state abstracted to coin buckets and both players' card counts.
+The file is a small header followed by one fixed-width record per information set holding the probability of
+each choice as unsigned 16-bit integers. It is memory-mapped, so looking a decision up is a single index
+calculation, and a record of zeros marks an information set the solver never reached.
+"""
+import itertools
+import mmap
+import os
+import random
+import struct
+
+from game.rules import ACTION_RULES
+
+DEFAULT_TABLE_PATH = os.path.join("training_runs", "strategy_table.bin")
+
+MAGIC = b"CPST"
+VERSION = 1
+BYTE_ORDER_MARK = 0xFEFF  # Read back as 0xFFFE when the file was written on a machine with the other byte order
+HEADER = struct.Struct("=4sHHII")  # magic, version, byte order mark, number of information sets, choices per record
+
+# Kinds of decision
+CLAIM = "claim"  # The player takes the action, or Income instead
+CHALLENGE = "challenge"  # The opponent challenges the claim
+BLOCK = "block"  # The opponent blocks, and with which card
+COUNTER_CHALLENGE = "counter-challenge"  # The player challenges the block
+
+def build_decision_points():
+    """Every (kind, action, card) decision of the resolution, in table order"""
+    decision_points = []
+    for action_name, rules in ACTION_RULES.items():
+        if rules["requires_influence"] or rules["is_blockable"]:
+            decision_points.append((CLAIM, action_name, rules["required_card"]))
+        if rules["requires_influence"]:
+            decision_points.append((CHALLENGE, action_name, rules["required_card"]))
+        if rules["is_blockable"]:
+            decision_points.append((BLOCK, action_name, ""))
+            for card_name in rules["can_block"]:
+                decision_points.append((COUNTER_CHALLENGE, action_name, card_name))
+    return decision_points
+
+DECISION_POINTS = build_decision_points()
+DECISION_INDEX = {decision_point: index for index, decision_point in enumerate(DECISION_POINTS)}
+MAX_CHOICES = 1 + max(len(rules["can_block"]) for rules in ACTION_RULES.values())
+
+# Coins are bucketed at the amounts that change what a player can do: Steal takes up to 2, Assassinate costs 3,
+# Coup costs 7 and 10 forces a coup
+COIN_BUCKETS = [0, 1, 2, 3, 3, 4, 4, 5, 5, 5, 6]
+NUM_COIN_BUCKETS = COIN_BUCKETS[-1] + 1
+NUM_HOLDINGS = 4  # Copies of the card held (0 to 2), or for a block which of the two blocking cards are held
+NUM_INFO_SETS = len(DECISION_POINTS) * NUM_HOLDINGS * NUM_COIN_BUCKETS * NUM_COIN_BUCKETS * 2 * 2
+SCALE = 0xFFFF  # A probability of 1
+
+def get_choices(kind, action_name):
+    """The choices of a decision: decline or claim, pass or challenge, or no block and the blocking cards"""
+    if kind == BLOCK:
+        return [None] + ACTION_RULES[action_name]["can_block"]
+    return [False, True]
+
+def get_holding(kind, action_name, card_name, hand):
+    """What the deciding player holds of the cards that matter to the decision, hand being card names"""
+    if kind == BLOCK:
+        return sum(1 << index for index, blocking_card in enumerate(ACTION_RULES[action_name]["can_block"]) if blocking_card in hand)
+    return min(hand.count(card_name), 2)
+
+def get_info_set(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards):
+    """
+    The abstracted information set from the deciding player's point of view, hand being their card names:
+    (decision, holding, own coin bucket, opponent coin bucket, own cards, opponent cards)
+    """
+    return (DECISION_INDEX[(kind, action_name, card_name)], get_holding(kind, action_name, card_name, hand),
+            COIN_BUCKETS[min(my_coins, len(COIN_BUCKETS) - 1)], COIN_BUCKETS[min(opponent_coins, len(COIN_BUCKETS) - 1)],
+            min(len(hand), 2), min(opponent_cards, 2))
+
+def get_index(info_set):
+    """Position of an information set's record, counted in records"""
+    decision, holding, my_bucket, opponent_bucket, my_cards, opponent_cards = info_set
+    return (((((decision * NUM_HOLDINGS + holding) * NUM_COIN_BUCKETS + my_bucket) * NUM_COIN_BUCKETS + opponent_bucket)
+             * 2 + my_cards - 1) * 2 + opponent_cards - 1)
+
+def get_key(info_set):
+    """The information set as a string key, for policy files that are looked up by hash"""
+    decision, holding, my_bucket, opponent_bucket, my_cards, opponent_cards = info_set
+    kind, action_name, card_name = DECISION_POINTS[decision]
+    return f"{kind}|{action_name}|{card_name}|{holding}|{my_bucket}|{opponent_bucket}|{my_cards}|{opponent_cards}"
+
+def info_set_index(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards):
+    """Position of an information set's record, counted in records"""
+    return get_index(get_info_set(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards))
+
+def info_set_key(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards):
+    """The string key of an information set"""
+    return get_key(get_info_set(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards))
+
+def iter_info_sets():
+    """Every information set in table order"""
+    return itertools.product(range(len(DECISION_POINTS)), range(NUM_HOLDINGS), range(NUM_COIN_BUCKETS),
+                             range(NUM_COIN_BUCKETS), (1, 2), (1, 2))
+
+def sample_choice(strategy, rng=random):
+    """Draws the index of a choice from its probabilities"""
+    threshold = rng.random() * sum(strategy)
+    for index, probability in enumerate(strategy):
+        threshold -= probability
+        if threshold < 0:
+            return index
+    return len(strategy) - 1
+
+def write_strategy_table(path, strategies):
+    """
+    Writes the table. strategies holds MAX_CHOICES probabilities for every information set, in the order of
+    info_set_index, all 0 for an information set that was never reached.
+    """
+    from array import array
+    records = array("H", [round(min(max(probability, 0.0), 1.0) * SCALE) for probability in strategies])
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, NUM_INFO_SETS, MAX_CHOICES))
+        records.tofile(table_file)
+    os.replace(temp_path, path)
+
+class StrategyTable:
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        """Maps the table file into memory and checks that it matches this version of the rules"""
+        with open(path, "rb") as table_file:
+            self.map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order_mark, num_info_sets, max_choices = HEADER.unpack_from(self.map)
+        if (magic, version, byte_order_mark, num_info_sets, max_choices) != (MAGIC, VERSION, BYTE_ORDER_MARK, NUM_INFO_SETS, MAX_CHOICES):
+            self.map.close()
+            raise ValueError(f"{path} is not a strategy table for this version of the game.")
+        self.records = memoryview(self.map)[HEADER.size:].cast("H")
+
+    def get_strategy(self, kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards):
+        """
+        Returns the probability of each of get_choices(kind, action_name), or None if the solver never reached
+        the decision. hand holds the deciding player's card names.
+        """
+        start = info_set_index(kind, action_name, card_name, hand, my_coins, opponent_coins, opponent_cards) * MAX_CHOICES
+        values = self.records[start:start + len(get_choices(kind, action_name))]
+        if not any(values):
+            return None
+        return [value / SCALE for value in values]
+
+    def close(self):
+        self.records.release()
+        self.map.close()
+
+_loaded_tables = {}
+
+def load_strategy_table(path=DEFAULT_TABLE_PATH):
+    """Returns the table at path, mapped once per process, or None if it has not been generated"""
+    if path not in _loaded_tables:
+        _loaded_tables[path] = StrategyTable(path) if os.path.exists(path) else None
+    return _loaded_tables[path]
@@ -1,10 +1,17 @@
 import random
 import os
 from game.game import Game
+from game.arena import GameArena
 from players.player import Player
-from players.ai_player import *
+from players.registry import AI_TYPE_CODES, create_ai_player, describe_ai_types, resolve_ai_name
 from cards.deck import Deck
-import matplotlib.pyplot as plt
+
+# Action log entries kept during AI-only runs. Older entries only survive in the per-player summaries
+AI_LOG_WINDOW = 50
+
+def input_ai_type(seat):
+    """Asks for the AI type of an AI player, listing the types of the registry"""
+    return input(f"Select AI type for AI Player {seat} ({describe_ai_types()}): ")
 
 def setup_game():
     deck = Deck()
@@ -26,58 +33,49 @@ def setup_game():
         return None
 
     for i in range(num_ai_players):
-        ai_type = input(f"Select AI type for AI Player {i+1} (1 - AIPlayerMonte, 2 - AIPlayerOldMonte, 3 - AIPlayerRuleBased, 4 - RandomAIPlayer): ")
-        if ai_type == "1":
-            player = AIPlayerMonte(f"AI Player {i+1}")
-        elif ai_type == "2":
-            player = AIPlayerOldMonte(f"AI Player {i+1}")
-        elif ai_type == "3":
-            player = AIPlayerRuleBased(f"AI Player {i+1}")
-        else:
-            player = RandomAIPlayer(f"AI Player {i+1}")
+        ai_type = input_ai_type(i+1)
+        player = create_ai_player(resolve_ai_name(ai_type, default="RandomAIPlayer"), name=f"AI Player {i+1}")
         game.players.append(player)
 
     game.setup()
-
-    for player in game.players:
-        if isinstance(player, AIPlayerMonte) or isinstance(player, AIPlayerOldMonte) or isinstance(player, AIPlayerRuleBased) or isinstance(player, RandomAIPlayer):
-            player.game = game
-            player.setup()
+    game.setup_ai_players()
 
     return game
 
 
 def setup_ai_game(num_players, ai_types):
+    """Builds an AI-only game, with every AI player set up for the dealt hands"""
     deck = Deck()
     game = Game(deck)
     ai_players = []
     for i in range(num_players):
-        if ai_types[i] == "1":
-            player = AIPlayerMonte(f"AI Player Monte Carlo {i+1}")
-        elif ai_types[i] == "2":
-            player = AIPlayerOldMonte(f"Old Monte AI Player {i+1}")
-        elif ai_types[i] == "3":
-            player = AIPlayerRuleBased(f"Rule based AI Playe {i+1}")
-        else:
-            player = RandomAIPlayer(f"Random AI Player {i+1}")
+        player = create_ai_player(resolve_ai_name(ai_types[i], default="RandomAIPlayer"), seat=i+1)
         player.game = game
         ai_players.append(player)
     game.players = ai_players
     game.setup()
+    game.setup_ai_players()
     return game
 
+def setup_ai_arena(num_players, ai_types):
+    """Builds a reusable table for AI-only games. The deck, players and game are reset in place between games"""
+    ai_players = []
+    for i in range(num_players):
+        ai_players.append(create_ai_player(resolve_ai_name(ai_types[i], default="RandomAIPlayer"), seat=i+1))
+    return GameArena(ai_players, log_window=AI_LOG_WINDOW)
+
 def run_multiple_games():
     num_games = int(input("Enter the number of games to run: "))
     num_players = int(input("Enter the number of AI players (2-4): "))
     ai_types = []
     for i in range(num_players):
-        ai_type = input(f"Select AI type for AI Player {i+1} (1 - AIPlayerMonte, 2 - AIPlayerOldMonte, 3 - AIPlayerRuleBased, 4 - RandomAIPlayer): ")
+        ai_type = input_ai_type(i+1)
         ai_types.append(ai_type)
     win_counts = {}
+    arena = setup_ai_arena(num_players, ai_types)
     for i in range(num_games):
         print(f"\nGame {i+1}")
-        game = setup_ai_game(num_players, ai_types)
-        game.play_game()
+        game = arena.play_game()
 
         remaining_players = game.players_remaining()
         if remaining_players:
@@ -94,7 +92,7 @@ def evaluate_ai_performance():
     num_players = int(input("Enter the number of AI players (2-4): "))
     ai_types = []
     for i in range(num_players):
-        ai_type = input(f"Select AI type for AI Player {i+1} (1 - AIPlayerMonte, 2 - AIPlayerOldMonte, 3 - AIPlayerRuleBased, 4 - RandomAIPlayer): ")
+        ai_type = input_ai_type(i+1)
         ai_types.append(ai_type)
     
     win_counts = {}
@@ -102,11 +100,23 @@ def evaluate_ai_performance():
     total_actions = {}
     total_challenges = {}
     total_blocks = {}
+    arena = setup_ai_arena(num_players, ai_types)
+    ai_names = [resolve_ai_name(ai_type, default="RandomAIPlayer") for ai_type in ai_types]
+
+    # Every game is also appended to the binary result store, in batches
+    from evaluation.result_store import ResultStore, build_result
+    result_store = ResultStore(os.path.join("evaluations", "results.bin"))
+    seed_source = random.SystemRandom()
+    pending_results = []
     
     for i in range(num_games):
         print(f"\nEvaluating Game {i+1}")
-        game = setup_ai_game(num_players, ai_types)
-        game.play_game()
+        seed = seed_source.randrange(2 ** 63)
+        game = arena.play_game(seed)
+        pending_results.append(build_result(game, ai_names, seed))
+        if len(pending_results) >= 100:
+            result_store.append(pending_results)
+            pending_results = []
         remaining_players = game.players_remaining()
         if remaining_players:
             winner = remaining_players[0]
@@ -119,6 +129,7 @@ def evaluate_ai_performance():
             total_actions[player.name] = total_actions.get(player.name, 0) + player.actions_played
             total_challenges[player.name] = total_challenges.get(player.name, 0) + player.challenges_made
             total_blocks[player.name] = total_blocks.get(player.name, 0) + player.blocks_made
+    result_store.append(pending_results)
     
     print("\nEvaluation Results:")
     print("Win Counts:")
@@ -145,71 +156,33 @@ def evaluate_ai_performance():
         avg_blocks = blocks / num_games
         print(f"{player}: {avg_blocks:.2f} blocks")
     
-    # Create a folder for evaluations if it doesn't exist
+    # Save the aggregated results, then render the charts as a separate report step
     evaluations_folder = "evaluations"
-    if not os.path.exists(evaluations_folder):
-        os.makedirs(evaluations_folder)
-    
-    # Generate win percentage graph and save it to evaluations folder
-    plt.figure(figsize=(14, 8))  # Increase figure size
-    plt.bar(win_counts.keys(), [count / num_games * 100 for count in win_counts.values()])
-    plt.xlabel("AI Player")
-    plt.ylabel("Win Percentage")
-    plt.title("Win Percentage of AI Players")
-    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-    plt.tight_layout()  # Adjust layout to prevent clipping of labels
-    win_percentage_file = os.path.join(evaluations_folder, "win_percentage.png")
-    plt.savefig(win_percentage_file)
-    plt.close()
-    
-    # Generate average turns played graph and save it to evaluations folder
-    plt.figure(figsize=(14, 8))  # Increase figure size
-    plt.bar(total_turns.keys(), [turns / num_games for turns in total_turns.values()])
-    plt.xlabel("AI Player")
-    plt.ylabel("Average Turns Played")
-    plt.title("Average Turns Played by AI Players")
-    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-    plt.tight_layout()  # Adjust layout to prevent clipping of labels
-    avg_turns_file = os.path.join(evaluations_folder, "average_turns_played.png")
-    plt.savefig(avg_turns_file)
-    plt.close()
-    
-    # Generate average actions played graph and save it to evaluations folder
-    plt.figure(figsize=(14, 8))  # Increase figure size
-    plt.bar(total_actions.keys(), [actions / num_games for actions in total_actions.values()])
-    plt.xlabel("AI Player")
-    plt.ylabel("Average Actions Played")
-    plt.title("Average Actions Played by AI Players")
-    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-    plt.tight_layout()  # Adjust layout to prevent clipping of labels
-    avg_actions_file = os.path.join(evaluations_folder, "average_actions_played.png")
-    plt.savefig(avg_actions_file)
-    plt.close()
-    
-    # Generate average challenges made graph and save it to evaluations folder
-    plt.figure(figsize=(14, 8))  # Increase figure size
-    plt.bar(total_challenges.keys(), [challenges / num_games for challenges in total_challenges.values()])
-    plt.xlabel("AI Player")
-    plt.ylabel("Average Challenges Made")
-    plt.title("Average Challenges Made by AI Players")
-    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-    plt.tight_layout()  # Adjust layout to prevent clipping of labels
-    avg_challenges_file = os.path.join(evaluations_folder, "average_challenges_made.png")
-    plt.savefig(avg_challenges_file)
-    plt.close()
-    
-    # Generate average blocks made graph and save it to evaluations folder
-    plt.figure(figsize=(14, 8))  # Increase figure size
-    plt.bar(total_blocks.keys(), [blocks / num_games for blocks in total_blocks.values()])
-    plt.xlabel("AI Player")
-    plt.ylabel("Average Blocks Made")
-    plt.title("Average Blocks Made by AI Players")
-    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-    plt.tight_layout()  # Adjust layout to prevent clipping of labels
-    avg_blocks_file = os.path.join(evaluations_folder, "average_blocks_made.png")
-    plt.savefig(avg_blocks_file)
-    plt.close()
-    
+    results = {
+        "num_games": num_games,
+        "win_counts": win_counts,
+        "total_turns": total_turns,
+        "total_actions": total_actions,
+        "total_challenges": total_challenges,
+        "total_blocks": total_blocks
+    }
+    from evaluation.report import write_results, render_report  # Keeps the report code out of interactive startup
+    write_results(os.path.join(evaluations_folder, "results.json"), results)
+    render_report(results, evaluations_folder)
+
+def evaluate_ai_performance_sequential():
+    max_games = int(input("Enter the maximum number of games to evaluate: "))
+    num_players = int(input("Enter the number of AI players (2-4): "))
+    ai_types = []
+    for i in range(num_players):
+        ai_type = input_ai_type(i+1)
+        ai_types.append(ai_type)
+
+    from evaluation.sequential import run_sequential_evaluation, print_sequential_results
+    summary = run_sequential_evaluation(setup_ai_game, ai_types, max_games=max_games)
+    print_sequential_results(summary, AI_TYPE_CODES)
+    return summary
+
 def main():
     while True:
         print("\nMenu:")
@@ -217,8 +190,9 @@ def main():
         print("2. Run game with AI players only")
         print("3. Run multiple games")
         print("4. Evaluate AI performance")
-        print("5. Quit")
-        choice = input("Enter your choice (1-5): ")
+        print("5. Evaluate AI performance with early stopping")
+        print("6. Quit")
+        choice = input("Enter your choice (1-6): ")
         if choice == "1":
             game = setup_game()
             game.play_game()
@@ -226,7 +200,7 @@ def main():
             num_players = int(input("Enter the number of AI players (2-4): "))
             ai_types = []
             for i in range(num_players):
-                ai_type = input(f"Select AI type for AI Player {i+1} (1 - AIPlayerMonte, 2 - AIPlayerOldMonte, 3 - AIPlayerRuleBased, 4 - RandomAIPlayer): ")
+                ai_type = input_ai_type(i+1)
                 ai_types.append(ai_type)
             game = setup_ai_game(num_players, ai_types)
             game.play_game()
@@ -235,6 +209,8 @@ def main():
         elif choice == "4":
             evaluate_ai_performance()
         elif choice == "5":
+            evaluate_ai_performance_sequential()
+        elif choice == "6":
             break
         else:
             print("Invalid choice. Please try again.")
@@ -2,12 +2,73 @@
 Represents the ai class which inherits from the player class.
 """
 import random
-from collections import defaultdict
+from players.beliefs import CardBeliefs
+from players.particle_filter import ParticleFilterTracking
 from players.player import Player
-from actions.action import Income, Coup, ForeignAid, Tax, Assassinate, Steal, Exchange
+from actions.action import ACTION_CLASSES, Income, Coup, ForeignAid, Tax, Assassinate, Steal, Exchange, get_legal_targets, get_opponents
+from game.endgame_table import load_endgame_table
+from game.random_policy import RANDOM_ACTIONS, STEAL_MIN_COINS, RandomBuffer, get_legal_mask
+from game.rules import ACTION_RULES
+from game.strategy_table import BLOCK, CHALLENGE, COUNTER_CHALLENGE, get_choices, load_strategy_table, sample_choice
+from game.events import InfluenceLost
 
 
-class AIPlayerOldMonte(Player):
+def rank_actions(actions, action_scores, last_actions, endgame_scores=None):
+    """
+    Orders the actions from most to least preferred. The endgame table decides when it has scores, otherwise the
+    heuristic scores do, except that the 2nd best action goes first when the last 3 actions were the same.
+    """
+    if endgame_scores:
+        return sorted(actions, key=lambda action: endgame_scores.get(action.action_name, -1.0), reverse=True)
+    ranked_actions = sorted(actions, key=lambda action: action_scores.get(action.action_name, float('-inf')), reverse=True)
+    if len(last_actions) >= 3 and len(set(last_actions[-3:])) == 1 and len(ranked_actions) > 1:
+        ranked_actions[0], ranked_actions[1] = ranked_actions[1], ranked_actions[0]
+    return ranked_actions
+
+
+def update_card_beliefs(card_probabilities, public_beliefs, game_state, unseen_counts, player_names=None):
+    """
+    Sets the beliefs about every opponent (or those in player_names) to their Bayesian posterior given the
+    public evidence, see PublicBeliefService.get_card_probabilities. unseen_counts holds the copies of each
+    character the AI cannot see, as returned by get_deck_probabilities. Both slots of a card hold the same probability.
+    """
+    for player_name in (card_probabilities if player_names is None else player_names):
+        hand_size = game_state["players"][player_name]["card_count"]
+        card_probabilities.set_player(player_name, public_beliefs.get_card_probabilities(player_name, unseen_counts, hand_size))
+
+
+TARGETED_ACTIONS = ["Coup", "Assassinate", "Steal"]
+
+
+def get_legal_target_names(game, player):
+    """The names of the legal targets of every targeted action, see actions.action.get_legal_targets"""
+    return {action_name: {target.name for target in get_legal_targets(game, player, action_name)} for action_name in TARGETED_ACTIONS}
+
+
+class TargetMatrix:
+    """
+    Scores of every opponent as the target of every action that needs one, built once per decision.
+    scores holds a row per action name with one entry per target, None where the target is not valid.
+    """
+    def __init__(self, targets, scores):
+        self.targets = targets
+        self.scores = scores
+
+    def has_target(self, action_name):
+        return any(score is not None for score in self.scores[action_name])
+
+    def get_best_target(self, action_name):
+        """Returns the game state data of the best valid target and its score, the first one on a tie"""
+        best_target = None
+        best_score = float('-inf')
+        for target, score in zip(self.targets, self.scores[action_name]):
+            if score is not None and score > best_score:
+                best_target = target
+                best_score = score
+        return best_target, best_score
+
+
+class AIPlayerOldMonte(ParticleFilterTracking, Player):
     """
     AIPlayer that uses Bayesian inference and Monte Carlo Simulation for initializing,
     and then relies heavily on a rule-based system to perform actions.
@@ -17,6 +78,7 @@ class AIPlayerOldMonte(Player):
         self.game = game
         self.card_probabilities = None
         self.challenge_threshold = 2
+        self.num_simulations = 256  # Particles tracking the opponents' hands
         self.card_values = {
             "Duke": 5,
             "Captain": 4,
@@ -29,11 +91,14 @@ class AIPlayerOldMonte(Player):
     def setup(self):
         """Setups the AIPlayer"""
         self.initialize_card_probabilities()
+        self.start_particle_filter()
 
     def reset(self):
         """Resets the AIPlayer"""
         super().reset()
-        self.initialize_card_probabilities()
+        self.card_probabilities = None  # Initialised again by setup once the new hand is dealt
+        self.stop_particle_filter()
+        self.last_actions = []
 
     def is_human(self):
         """Differentiates between AI and Human players"""
@@ -49,16 +114,9 @@ class AIPlayerOldMonte(Player):
         """Calculates the card probabilities for each player card based on what cards the AI has."""
         deck_probabilities = self.get_deck_probabilities(game_state)
         total_cards_in_deck = sum(deck_probabilities.values())
-        probabilities = {}
+        opponent_names = [player_name for player_name in game_state["players"] if player_name != self.name]
 
-        for player_name in game_state["players"]:
-            if player_name != self.name:
-                player_probabilities = {}
-                for card_name in ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]:
-                    player_probabilities[card_name] = [deck_probabilities[card_name] / total_cards_in_deck] * 2
-                probabilities[player_name] = player_probabilities
-
-        return probabilities
+        return CardBeliefs(opponent_names, {card_name: count / total_cards_in_deck for card_name, count in deck_probabilities.items()})
 
     def get_deck_probabilities(self, game_state):
         """Adjusts the AI knowledge on the current cards remaining in play based on what cards the AI has and what cards are eliminated."""
@@ -78,97 +136,47 @@ class AIPlayerOldMonte(Player):
 
         return deck_probabilities
 
-    def update_card_probabilities(self, player, action, game_state):
-        """Updates the card probabilities based on the action log information"""
-        if action.action_result == 'performed' and not action.challenge:
-            card_name = action.required_card
-
-            for i in range(2):
-                if self.card_probabilities[player.name][card_name][i] < 1:
-                    self.card_probabilities[player.name][card_name][i] += 0.1
-                    break
-
-        if action.block_outcome == 'blocker not challenged' and not action.challenge:
-            card_name = action.blocker_claim
-
-            for i in range(2):
-                if self.card_probabilities[player.name][card_name][i] < 1:
-                    self.card_probabilities[player.name][card_name][i] += 0.1
-                    break
-
-        if action.card_shown:
-            card_name = action.card_shown
-            deck_probabilities = self.get_deck_probabilities(game_state)
-            deck_probabilities[card_name] += 1
-            total_cards_in_deck = sum(deck_probabilities.values())
-
-            for card in ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]:
-                for i in range(2):
-                    self.card_probabilities[player.name][card][i] = deck_probabilities[card] / total_cards_in_deck
-
-        for player_name in self.card_probabilities:
-            for card in self.card_probabilities[player_name]:
-                total_probability = sum(self.card_probabilities[player_name][card])
-                for i in range(2):
-                    self.card_probabilities[player_name][card][i] /= total_probability
+    def update_card_probabilities(self, action_log):
+        """Updates the card probabilities from the particle filter, or from the public evidence in the action log"""
+        if not self.card_probabilities or not action_log:
+            return
 
-        simulated_probabilities = self.monte_carlo_simulation(game_state)
-        for player_name in simulated_probabilities:
-            for card_name in simulated_probabilities[player_name]:
-                for i in range(2):
-                    self.card_probabilities[player_name][card_name][i] = (
-                        self.card_probabilities[player_name][card_name][i] + simulated_probabilities[player_name][card_name][i]
-                    ) / 2
+        if self.particle_filter is not None:
+            self.particle_filter.update_beliefs(self.card_probabilities)
+            return
+        game_state = self.game.get_game_state_for_ai(self)
+        update_card_beliefs(self.card_probabilities, self.game.public_beliefs, game_state, self.get_deck_probabilities(game_state))
 
     def choose_action(self):
         game_state = self.game.get_game_state_for_ai(self)
+        self.update_card_probabilities(game_state["action_log"])
         available_actions = self.get_available_actions(game_state)
 
         # Evaluate actions based on game state and probabilities
         action_scores = self.evaluate_actions(game_state, available_actions)
 
-        # Check if the last 3 actions are the same
-        if len(self.last_actions) >= 3 and len(set(self.last_actions[-3:])) == 1:
-            # Choose the 2nd best action
-            sorted_actions = sorted(available_actions, key=lambda action: action_scores[action.action_name], reverse=True)
-            if len(sorted_actions) > 1:
-                best_action = sorted_actions[1]
-            else:
-                best_action = sorted_actions[0]
-        else:
-            # Choose the action with the highest score
-            best_action = max(available_actions, key=lambda action: action_scores.get(action.action_name, float('-inf')))
-
-        if best_action.needs_target:
-            best_target = self.choose_target(best_action)
-            if best_target is None:
-                available_actions.remove(best_action)
-                if available_actions:
-                    return self.choose_action()
-                else:
-                    return None
-            best_action.target = best_target
+        # Take the most preferred action that has a valid target, if it needs one
+        for action in rank_actions(available_actions, action_scores, self.last_actions):
+            if action.needs_target:
+                action.target = self.get_target_player(game_state, action)
+                if action.target is None:
+                    continue
+            self.last_actions.append(action.action_name)
+            return action
 
-        self.last_actions.append(best_action.action_name)
-        return best_action
+        return None
 
     def choose_target(self, action=None):
         """Chooses the best target available. This is calculated in evaluate_target"""
         game_state = self.game.get_game_state_for_ai(self)
+        return self.get_target_player(game_state, action)
 
-        if action:
-            available_targets = self.get_available_targets(game_state, action.action_name)
-        else:
-            available_targets = self.get_available_targets(game_state, None)
-
-        if not available_targets:
+    def get_target_player(self, game_state, action):
+        """Returns the player the action should target, or None if it has no valid target"""
+        best_target, _ = self.evaluate_targets(game_state, action)
+        if best_target is None:
             return None
 
-        if action.action_name == "Coup":
-            best_target, _ = self.evaluate_targets(game_state, action)
-        else:
-            best_target, _ = self.evaluate_targets(game_state, action)
-
         for player in self.game.players:
             if player.name == best_target['name']:
                 return player
@@ -178,6 +186,7 @@ class AIPlayerOldMonte(Player):
     def wants_to_challenge(self, action, blocker=False):
         """Decides whether to challenge or not challenge the action/blocker"""
         game_state = self.game.get_game_state_for_ai(self)
+        self.update_card_probabilities(game_state["action_log"])
         low_chance = 0.3  # Probability threshold below which AI will challenge
 
         if blocker:
@@ -248,16 +257,10 @@ class AIPlayerOldMonte(Player):
         return actions
 
     def get_available_targets(self, game_state, action_name, min_coins=0):
-        """Gets all valid targets for the chosen action"""
-        available_targets = []
-
-        for player in game_state['players'].values():
-            if player['name'] != self.name and not player['is_eliminated']:
-                if action_name == "Steal" and player['coins'] < min_coins:
-                    continue
-                available_targets.append(player)
-
-        return available_targets
+        """Gets the legal targets for the chosen action, every opponent still in the game when action_name is None"""
+        targets = get_opponents(self.game, self) if action_name is None else get_legal_targets(self.game, self, action_name)
+        return [game_state['players'][target.name] for target in targets
+                if action_name != "Steal" or target.get_coins() >= min_coins]
 
     def evaluate_actions(self, game_state, actions):
         """Evaluates the actions based on set criteria, using a scoring system for each action"""
@@ -412,122 +415,14 @@ class AIPlayerOldMonte(Player):
             print(f"{self.name} is not blocking the {action.action_name} action.")
             return None
 
-    def monte_carlo_simulation(self, game_state, num_simulations=500):
-        """Runs a monte carlo simulation for num_simulation times"""
-        simulated_probabilities = defaultdict(lambda: defaultdict(lambda: [0] * 2))
-
-        for _ in range(num_simulations):
-            simulated_state = self.simulate_game_state(game_state)
-            simulated_action_log = self.simulate_action_log(simulated_state, game_state["action_log"])
-            updated_probabilities = self.update_probabilities_from_action_log(simulated_state, simulated_action_log)
-
-            for player_name in updated_probabilities:
-                for card_name in updated_probabilities[player_name]:
-                    simulated_probabilities[player_name][card_name][0] += updated_probabilities[player_name][card_name][0]
-                    simulated_probabilities[player_name][card_name][1] += updated_probabilities[player_name][card_name][1]
-
-        for player_name in simulated_probabilities:
-            for card_name in simulated_probabilities[player_name]:
-                if num_simulations > 0:
-                    simulated_probabilities[player_name][card_name][0] /= num_simulations
-                    simulated_probabilities[player_name][card_name][1] /= num_simulations
-                else:
-                    simulated_probabilities[player_name][card_name] = [0, 0]
 
-        return simulated_probabilities
 
-    def simulate_game_state(self, game_state):
-        """Simulates the game state to decide what decisions are good"""
-        simulated_state = {
-            "players": {},
-            "all_lost_influences": game_state["all_lost_influences"][:],
-        }
 
-        remaining_cards = self.get_remaining_cards(game_state)
-        random.shuffle(remaining_cards)
-
-        for player_name in game_state["players"]:
-            if player_name != self.name:
-                player_hand = remaining_cards[:2]
-                remaining_cards = remaining_cards[2:]
-                simulated_state["players"][player_name] = {
-                    "hand": player_hand,
-                    "coins": game_state["players"][player_name]["coins"],
-                    "is_eliminated": game_state["players"][player_name]["is_eliminated"],
-                    "influences_lost": game_state["players"][player_name]["influences_lost"][:],
-                }
-            else:
-                simulated_state["players"][player_name] = {
-                    "hand": [card.name for card in self.hand],
-                    "coins": self.get_coins(),
-                    "is_eliminated": self.is_eliminated,
-                    "influences_lost": self.influences_lost[:],
-                }
-
-        return simulated_state
-
-    def simulate_action_log(self, simulated_state, action_log):
-        """Simulates all the log entries in the action log"""
-        simulated_action_log = []
-        for action in action_log:
-            simulated_action = action.copy()
-            if action["player"] != self.name:
-                simulated_action["player"] = action["player"]
-            if action["target"] is not None and action["target"] != self.name:
-                simulated_action["target"] = action["target"]
-            simulated_action_log.append(simulated_action)
-        return simulated_action_log
-
-    def update_probabilities_from_action_log(self, simulated_state, simulated_action_log):
-        """Update the probabilities of each player card based on the action log"""
-        updated_probabilities = defaultdict(lambda: defaultdict(lambda: [0] * 2))
-
-        for action in simulated_action_log:
-            player_name = action["player"]
-            target_name = action["target"]
-            action_name = action["action"]
-            challenge = action["challenge"]
-            challenge_outcome = action["challenge_outcome"]
-            blocker = action["blocker"]
-            blocker_claim = action["blocker_claim"]
-            block_outcome = action["block_outcome"]
-            card_shown = action["card_shown"]
-
-            if action_name in ["Tax", "Assassinate", "Steal", "Exchange"]:
-                if challenge is None and block_outcome is None:
-                    updated_probabilities[player_name][action_name][0] += 1
-                elif challenge is not None and challenge_outcome == "challenge_lost":
-                    updated_probabilities[player_name][action_name][0] += 1
-                    updated_probabilities[challenge][action_name][0] -= 1
-                elif block_outcome == "block_failed":
-                    updated_probabilities[player_name][action_name][0] += 1
-                    updated_probabilities[blocker][blocker_claim][0] -= 1
-
-            if card_shown is not None:
-                updated_probabilities[player_name][card_shown][0] = 1
-                updated_probabilities[player_name][card_shown][1] = 0
-
-        return updated_probabilities
-
-    def get_remaining_cards(self, game_state):
-        """Gets the remaining cards"""
-        all_cards = ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"] * 3
-        for player_data in game_state["players"].values():
-            if "hand" in player_data:
-                for card in player_data["hand"]:
-                    all_cards.remove(card)
-        for card_name in game_state["all_lost_influences"]:
-            all_cards.remove(card_name)
-        return all_cards
-    
-
-
-class AIPlayerMonte(Player):
+class AIPlayerMonte(ParticleFilterTracking, Player):
     """
     AIPlayerMonte is an AI player that uses a combination of probabilistic reasoning and Monte Carlo
     simulations to make decisions in the game.
     """
-
     def __init__(self, name, game=None):
         """
         Initialize the AIPlayerMonte with the given name and game.
@@ -538,6 +433,8 @@ class AIPlayerMonte(Player):
         self.challenge_threshold = 0.3  # Threshold for challenging actions
         self.bluff_threshold = 0.4  # Threshold for bluffing blocks
         self.block_threshold = 0.5  # Threshold for blocking actions
+        self.num_simulations = 256  # Particles tracking the opponents' hands
+        self.endgame_table = load_endgame_table()  # Solved 2-player endgames, None until training/endgame_solver.py has run
         self.card_values = {
             "Duke": 5,
             "Captain": 4,
@@ -556,19 +453,51 @@ class AIPlayerMonte(Player):
         }  # Action weight mapping for evaluation
         self.last_actions = []
 
+    def get_profile(self):
+        """
+        Return the tunable parameters of the AIPlayerMonte as a profile dictionary.
+        """
+        return {
+            "action_weights": dict(self.action_weights),
+            "card_values": dict(self.card_values),
+            "challenge_threshold": self.challenge_threshold,
+            "bluff_threshold": self.bluff_threshold,
+            "block_threshold": self.block_threshold
+        }
+
+    def apply_profile(self, profile):
+        """
+        Overwrite the tunable parameters with the values in the profile. Missing entries keep their current value.
+        """
+        self.action_weights.update(profile.get("action_weights", {}))
+        self.card_values.update(profile.get("card_values", {}))
+        self.challenge_threshold = profile.get("challenge_threshold", self.challenge_threshold)
+        self.bluff_threshold = profile.get("bluff_threshold", self.bluff_threshold)
+        self.block_threshold = profile.get("block_threshold", self.block_threshold)
+
     def setup(self):
         """
-        Setup the AIPlayerMonte by initializing the card probabilities.
+        Setup the AIPlayerMonte by initializing the card probabilities and the particle filter.
         """
         self.initialize_card_probabilities()
+        self.start_particle_filter()
 
     def reset(self):
         """
-        Reset the AIPlayerMonte by resetting its parent class and re-initializing the card probabilities.
+        Reset the AIPlayerMonte by resetting its parent class and clearing the card probabilities,
+        which setup initializes again once the new hand is dealt.
+        Tuned parameters are kept so a configured player can be reused across games.
         """
         super().reset()
-        if self.game is not None:
-            self.initialize_card_probabilities()
+        self.card_probabilities = None
+        self.stop_particle_filter()
+        self.last_actions = []
+
+    def is_human(self):
+        """
+        Indicate that this player is an AI player, not a human player.
+        """
+        return False
 
     def initialize_card_probabilities(self):
         """
@@ -583,19 +512,9 @@ class AIPlayerMonte(Player):
         """
         deck_probabilities = self.get_deck_probabilities(game_state)
         total_cards_in_deck = sum(deck_probabilities.values())
-        probabilities = {}
-
-        for player_name, player_data in game_state["players"].items():
-            if player_name != self.name:
-                player_probabilities = {}
-                for card_name in ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]:
-                    player_probabilities[card_name] = [
-                        deck_probabilities[card_name] / total_cards_in_deck,
-                        deck_probabilities[card_name] / total_cards_in_deck
-                    ]
-                probabilities[player_name] = player_probabilities
+        opponent_names = [player_name for player_name in game_state["players"] if player_name != self.name]
 
-        return probabilities
+        return CardBeliefs(opponent_names, {card_name: count / total_cards_in_deck for card_name, count in deck_probabilities.items()})
 
     def get_deck_probabilities(self, game_state):
         """
@@ -622,73 +541,17 @@ class AIPlayerMonte(Player):
     def update_card_probabilities(self, action_log):
         """
         Update the card probabilities for all players based on the action log.
+        The particle filter follows every event of the game. Without it, the public evidence summarised once per
+        log entry and shared through the table's PublicBeliefService gives the posterior directly.
         """
         if not self.card_probabilities or not action_log:
             return
 
-        for log_entry in action_log:
-            player_name = log_entry["player"]
-            action_name = log_entry["action"]
-            challenge = log_entry["challenge"]
-            challenge_outcome = log_entry["challenge_outcome"]
-            blocker = log_entry["blocker"]
-            blocker_claim = log_entry["blocker_claim"]
-            block_outcome = log_entry["block_outcome"]
-            card_shown = log_entry["card_shown"]
-
-            if player_name is not None and player_name != self.name:
-                if challenge is None and block_outcome is None:
-                    if action_name in ["Tax", "Assassinate", "Steal", "Exchange"]:
-                        self.card_probabilities[player_name][action_name][0] *= 1.2
-                        self.card_probabilities[player_name][action_name][1] *= 1.2
-                elif block_outcome == "blocker not challenged":
-                    if blocker != self.name:
-                        self.card_probabilities[blocker][blocker_claim][0] *= 1.2
-                        self.card_probabilities[blocker][blocker_claim][1] *= 1.2
-                elif challenge is not None:
-                    if challenge != self.name:
-                        if challenge_outcome == "challenge_won":
-                            self.card_probabilities[player_name][action_name][0] *= 0.8
-                            self.card_probabilities[player_name][action_name][1] *= 0.8
-                        elif challenge_outcome == "challenge_lost":
-                            self.card_probabilities[challenge][action_name][0] *= 0.8
-                            self.card_probabilities[challenge][action_name][1] *= 0.8
-
-            if card_shown is not None:
-                self.card_probabilities[player_name][card_shown] = [1, 0]
-
-        self.normalize_probabilities()
-        self.update_probabilities_with_monte_carlo(action_log)
-
-    def normalize_probabilities(self):
-        """
-        Normalize the card probabilities for all players.
-        """
-        # GPT solution to normalizing probabilities
-        for player_name, probs in self.card_probabilities.items():
-            total_probability = sum(sum(probab) for probab in probs.values())
-            if total_probability > 0:
-                for card, probab in probs.items():
-                    probs[card] = [
-                        probab[0] / total_probability,
-                        probab[1] / total_probability
-                    ]
-
-    def update_probabilities_with_monte_carlo(self, action_log):
-        """
-        Update the card probabilities using Monte Carlo simulations.
-        """
+        if self.particle_filter is not None:
+            self.particle_filter.update_beliefs(self.card_probabilities)
+            return
         game_state = self.game.get_game_state_for_ai(self)
-        simulated_probabilities = self.monte_carlo_simulation(game_state, action_log)
-
-        for player_name in simulated_probabilities:
-            for card_name in simulated_probabilities[player_name]:
-                self.card_probabilities[player_name][card_name][0] = (
-                    self.card_probabilities[player_name][card_name][0] + simulated_probabilities[player_name][card_name][0]
-                ) / 2
-                self.card_probabilities[player_name][card_name][1] = (
-                    self.card_probabilities[player_name][card_name][1] + simulated_probabilities[player_name][card_name][1]
-                ) / 2
+        update_card_beliefs(self.card_probabilities, self.game.public_beliefs, game_state, self.get_deck_probabilities(game_state))
 
     def choose_action(self):
         game_state = self.game.get_game_state_for_ai(self)
@@ -696,49 +559,36 @@ class AIPlayerMonte(Player):
 
         self.update_card_probabilities(action_log)
 
-        available_actions = self.get_available_actions(game_state)
-        valid_actions = []
-        for action in available_actions:
-            if self.can_perform_action(action):
-                valid_actions.append(action)
-
-        if not valid_actions:
-            return None
+        target_matrix = self.build_target_matrix(game_state)
+        available_actions = self.get_available_actions(game_state, target_matrix)
+        valid_actions = [action for action in available_actions if self.can_perform_action(action, game_state, target_matrix)]
 
-        action_scores = self.evaluate_actions(game_state, valid_actions)
+        action_scores = self.evaluate_actions(game_state, valid_actions, target_matrix)
+        # With only one opponent left, the solved endgame table ranks the actions
+        endgame_scores = self.endgame_table.score_actions(self, game_state) if self.endgame_table else None
 
-        # Check if the last 3 actions are the same
-        if len(self.last_actions) >= 3 and len(set(self.last_actions[-3:])) == 1:
-            # Choose the 2nd best action
-            sorted_actions = sorted(valid_actions, key=lambda action: action_scores[action.action_name], reverse=True)
-            if len(sorted_actions) > 1:
-                chosen_action = sorted_actions[1]
-            else:
-                chosen_action = sorted_actions[0]
-        else:
-            chosen_action = max(valid_actions, key=lambda action: action_scores.get(action.action_name, float('-inf')))
-
-        if chosen_action.needs_target:
-            best_target = self.choose_target(chosen_action)
-            if best_target is None:
-                valid_actions.remove(chosen_action)
-                if valid_actions:
-                    return self.choose_action()
-                else:
-                    return None
-            chosen_action.target = best_target
+        # Take the most preferred action that has a valid target, if it needs one
+        for action in rank_actions(valid_actions, action_scores, self.last_actions, endgame_scores):
+            if action.needs_target:
+                action.target = self.get_target_player(game_state, action, target_matrix)
+                if action.target is None:
+                    continue
+            self.last_actions.append(action.action_name)
+            return action
 
-        self.last_actions.append(chosen_action.action_name)
-        return chosen_action
+        return None
 
-    def can_perform_action(self, action):
+    def can_perform_action(self, action, game_state=None, target_matrix=None):
         """
         Check if the given action can be performed based on the game state.
         """
         if action.coins_needed > self.get_coins():
             return False
-        if action.needs_target and not self.get_available_targets(self.game.get_game_state_for_ai(self), action.action_name):
-            return False
+        if action.needs_target:
+            if target_matrix is None:
+                target_matrix = self.build_target_matrix(game_state or self.game.get_game_state_for_ai(self))
+            if not target_matrix.has_target(action.action_name):
+                return False
         if action.requires_influence and not self.has_card(action.required_card):
             return False
         return True
@@ -751,20 +601,15 @@ class AIPlayerMonte(Player):
         action_log = game_state["action_log"]
 
         self.update_card_probabilities(action_log)
+        return self.get_target_player(game_state, action)
 
-        if action:
-            available_targets = self.get_available_targets(game_state, action.action_name)
-        else:
-            available_targets = self.get_available_targets(game_state, None)
-
-        if not available_targets:
-            return None
-
-        if action.action_name == "Coup":
-            best_target, _ = self.evaluate_targets(game_state, action)
-        else:
-            best_target, _ = self.evaluate_targets(game_state, action)
-
+    def get_target_player(self, game_state, action, target_matrix=None):
+        """
+        Return the player the action should target, or None if it has no valid target.
+        """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
+        best_target, _ = target_matrix.get_best_target(action.action_name)
         if best_target is None:
             return None
 
@@ -844,45 +689,50 @@ class AIPlayerMonte(Player):
 
         return random.choice(block_options)
 
-    def get_available_actions(self, game_state):
+    def get_available_actions(self, game_state, target_matrix=None):
         """
         Get the available actions that the AI can perform based on the game state.
         """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
         actions = [Income(self.game, self), ForeignAid(self.game, self), Tax(self.game, self), Exchange(self.game, self)]
 
         if self.get_coins() >= 3:
-            if any(self.get_available_targets(game_state, "Assassinate")):
+            if target_matrix.has_target("Assassinate"):
                 actions.append(Assassinate(self.game, self, None))
 
         if self.get_coins() >= 7:
-            if any(self.get_available_targets(game_state, "Coup")):
+            if target_matrix.has_target("Coup"):
                 actions.append(Coup(self.game, self, None))
 
-        if any(self.get_available_targets(game_state, "Steal", min_coins=2)):
+        if target_matrix.has_target("Steal"):
             actions.append(Steal(self.game, self, None))
 
         return actions
 
     def get_available_targets(self, game_state, action_name, min_coins=0):
         """
-        Get all valid targets for the chosen action based on the game state.
+        Get the legal targets for the chosen action, every opponent still in the game when action_name is None.
+        Only targets with at least 2 coins are worth a Steal.
         """
+        targets = get_opponents(self.game, self) if action_name is None else get_legal_targets(self.game, self, action_name)
         available_targets = []
 
-        for player_data in game_state['players'].values():
-            if player_data['name'] != self.name and not player_data['is_eliminated']:
-                if action_name == "Steal" and player_data['coins'] < 2:
-                    continue
-                if action_name != "Steal" and player_data['coins'] < min_coins:
-                    continue
-                available_targets.append(player_data)
+        for target in targets:
+            if action_name == "Steal" and target.get_coins() < 2:
+                continue
+            if action_name != "Steal" and target.get_coins() < min_coins:
+                continue
+            available_targets.append(game_state['players'][target.name])
 
         return available_targets
 
-    def evaluate_actions(self, game_state, actions):
+    def evaluate_actions(self, game_state, actions, target_matrix=None):
         """
         Evaluate the available actions based on predefined weights and probabilistic reasoning.
         """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
         action_scores = {}
         num_players = len(game_state['players'])
         hand_score = 0
@@ -910,7 +760,7 @@ class AIPlayerMonte(Player):
                     score *= 0.8
 
             if action.action_name in ["Assassinate", "Steal"]:
-                best_target, target_score = self.evaluate_targets(game_state, action)
+                best_target, target_score = target_matrix.get_best_target(action.action_name)
                 if self.has_card(action.required_card):
                     score += target_score
                 else:
@@ -926,54 +776,59 @@ class AIPlayerMonte(Player):
 
         return action_scores
 
-    def evaluate_targets(self, game_state, action):
+    def build_target_matrix(self, game_state):
         """
-        Evaluate all the targets for the given action based on probabilistic reasoning.
+        Score every opponent as the target of every action that needs one, in a single pass over the opponents.
+        Only legal targets are scored, and for Steal only those with at least 2 coins.
         """
-        target_scores = {}
-        best_target = None
-        best_score = float('-inf')
+        targets = self.get_available_targets(game_state, None)
+        legal_targets = get_legal_target_names(self.game, self)
+        scores = {action_name: [] for action_name in TARGETED_ACTIONS}
+        for target in targets:
+            for action_name in TARGETED_ACTIONS:
+                if target['name'] not in legal_targets[action_name] or (action_name == "Steal" and target['coins'] < 2):
+                    scores[action_name].append(None)
+                else:
+                    scores[action_name].append(self.score_target(target, action_name))
+        return TargetMatrix(targets, scores)
 
-        for target in self.get_available_targets(game_state, action.action_name):
-            score = 0
+    def score_target(self, target, action_name):
+        """
+        Score a target for the given action based on probabilistic reasoning.
+        """
+        score = 0
+
+        if len(target['influences_lost']) == 1:
+            score += 2
+            score += target['coins'] / 5
 
+        if action_name == "Coup":
             if len(target['influences_lost']) == 1:
-                score += 2
+                score += target['coins'] / 3
+            else:
                 score += target['coins'] / 5
 
-            if action.action_name == "Coup":
-                if len(target['influences_lost']) == 1:
-                    score += target['coins'] / 3
-                else:
-                    score += target['coins'] / 5
+        if action_name == "Assassinate":
+            if self.card_probabilities is not None:
+                block_probability = 0
+                for i in range(2):
+                    block_probability += self.card_probabilities[target['name']]["Contessa"][i]
+                score -= block_probability * 2
+                score += target['coins'] / 5
+            else:
+                score -= 0.5
 
-            if action.action_name == "Assassinate":
-                if self.card_probabilities is not None:
-                    block_probability = 0
+        if action_name == "Steal":
+            if self.card_probabilities is not None:
+                block_probability = 0
+                for card in ["Captain", "Ambassador"]:
                     for i in range(2):
-                        block_probability += self.card_probabilities[target['name']]["Contessa"][i]
-                    score -= block_probability * 2
-                    score += target['coins'] / 5
-                else:
-                    score -= 0.5
-
-            if action.action_name == "Steal":
-                if self.card_probabilities is not None:
-                    block_probability = 0
-                    for card in ["Captain", "Ambassador"]:
-                        for i in range(2):
-                            block_probability += self.card_probabilities[target['name']][card][i]
-                    score -= block_probability * 2
-                else:
-                    score -= 0.5
-
-            if score > best_score:
-                best_target = target
-                best_score = score
-
-            target_scores[target['name']] = score
+                        block_probability += self.card_probabilities[target['name']][card][i]
+                score -= block_probability * 2
+            else:
+                score -= 0.5
 
-        return best_target, best_score
+        return score
 
     def choose_influence_to_die(self):
         """
@@ -1048,123 +903,7 @@ class AIPlayerMonte(Player):
         else:
             return None
 
-    def monte_carlo_simulation(self, game_state, action_log, num_simulations=1000):
-        """
-        Run Monte Carlo simulations to estimate the card probabilities.
-        """
-        simulated_probabilities = defaultdict(lambda: defaultdict(lambda: [0] * 2))
-
-        for _ in range(num_simulations):
-            simulated_state = self.simulate_game_state(game_state)
-            simulated_action_log = self.simulate_action_log(action_log)
-            updated_probabilities = self.update_probabilities_from_action_log(simulated_state, simulated_action_log)
 
-            for player_name in updated_probabilities:
-                for card_name in updated_probabilities[player_name]:
-                    simulated_probabilities[player_name][card_name][0] += updated_probabilities[player_name][card_name][0]
-                    simulated_probabilities[player_name][card_name][1] += updated_probabilities[player_name][card_name][1]
-
-        for player_name in simulated_probabilities:
-            for card_name in simulated_probabilities[player_name]:
-                if num_simulations > 0:
-                    simulated_probabilities[player_name][card_name][0] /= num_simulations
-                    simulated_probabilities[player_name][card_name][1] /= num_simulations
-                else:
-                    simulated_probabilities[player_name][card_name] = [0, 0]
-
-        return simulated_probabilities
-
-    def simulate_game_state(self, game_state):
-        """
-        Simulate the game state by randomly distributing cards to opponents.
-        """
-        simulated_state = {
-            "players": {},
-            "all_lost_influences": game_state["all_lost_influences"][:],
-        }
-
-        remaining_cards = self.get_remaining_cards(game_state)
-        random.shuffle(remaining_cards)
-
-        for player_name, player_data in game_state["players"].items():
-            if player_name != self.name:
-                player_hand = remaining_cards[:2]
-                remaining_cards = remaining_cards[2:]
-                simulated_state["players"][player_name] = {
-                    "hand": player_hand,
-                    "coins": player_data["coins"],
-                    "is_eliminated": player_data["is_eliminated"],
-                    "influences_lost": player_data["influences_lost"][:],
-                }
-            else:
-                simulated_state["players"][player_name] = {
-                    "hand": [card.name for card in self.hand],
-                    "coins": self.get_coins(),
-                    "is_eliminated": self.is_eliminated,
-                    "influences_lost": self.influences_lost[:],
-                }
-
-        return simulated_state
-
-    def simulate_action_log(self, action_log):
-        """
-        Simulate the action log by copying relevant entries.
-        """
-        simulated_action_log = []
-        for action in action_log:
-            simulated_action = action.copy()
-            if action["player"] != self.name:
-                simulated_action["player"] = action["player"]
-            if action["target"] is not None and action["target"] != self.name:
-                simulated_action["target"] = action["target"]
-            simulated_action_log.append(simulated_action)
-        return simulated_action_log
-
-    def update_probabilities_from_action_log(self, simulated_state, simulated_action_log):
-        """
-        Update the card probabilities based on the simulated action log.
-        """
-        updated_probabilities = defaultdict(lambda: defaultdict(lambda: [0] * 2))
-
-        for action in simulated_action_log:
-            player_name = action["player"]
-            target_name = action["target"]
-            action_name = action["action"]
-            challenge = action["challenge"]
-            challenge_outcome = action["challenge_outcome"]
-            blocker = action["blocker"]
-            blocker_claim = action["blocker_claim"]
-            block_outcome = action["block_outcome"]
-            card_shown = action["card_shown"]
-
-            if action_name in ["Tax", "Assassinate", "Steal", "Exchange"]:
-                if challenge is None and block_outcome is None:
-                    updated_probabilities[player_name][action_name][0] += 1
-                elif challenge is not None and challenge_outcome == "challenge_lost":
-                    updated_probabilities[player_name][action_name][0] += 1
-                    updated_probabilities[challenge][action_name][0] -= 1
-                elif block_outcome == "block_failed":
-                    updated_probabilities[player_name][action_name][0] += 1
-                    updated_probabilities[blocker][blocker_claim][0] -= 1
-
-            if card_shown is not None:
-                updated_probabilities[player_name][card_shown][0] = 1
-                updated_probabilities[player_name][card_shown][1] = 0
-
-        return updated_probabilities
-
-    def get_remaining_cards(self, game_state):
-        """
-        Get the remaining cards in the deck based on the current game state.
-        """
-        all_cards = ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"] * 3
-        for player_data in game_state["players"].values():
-            if "hand" in player_data:
-                for card in player_data["hand"]:
-                    all_cards.remove(card)
-        for card_name in game_state["all_lost_influences"]:
-            all_cards.remove(card_name)
-        return all_cards
 
 
 class AIPlayerRuleBased(Player):
@@ -1173,6 +912,13 @@ class AIPlayerRuleBased(Player):
     to make decisions in the game. It calculates probabilities for opponent cards and
     adjusts its card values based on the game state.
     """
+    DEFAULT_CARD_VALUES = {
+        "Duke": 5,
+        "Captain": 4,
+        "Contessa": 3,
+        "Assassin": 2,
+        "Ambassador": 1
+    }
 
     def __init__(self, name, game=None):
         """
@@ -1182,14 +928,9 @@ class AIPlayerRuleBased(Player):
         self.game = game
         self.card_probabilities = None  # Probabilities of opponent cards
         self.challenge_threshold = 2  # Round threshold for challenging
-        self.card_values = {
-            "Duke": 5,
-            "Captain": 4,
-            "Contessa": 3,
-            "Assassin": 2,
-            "Ambassador": 1
-        }  # Card value mapping for decision-making
+        self.card_values = dict(self.DEFAULT_CARD_VALUES)  # Card value mapping for decision-making
         self.last_actions = []
+        self.endgame_table = load_endgame_table()  # Solved 2-player endgames, None until training/endgame_solver.py has run
 
     def setup(self):
         """
@@ -1199,10 +940,14 @@ class AIPlayerRuleBased(Player):
 
     def reset(self):
         """
-        Reset the AIPlayerRuleBased by resetting its parent class and re-initializing the card probabilities.
+        Reset the AIPlayerRuleBased by resetting its parent class and clearing the card probabilities,
+        which setup initializes again once the new hand is dealt.
+        The card values are restored as they change during the game.
         """
         super().reset()
-        self.initialize_card_probabilities()
+        self.card_probabilities = None
+        self.card_values = dict(self.DEFAULT_CARD_VALUES)
+        self.last_actions = []
 
     def is_human(self):
         """
@@ -1224,16 +969,9 @@ class AIPlayerRuleBased(Player):
         """
         deck_probabilities = self.get_deck_probabilities(game_state)
         total_cards_in_deck = sum(deck_probabilities.values())
-        probabilities = {}
-
-        for player_name in game_state["players"]:
-            if player_name != self.name:
-                player_probabilities = {}
-                for card_name in ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]:
-                    player_probabilities[card_name] = [deck_probabilities[card_name] / total_cards_in_deck] * 2
-                probabilities[player_name] = player_probabilities
+        opponent_names = [player_name for player_name in game_state["players"] if player_name != self.name]
 
-        return probabilities
+        return CardBeliefs(opponent_names, {card_name: count / total_cards_in_deck for card_name, count in deck_probabilities.items()})
 
     def get_deck_probabilities(self, game_state):
         """
@@ -1255,48 +993,17 @@ class AIPlayerRuleBased(Player):
         for card_name in game_state["all_lost_influences"]:
             deck_probabilities[card_name] -= 1
 
-        print(deck_probabilities)
         return deck_probabilities
 
-    def update_card_probabilities(self, player, action, game_state):
+    def update_card_probabilities(self, action_log):
         """
-        Update the card probabilities for the given player based on the performed action and game state.
+        Update the card probabilities for all players from the public evidence in the action log.
         """
-        if action.action_result == 'performed' and not action.challenge:
-            card_name = action.required_card
-
-            # Update the probability of the required card for the player
-            for i in range(2):
-                if self.card_probabilities[player.name][card_name][i] < 1:
-                    self.card_probabilities[player.name][card_name][i] += 0.1
-                    break
-
-        if action.block_outcome == 'blocker not challenged' and not action.challenge:
-            card_name = action.blocker_claim
-
-            # Update the probability of the blocker's claimed card for the player
-            for i in range(2):
-                if self.card_probabilities[player.name][card_name][i] < 1:
-                    self.card_probabilities[player.name][card_name][i] += 0.1
-                    break
-
-        if action.card_shown:
-            card_name = action.card_shown
-            deck_probabilities = self.get_deck_probabilities(game_state)
-            deck_probabilities[card_name] += 1
-            total_cards_in_deck = sum(deck_probabilities.values())
-
-            # Update the probabilities for all cards based on the shown card
-            for card in ["Duke", "Assassin", "Captain", "Ambassador", "Contessa"]:
-                for i in range(2):
-                    self.card_probabilities[player.name][card][i] = deck_probabilities[card] / total_cards_in_deck
+        if not self.card_probabilities or not action_log:
+            return
 
-        # Normalize the probabilities for the player
-        for player_name in self.card_probabilities:
-            for card in self.card_probabilities[player_name]:
-                total_probability = sum(self.card_probabilities[player_name][card])
-                for i in range(2):
-                    self.card_probabilities[player_name][card][i] /= total_probability
+        game_state = self.game.get_game_state_for_ai(self)
+        update_card_beliefs(self.card_probabilities, self.game.public_beliefs, game_state, self.get_deck_probabilities(game_state))
 
     def update_card_values_based_on_round(self):
         """
@@ -1316,56 +1023,43 @@ class AIPlayerRuleBased(Player):
     def choose_action(self):
         self.update_card_values_based_on_round()
         game_state = self.game.get_game_state_for_ai(self)
-        available_actions = self.get_available_actions(game_state)
+        self.update_card_probabilities(game_state["action_log"])
+        target_matrix = self.build_target_matrix(game_state)
+        available_actions = self.get_available_actions(game_state, target_matrix)
 
         # Evaluate actions based on game state and probabilities
-        action_scores = self.evaluate_actions(game_state, available_actions)
-
-        # Check if the last 3 actions are the same
-        if len(self.last_actions) >= 3 and len(set(self.last_actions[-3:])) == 1:
-            # Choose the 2nd best action
-            sorted_actions = sorted(available_actions, key=lambda action: action_scores[action.action_name], reverse=True)
-            if len(sorted_actions) > 1:
-                best_action = sorted_actions[1]
-            else:
-                best_action = sorted_actions[0]
-        else:
-            # Choose the action with the highest score
-            best_action = max(available_actions, key=lambda action: action_scores.get(action.action_name, float('-inf')))
-
-        if best_action.needs_target:
-            best_target = self.choose_target(best_action)
-            if best_target is None:
-                available_actions.remove(best_action)
-                if available_actions:
-                    return self.choose_action()
-                else:
-                    return None
-            best_action.target = best_target
+        action_scores = self.evaluate_actions(game_state, available_actions, target_matrix)
+        # With only one opponent left, the solved endgame table ranks the actions
+        endgame_scores = self.endgame_table.score_actions(self, game_state) if self.endgame_table else None
+
+        # Take the most preferred action that has a valid target, if it needs one
+        for action in rank_actions(available_actions, action_scores, self.last_actions, endgame_scores):
+            if action.needs_target:
+                action.target = self.get_target_player(game_state, action, target_matrix)
+                if action.target is None:
+                    continue
+            self.last_actions.append(action.action_name)
+            return action
 
-        self.last_actions.append(best_action.action_name)
-        return best_action
+        return None
 
     def choose_target(self, action=None):
         """
         Choose the best target for the given action based on predefined rules.
         """
         game_state = self.game.get_game_state_for_ai(self)
+        return self.get_target_player(game_state, action)
 
-        if action:
-            available_targets = self.get_available_targets(game_state, action.action_name)
-        else:
-            available_targets = self.get_available_targets(game_state, None)
-
-        if not available_targets:
+    def get_target_player(self, game_state, action, target_matrix=None):
+        """
+        Return the player the action should target, or None if it has no valid target.
+        """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
+        best_target, _ = target_matrix.get_best_target(action.action_name)
+        if best_target is None:
             return None
 
-        if action.action_name == "Coup":
-            # If the AI player is forced to coup, select the best target for coup
-            best_target, _ = self.evaluate_targets(game_state, action)
-        else:
-            best_target, _ = self.evaluate_targets(game_state, action)
-
         # Find the Player object corresponding to the best target
         for player in self.game.players:
             if player.name == best_target['name']:
@@ -1378,6 +1072,7 @@ class AIPlayerRuleBased(Player):
         Decide whether to challenge an action or a blocker's claim based on predefined rules.
         """
         game_state = self.game.get_game_state_for_ai(self)
+        self.update_card_probabilities(game_state["action_log"])
         low_chance = 0.3  # Probability threshold below which AI will challenge
 
         if blocker:
@@ -1446,43 +1141,41 @@ class AIPlayerRuleBased(Player):
         # If no blocking card, choose a random card to lie
         return random.choice(block_options)
 
-    def get_available_actions(self, game_state):
+    def get_available_actions(self, game_state, target_matrix=None):
         """
         Get the available actions that the AI can perform based on the game state.
         """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
         actions = [Income(self.game, self), ForeignAid(self.game, self), Tax(self.game, self), Exchange(self.game, self)]
 
         if self.get_coins() >= 3:
-            if any(self.get_available_targets(game_state, "Assassinate")):  # Ensure there are targets
+            if target_matrix.has_target("Assassinate"):  # Ensure there are targets
                 actions.append(Assassinate(self.game, self, None))
 
         if self.get_coins() >= 7:
-            if any(self.get_available_targets(game_state, "Coup")):  # Ensure there are targets
+            if target_matrix.has_target("Coup"):  # Ensure there are targets
                 actions.append(Coup(self.game, self, None))
 
-        if any(self.get_available_targets(game_state, "Steal")):  # Ensure there are targets
+        if target_matrix.has_target("Steal"):  # Ensure there are targets
             actions.append(Steal(self.game, self, None))
 
         return actions
 
     def get_available_targets(self, game_state, action_name, min_coins=0):
         """
-        Get all valid targets for the chosen action based on the game state.
+        Get the legal targets for the chosen action, every opponent still in the game when action_name is None.
         """
-        available_targets = []
+        targets = get_opponents(self.game, self) if action_name is None else get_legal_targets(self.game, self, action_name)
+        return [game_state['players'][target.name] for target in targets
+                if action_name != "Steal" or target.get_coins() >= min_coins]
 
-        for player in game_state['players'].values():
-            if player['name'] != self.name and not player['is_eliminated']:
-                if action_name == "Steal" and player['coins'] < min_coins:
-                    continue
-                available_targets.append(player)
-
-        return available_targets
-
-    def evaluate_actions(self, game_state, actions):
+    def evaluate_actions(self, game_state, actions, target_matrix=None):
         """
         Evaluate the available actions based on predefined rules and return a score for each action.
         """
+        if target_matrix is None:
+            target_matrix = self.build_target_matrix(game_state)
         action_scores = {}
 
         for action in actions:
@@ -1498,7 +1191,7 @@ class AIPlayerRuleBased(Player):
 
             # Actions requiring targets (Assassinate, Steal)
             if action.action_name in ["Assassinate", "Steal"]:
-                best_target, target_score = self.evaluate_targets(game_state, action)
+                best_target, target_score = target_matrix.get_best_target(action.action_name)
                 if self.has_card(action.required_card):
                     score += target_score  # Add target evaluation score if we have the required card.
                 else:
@@ -1518,54 +1211,58 @@ class AIPlayerRuleBased(Player):
 
         return action_scores
 
-    def evaluate_targets(self, game_state, action):
+    def build_target_matrix(self, game_state):
         """
-        Evaluate all the targets based on predefined rules and return the best target and its score.
+        Score every opponent as the target of every action that needs one, in a single pass over the opponents.
+        Only legal targets are scored.
         """
-        target_scores = {}
-        best_target = None
-        best_score = float('-inf')
-
-        for target in self.get_available_targets(game_state, action.action_name):
-            score = 0
-            player_data = game_state['players'][target['name']]
-
-            if len(player_data['influences_lost']) == 1:
-                score += 1
-                score += player_data['coins'] / 10
-
-            if action.action_name == "Coup":
-                if len(player_data['influences_lost']) == 1:
-                    score += player_data['coins'] / 5
+        targets = self.get_available_targets(game_state, None)
+        legal_targets = get_legal_target_names(self.game, self)
+        scores = {action_name: [] for action_name in TARGETED_ACTIONS}
+        for target in targets:
+            for action_name in TARGETED_ACTIONS:
+                if target['name'] in legal_targets[action_name]:
+                    scores[action_name].append(self.score_target(target, action_name))
                 else:
-                    score += player_data['coins'] / 10
+                    scores[action_name].append(None)
+        return TargetMatrix(targets, scores)
 
-            if action.action_name == "Assassinate":
-                if self.card_probabilities is not None:
-                    block_probability = 0
-                    for i in range(2):
-                        block_probability += self.card_probabilities[target['name']]["Contessa"][i]
-                    score -= block_probability * 2
-                else:
-                    score -= 0.5  # Assign a default penalty if card_probabilities is None
+    def score_target(self, target, action_name):
+        """
+        Score a target for the given action based on predefined rules.
+        """
+        score = 0
 
-            if action.action_name == "Steal":
-                if self.card_probabilities is not None:
-                    block_probability = 0
-                    for card in ["Captain", "Ambassador"]:
-                        for i in range(2):
-                            block_probability += self.card_probabilities[target['name']][card][i]
-                    score -= block_probability * 2
-                else:
-                    score -= 0.5  # Assign a default penalty if card_probabilities is None
+        if len(target['influences_lost']) == 1:
+            score += 1
+            score += target['coins'] / 10
 
-            if score > best_score:
-                best_target = target
-                best_score = score
+        if action_name == "Coup":
+            if len(target['influences_lost']) == 1:
+                score += target['coins'] / 5
+            else:
+                score += target['coins'] / 10
 
-            target_scores[target['name']] = score
+        if action_name == "Assassinate":
+            if self.card_probabilities is not None:
+                block_probability = 0
+                for i in range(2):
+                    block_probability += self.card_probabilities[target['name']]["Contessa"][i]
+                score -= block_probability * 2
+            else:
+                score -= 0.5  # Assign a default penalty if card_probabilities is None
 
-        return best_target, best_score
+        if action_name == "Steal":
+            if self.card_probabilities is not None:
+                block_probability = 0
+                for card in ["Captain", "Ambassador"]:
+                    for i in range(2):
+                        block_probability += self.card_probabilities[target['name']][card][i]
+                score -= block_probability * 2
+            else:
+                score -= 0.5  # Assign a default penalty if card_probabilities is None
+
+        return score
 
     def choose_influence_to_die(self):
         """
@@ -1675,33 +1372,97 @@ class AIPlayerRuleBased(Player):
                 remaining_cards.append(card)
         
         return remaining_cards
-    
+
+class AIPlayerCFR(AIPlayerRuleBased):
+    """
+    AIPlayerCFR plays its turns like AIPlayerRuleBased, but challenges and blocks from the strategy table
+    solved by training/cfr_solver.py, sampling its mixed strategies. The table is solved for two players,
+    so with more at the table every decision is looked up against the player who claimed.
+    Decisions the table does not cover, or all of them before the table has been generated, fall back to
+    the rule-based heuristics.
+    """
+    def __init__(self, name, game=None):
+        super().__init__(name, game)
+        self.strategy_table = load_strategy_table()  # None until training/cfr_solver.py has run
+        self.block_choice = None
+
+    def get_table_strategy(self, kind, action_name, card_name, opponent):
+        """Looks the decision up against the opponent, None when there is no table or it does not cover it"""
+        if self.strategy_table is None:
+            return None
+        return self.strategy_table.get_strategy(kind, action_name, card_name, [card.name for card in self.hand],
+                                                self.get_coins(), opponent.get_coins(), len(opponent.hand))
+
+    def wants_to_challenge(self, action, blocker=False):
+        """
+        Challenge an action, or a blocker's claim, with the probability of the solved strategy.
+        """
+        if blocker:
+            strategy = self.get_table_strategy(COUNTER_CHALLENGE, self.game.last_action.action_name, action, blocker)
+        else:
+            strategy = self.get_table_strategy(CHALLENGE, action.action_name, action.required_card, action.player)
+        if strategy is None:
+            return super().wants_to_challenge(action, blocker)
+        return random.random() * sum(strategy) < strategy[1]
+
+    def wants_to_block(self, action):
+        """
+        Draw the block, and the card to claim, from the solved strategy.
+        """
+        strategy = self.get_table_strategy(BLOCK, action.action_name, "", action.player)
+        if strategy is None:
+            self.block_choice = None
+            return super().wants_to_block(action)
+        self.block_choice = get_choices(BLOCK, action.action_name)[sample_choice(strategy)]
+        return self.block_choice is not None
+
+    def get_block_choice(self, block_options):
+        """
+        Claim the card drawn by wants_to_block.
+        """
+        if self.block_choice in block_options:
+            return self.block_choice
+        return super().get_block_choice(block_options)
+
+
 class RandomAIPlayer(Player):
+    """
+    RandomAIPlayer makes every decision uniformly at random. The random numbers come from a RandomBuffer,
+    reseeded whenever the player is reset and seeded from the random module on first use, so that seeded games
+    stay reproducible, and the legal actions from the precomputed RANDOM_ACTIONS, so a decision only builds the
+    action it takes.
+    """
     def __init__(self, name, game=None):
         super().__init__(name)
         self.game = game
 
+    def reset(self):
+        super().reset()
+        if hasattr(self, "random_buffer"):
+            self.random_buffer.reseed()
+        else:
+            self.random_buffer = RandomBuffer()
+
     def setup(self):
         pass
 
     def is_human(self):
         """Differentiates between AI and Human players"""
         return False
- 
-    def choose_action(self):
-        """Returns a valid random action"""
-        available_actions = self.get_available_actions()
-        if available_actions:
-            chosen_action = random.choice(available_actions)
-            if chosen_action.needs_target:
-                chosen_target = self.choose_target(chosen_action)
-                if chosen_target is None:
-                    return self.choose_action()  # Retry choosing an action if no valid target is available
-                chosen_action.target = chosen_target
-            return chosen_action
-        else:
-            return Income(self.game, self)  # Choose Income action if no other actions are available
 
+    def get_legal_mask(self, targets):
+        """The mask of the actions that need coins or a target, given the opponents still in the game"""
+        return get_legal_mask(self.coins, [target.coins for target in targets])
+
+    def choose_action(self):
+        """Returns a uniformly random legal action, with a random valid target when it needs one"""
+        targets = self.get_available_targets(None)
+        action_name = self.random_buffer.choice(RANDOM_ACTIONS[self.get_legal_mask(targets)])
+        if not ACTION_RULES[action_name]["needs_target"]:
+            return ACTION_CLASSES[action_name](self.game, self)
+        if action_name == "Steal":
+            targets = [target for target in targets if target.coins >= STEAL_MIN_COINS]
+        return ACTION_CLASSES[action_name](self.game, self, self.random_buffer.choice(targets))
 
     def choose_target(self, action=None):
         """Returns a random valid target"""
@@ -1711,42 +1472,40 @@ class RandomAIPlayer(Player):
             available_targets = self.get_available_targets(None)
 
         if available_targets:
-            chosen_target = random.choice(available_targets)
-            return chosen_target
+            return self.random_buffer.choice(available_targets)
         return None
 
     def get_available_actions(self):
         """Gets all the available actions the AI can perform"""
-        actions = [Income(self.game, self), ForeignAid(self.game, self), Tax(self.game, self), Exchange(self.game, self)]
-        if self.get_coins() >= 3 and any(self.get_available_targets("Assassinate")):
-            actions.append(Assassinate(self.game, self, None))
-        if self.get_coins() >= 7 and any(self.get_available_targets("Coup")):
-            actions.append(Coup(self.game, self, None))
-        if any(self.get_available_targets("Steal", min_coins=1)):
-            actions.append(Steal(self.game, self, None))
+        actions = []
+        for action_name in RANDOM_ACTIONS[self.get_legal_mask(self.get_available_targets(None))]:
+            if ACTION_RULES[action_name]["needs_target"]:
+                actions.append(ACTION_CLASSES[action_name](self.game, self, None))
+            else:
+                actions.append(ACTION_CLASSES[action_name](self.game, self))
         return actions
 
     def get_available_targets(self, action_name, min_coins=0):
-        """Gets all the available targets"""
-        return [player for player in self.game.players if player != self and not player.is_eliminated and player.coins >= min_coins]
+        """Gets the legal targets for the action with at least min_coins, every opponent still in the game when action_name is None"""
+        targets = get_opponents(self.game, self) if action_name is None else get_legal_targets(self.game, self, action_name)
+        return [target for target in targets if target.coins >= min_coins]
 
     def wants_to_challenge(self, action, blocker=False):
         """Radomly decides to challenge"""
-        return random.choice([True, False])
+        return self.random_buffer.random() < 0.5
 
     def wants_to_block(self, action):
         """Radomly decides to block"""
-        return random.choice([True, False])
+        return self.random_buffer.random() < 0.5
 
     def get_block_choice(self, block_options):
         """Picks a random block card"""
-        return random.choice(block_options)
+        return self.random_buffer.choice(block_options)
 
     def choose_influence_to_die(self):
         """Chooses a random influence to die"""
         if self.hand:
-            lost_card_index = random.choice(range(len(self.hand)))
-            self.lose_card(lost_card_index)
+            self.lose_card(self.random_buffer.randrange(len(self.hand)))
 
     def lose_card(self, card_index):
         """Lose the required card"""
@@ -1754,6 +1513,7 @@ class RandomAIPlayer(Player):
             lost_card = self.hand.pop(card_index)
             self.influences_lost.append(lost_card.name)
             print(f"{self.name} has lost their {lost_card.name} influence.")
+            self.publish(InfluenceLost(self.name, lost_card.name))
             if len(self.hand) == 0:
                 self.set_eliminated(True)
 
@@ -1762,10 +1522,10 @@ class RandomAIPlayer(Player):
         total_cards = self.hand + drawn_cards
         if len(drawn_cards) == 1:
             # If only one card is drawn, randomly choose one card to keep
-            to_keep = random.sample(total_cards, 1)
+            to_keep = self.random_buffer.sample(total_cards, 1)
         else:
             # If two cards are drawn, randomly choose two cards to keep
-            to_keep = random.sample(total_cards, 2)
+            to_keep = self.random_buffer.sample(total_cards, 2)
         
         self.hand = to_keep
         return [card for card in total_cards if card not in to_keep]
@@ -0,0 +1,72 @@
+"""
+Dense storage for an AI's beliefs about the opponents' cards. The probability of every opponent holding each
+character in each of their two slots is kept in one flat array of doubles, laid out players × cards × slots,
+with maps from player and card names to offsets. The posterior of a player is written over their whole slice
+at once with set_player.
+
+CardBeliefs can also be read like the nested dictionary the AIs used before, beliefs[player][card][slot], but
+only read: set_player is the only way to change it.
+"""
+from array import array
+from collections.abc import Mapping
+
+from game.rules import CARD_NAMES
+
+CARD_INDEX = {card_name: index for index, card_name in enumerate(CARD_NAMES)}
+NUM_SLOTS = 2
+PLAYER_STRIDE = len(CARD_NAMES) * NUM_SLOTS  # Values per player
+
+class CardBeliefs(Mapping):
+    def __init__(self, player_names, card_probabilities=None):
+        """
+        Beliefs about the given players. card_probabilities optionally gives the starting probability of
+        each card, the same for every player and slot, otherwise everything starts at 0.
+        """
+        self.player_names = list(player_names)
+        self.player_offsets = {player_name: index * PLAYER_STRIDE for index, player_name in enumerate(self.player_names)}
+        self.players = {player_name: PlayerBeliefs(self, player_name) for player_name in self.player_names}
+        if card_probabilities:
+            row = array("d", [card_probabilities.get(card_name, 0.0) for card_name in CARD_NAMES for _ in range(NUM_SLOTS)])
+            self.values = row * len(self.player_names)
+        else:
+            self.values = array("d", bytes(8 * PLAYER_STRIDE * len(self.player_names)))
+
+    def get_offset(self, player_name, card_name):
+        """Position of the player's first slot for the card in values"""
+        return self.player_offsets[player_name] + CARD_INDEX[card_name] * NUM_SLOTS
+
+    def set_player(self, player_name, card_probabilities):
+        """Sets every slot of the player to the probability of each card"""
+        start = self.player_offsets[player_name]
+        self.values[start:start + PLAYER_STRIDE] = array(
+            "d", [card_probabilities.get(card_name, 0.0) for card_name in CARD_NAMES for _ in range(NUM_SLOTS)])
+
+    def __getitem__(self, player_name):
+        return self.players[player_name]
+
+    def __contains__(self, player_name):
+        return player_name in self.players
+
+    def __iter__(self):
+        return iter(self.player_names)
+
+    def __len__(self):
+        return len(self.player_names)
+
+class PlayerBeliefs(Mapping):
+    """Read-only view of one player's beliefs, mapping every card name to its (slot 0, slot 1) probabilities"""
+    def __init__(self, beliefs, player_name):
+        self.beliefs = beliefs
+        self.player_name = player_name
+
+    def __getitem__(self, card_name):
+        if card_name not in CARD_INDEX:
+            raise KeyError(card_name)
+        offset = self.beliefs.get_offset(self.player_name, card_name)
+        return self.beliefs.values[offset], self.beliefs.values[offset + 1]
+
+    def __iter__(self):
+        return iter(CARD_NAMES)
+
+    def __len__(self):
+        return len(CARD_NAMES)
@@ -0,0 +1,275 @@
+"""
+Persistent particle filter over the opponents' hands. Each particle is one guess at where every card the AI
+cannot see is: the hand of each opponent and the rest in the deck. The particles follow the game through the
+event bus instead of being redrawn for every decision:
+- a claim reweights them by the likelihood of the claim, as in game/public_beliefs.py;
+- a lost influence or a failed claim rules out the particles that disagree with it;
+- a card shown to win a challenge and an Exchange change the player's hand, so the particles move it
+  (rejuvenation) by returning the cards to their deck and drawing replacements from it.
+The particles are resampled only when the effective sample size drops below half of them, and the copies
+resampling makes are then spread out again with Metropolis moves: swaps of cards between hands and the deck,
+kept with the likelihood of the claims made since each hand last changed.
+"""
+import random
+
+from game.events import ActionResolved, CardRevealed, InfluenceLost
+from game.log_manager import ACTION_CARDS
+from game.public_beliefs import BLUFF_LIKELIHOODS
+from game.rules import CARD_NAMES
+
+class ParticleFilter:
+    def __init__(self, ai_player, num_particles=256):
+        """Draws the particles from the prior of the current deal and follows the game's events"""
+        self.ai_player = ai_player
+        self.game = ai_player.game
+        self.num_particles = num_particles
+        self.opponents = [player for player in self.game.players if player is not ai_player]
+        self.opponent_index = {player.name: index for index, player in enumerate(self.opponents)}
+        self.deck_index = len(self.opponents)  # A particle is the hand of every opponent, then the deck
+        self.evidence = {player.name: [] for player in self.opponents}  # (card, likelihood held, likelihood not held)
+        self.initialize_particles()
+        self.handlers = [(CardRevealed, self.on_card_revealed), (InfluenceLost, self.on_influence_lost),
+                         (ActionResolved, self.on_action_resolved)]
+        for event_type, handler in self.handlers:
+            self.game.events.subscribe(event_type, handler)
+
+    def close(self):
+        """Stops following the game"""
+        for event_type, handler in self.handlers:
+            self.game.events.unsubscribe(event_type, handler)
+
+    def get_unseen_counts(self):
+        """Copies of every character the AI cannot see: neither in its hand nor lost"""
+        counts = dict.fromkeys(CARD_NAMES, 3)
+        for card in self.ai_player.hand:
+            counts[card.name] -= 1
+        for card_name in self.game.get_all_lost_influences():
+            counts[card_name] -= 1
+        return counts
+
+    def initialize_particles(self):
+        """Deals every particle at random from the unseen cards, which drops all evidence so far"""
+        unseen_cards = [card_name for card_name, count in self.get_unseen_counts().items() for _ in range(count)]
+        hand_sizes = [len(player.hand) for player in self.opponents]
+        self.particles = []
+        for _ in range(self.num_particles):
+            random.shuffle(unseen_cards)
+            particle = []
+            start = 0
+            for hand_size in hand_sizes:
+                particle.append(unseen_cards[start:start + hand_size])
+                start += hand_size
+            particle.append(unseen_cards[start:])
+            self.particles.append(particle)
+        self.weights = [1.0] * self.num_particles
+
+    def reweight(self, player_name, likelihood):
+        """Multiplies the weight of every particle by likelihood(hand of the player in the particle)"""
+        index = self.opponent_index[player_name]
+        self.weights = [weight * likelihood(particle[index]) for weight, particle in zip(self.weights, self.particles)]
+
+    def on_card_revealed(self, event):
+        """The player showed the card to win a challenge, it goes back to the deck and they draw a replacement"""
+        if event.player not in self.opponent_index:
+            return
+        index = self.opponent_index[event.player]
+        self.reweight(event.player, lambda hand: 1.0 if event.card in hand else 0.0)
+        self.evidence[event.player] = []
+        for particle in self.particles:
+            hand, deck = particle[index], particle[self.deck_index]
+            if event.card in hand and deck:
+                hand.remove(event.card)
+                deck.append(event.card)
+                hand.append(deck.pop(random.randrange(len(deck))))
+
+    def on_influence_lost(self, event):
+        if event.player not in self.opponent_index:
+            return
+        index = self.opponent_index[event.player]
+        self.reweight(event.player, lambda hand: 1.0 if event.card in hand else 0.0)
+        for particle in self.particles:
+            hand = particle[index]
+            if event.card in hand:
+                hand.remove(event.card)
+            elif hand:
+                # The particle is ruled out, keep its hand size right until it is resampled away
+                particle[self.deck_index].append(hand.pop(random.randrange(len(hand))))
+        self.maybe_resample()
+
+    def on_action_resolved(self, event):
+        """Reweights the particles by the claims of the resolved action, the same evidence the LogManager summarises"""
+        log_entry = event.log_entry
+        player_name = log_entry["player"]
+        block_outcome = log_entry["block_outcome"]
+        claimed_card = ACTION_CARDS.get(log_entry["action"])
+
+        if log_entry["challenge"] is None and block_outcome is None:
+            if claimed_card:
+                self.reweight_claim(player_name, claimed_card)
+        elif block_outcome == "blocker not challenged":
+            self.reweight_claim(log_entry["blocker"], log_entry["blocker_claim"])
+        elif block_outcome == "blocker lost challenge":
+            self.rule_out(log_entry["blocker"], log_entry["blocker_claim"])
+        elif log_entry["challenge_outcome"] == "challenge lost" and claimed_card:
+            self.rule_out(player_name, claimed_card)
+
+        if log_entry["action"] == "Exchange" and log_entry["action_result"] == "performed" and player_name in self.opponent_index:
+            self.exchange(player_name)
+        self.maybe_resample()
+
+    def reweight_claim(self, player_name, card_name):
+        if player_name in self.opponent_index:
+            bluff_likelihood = BLUFF_LIKELIHOODS[card_name]
+            self.evidence[player_name].append((card_name, 1.0, bluff_likelihood))
+            self.reweight(player_name, lambda hand: 1.0 if card_name in hand else bluff_likelihood)
+
+    def rule_out(self, player_name, card_name):
+        """The player did not hold the card they claimed"""
+        if player_name in self.opponent_index:
+            self.evidence[player_name].append((card_name, 0.0, 1.0))
+            self.reweight(player_name, lambda hand: 0.0 if card_name in hand else 1.0)
+
+    def exchange(self, player_name):
+        """The player drew up to two cards and returned as many. Which ones they kept is unknown, so keep any"""
+        index = self.opponent_index[player_name]
+        self.evidence[player_name] = []
+        for particle in self.particles:
+            hand, deck = particle[index], particle[self.deck_index]
+            drawn_cards = [deck.pop(random.randrange(len(deck))) for _ in range(min(2, len(deck)))]
+            cards = hand + drawn_cards
+            random.shuffle(cards)
+            particle[index] = cards[:len(hand)]
+            deck.extend(cards[len(hand):])
+
+    def maybe_resample(self):
+        """Resamples the particles when the effective sample size falls below half of them"""
+        total = sum(self.weights)
+        if total <= 0:
+            # Every particle contradicts the evidence, for example after an exchange, so start again from the prior
+            self.initialize_particles()
+            return
+        effective_sample_size = total * total / sum(weight * weight for weight in self.weights)
+        if effective_sample_size >= self.num_particles / 2:
+            return
+        # Systematic resampling, only the copies need to be moved apart
+        step = total / self.num_particles
+        position = random.random() * step
+        cumulative = 0.0
+        resampled = []
+        copies = []
+        index = -1
+        for _ in range(self.num_particles):
+            if cumulative > position:
+                copies.append(len(resampled))
+            while cumulative <= position and index < self.num_particles - 1:
+                index += 1
+                cumulative += self.weights[index]
+            resampled.append([list(cards) for cards in self.particles[index]])
+            position += step
+        self.particles = resampled
+        self.weights = [1.0] * self.num_particles
+        self.move_particles([resampled[index] for index in copies])
+
+    def get_hand_likelihood(self, location, cards):
+        """Likelihood of the claims made since the hand last changed, 1 for the deck"""
+        if location == self.deck_index:
+            return 1.0
+        likelihood = 1.0
+        for card_name, held_likelihood, bluff_likelihood in self.evidence[self.opponents[location].name]:
+            likelihood *= held_likelihood if card_name in cards else bluff_likelihood
+        return likelihood
+
+    def move_particles(self, particles, sweeps=2):
+        """
+        Metropolis moves on the particles: swap a card of an opponent with a card of another hand or the deck.
+        Every deal is equally likely before the evidence and the swap is its own reverse, so a swap is kept
+        with the ratio of the likelihoods of the two hands after and before it.
+        """
+        if not particles:
+            return
+        locations = [location for location, cards in enumerate(particles[0]) if cards]  # Hand sizes are the same in every particle
+        hands = [location for location in locations if location != self.deck_index]
+        if len(locations) < 2 or not hands:
+            return
+        pairs = [(first, second) for first in hands for second in locations if second != first]
+        for particle in particles:
+            for _ in range(sweeps * len(hands)):
+                first, second = pairs[int(random.random() * len(pairs))]
+                first_cards, second_cards = particle[first], particle[second]
+                first_slot, second_slot = int(random.random() * len(first_cards)), int(random.random() * len(second_cards))
+                if first_cards[first_slot] == second_cards[second_slot]:
+                    continue
+                old_likelihood = self.get_hand_likelihood(first, first_cards) * self.get_hand_likelihood(second, second_cards)
+                new_first, new_second = list(first_cards), list(second_cards)
+                new_first[first_slot], new_second[second_slot] = second_cards[second_slot], first_cards[first_slot]
+                new_likelihood = self.get_hand_likelihood(first, new_first) * self.get_hand_likelihood(second, new_second)
+                if new_likelihood >= old_likelihood or random.random() * old_likelihood < new_likelihood:
+                    particle[first], particle[second] = new_first, new_second
+
+    def sync_unseen_cards(self):
+        """
+        Moves the particles onto the cards the AI cannot see now. The AI's own swaps and exchanges change which
+        cards those are: a card it gave back joins each particle's deck, and a card it drew leaves the particle,
+        from the deck when possible, otherwise from a hand that then draws a replacement.
+        """
+        unseen_counts = self.get_unseen_counts()
+        for particle in self.particles:
+            counts = dict.fromkeys(CARD_NAMES, 0)
+            for cards in particle:
+                for card_name in cards:
+                    counts[card_name] += 1
+            if counts == unseen_counts:
+                continue
+            deck = particle[self.deck_index]
+            for card_name in CARD_NAMES:
+                deck.extend([card_name] * (unseen_counts[card_name] - counts[card_name]))
+            for card_name in CARD_NAMES:
+                for _ in range(counts[card_name] - unseen_counts[card_name]):
+                    if card_name in deck:
+                        deck.remove(card_name)
+                        continue
+                    hand = next(hand for hand in particle[:self.deck_index] if card_name in hand)
+                    hand.remove(card_name)
+                    hand.append(deck.pop(random.randrange(len(deck))))
+
+    def get_card_probabilities(self, player_name):
+        """Weighted probability that any one of the player's cards is each character"""
+        index = self.opponent_index[player_name]
+        probabilities = dict.fromkeys(CARD_NAMES, 0.0)
+        total = 0.0
+        for weight, particle in zip(self.weights, self.particles):
+            hand = particle[index]
+            if hand and weight:
+                share = weight / len(hand)
+                for card_name in hand:
+                    probabilities[card_name] += share
+                total += weight
+        if total > 0:
+            for card_name in CARD_NAMES:
+                probabilities[card_name] /= total
+        return probabilities
+
+    def update_beliefs(self, card_probabilities):
+        """Writes the particle estimate of every opponent into the AI's CardBeliefs"""
+        self.sync_unseen_cards()
+        for player_name in card_probabilities:
+            card_probabilities.set_player(player_name, self.get_card_probabilities(player_name))
+
+class ParticleFilterTracking:
+    """
+    Gives an AI player a particle filter over its opponents' hands, started once the hands are dealt and its
+    card probabilities set up, and stopped when the player is reset. num_simulations is the number of particles.
+    """
+    particle_filter = None
+
+    def start_particle_filter(self):
+        """Starts tracking the opponents' hands with num_simulations particles, updated by the game's events"""
+        self.stop_particle_filter()
+        if self.game and self.card_probabilities is not None:
+            self.particle_filter = ParticleFilter(self, self.num_simulations)
+
+    def stop_particle_filter(self):
+        """Stops following the game with the particle filter"""
+        if self.particle_filter is not None:
+            self.particle_filter.close()
+            self.particle_filter = None
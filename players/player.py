@@ -2,8 +2,9 @@
 This module defines the player class. It handles all the methods and actions related to the players.
 """
 
-from exceptions.game_exceptions import *
+from exceptions.game_exceptions import GameException, NotEnoughCoinsError, PlayerEliminatedError, HandIsFullError
 from actions.action import Income, ForeignAid, Coup, Tax, Assassinate, Steal, Exchange
+from game.events import CoinsChanged, InfluenceLost, PlayerEliminated
 
 class Player:
     def __init__(self, name):
@@ -16,11 +17,15 @@ class Player:
         self.blocks_made = 0
 
     def reset(self):
-        """Resets the player variables"""
-        self.hand = []
+        """Resets the player variables. The lists are emptied in place when the player is reused for another game"""
+        if hasattr(self, "hand"):
+            self.hand.clear()
+            self.influences_lost.clear()
+        else:
+            self.hand = []
+            self.influences_lost = []
         self.coins = 2
         self._is_eliminated = False
-        self.influences_lost = []
         self.turns_played = 0
         self.actions_played = 0
         self.challenges_made = 0
@@ -71,6 +76,10 @@ class Player:
                     print(f"Invalid input. Please enter a number between 1 and {len(block_options)}.")
 
 
+    def can_lose_coins(self, amount):
+        """Whether the player has the coins to pay the amount"""
+        return amount <= self.coins
+
     def add_card(self, card):
         """Adds a card to the players hand"""
         if self._is_eliminated:
@@ -83,14 +92,16 @@ class Player:
         self.hand.append(card)
 
     def lose_coins(self, amount):
-        """Lose a certain amount of coins from the players balance"""
-        if amount > self.coins:
-            raise NotEnoughCoinsError(f"{self.name} cannot lose more coins than they have.")
+        """Lose a certain amount of coins from the players balance. Action.check asks can_lose_coins before an action is declared"""
+        if not self.can_lose_coins(amount):
+            raise NotEnoughCoinsError(amount, f"{self.name} cannot lose more coins than they have.")
         self.coins -= amount
+        self.publish(CoinsChanged(self.name, -amount, self.coins))
 
     def gain_coins(self, amount):
         """Player gains a certain amount of coins."""
         self.coins += amount
+        self.publish(CoinsChanged(self.name, amount, self.coins))
 
     def get_coins(self):
         return self.coins
@@ -107,6 +118,12 @@ class Player:
         self._is_eliminated = eliminated
         if eliminated:
             print(f"{self.name} is eliminated!")
+            self.publish(PlayerEliminated(self.name))
+
+    def publish(self, event):
+        """Publishes the event on the bus of the player's game, if the player is seated at one"""
+        if self.game is not None:
+            self.game.events.publish(event)
 
     def lose_influence(self):
         """Makes the player choice what influence to lose if they have more than 1 card. Otherwise the player loses the remaining card"""
@@ -132,6 +149,7 @@ class Player:
             lost_card = self.hand.pop(card_index)
             self.influences_lost.append(lost_card.name)
             print(f"{self.name} has lost their {lost_card} influence.")
+            self.publish(InfluenceLost(self.name, lost_card.name))
             if len(self.hand) == 0:
                 self.set_eliminated(True)
 
@@ -363,10 +381,4 @@ class Player:
                 print("Invalid input, please enter a number.")
 
     def __str__(self):
-        return self.name
-    
-    def reset(self):
-        self.hand = []
-        self.coins = 2
-        self._is_eliminated = False
-        self.influences_lost = []
\ No newline at end of file
+        return self.name
\ No newline at end of file
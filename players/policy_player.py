@@ -0,0 +1,26 @@
+"""
+AI player that takes its challenge and block decisions from a policy file (game/policy_file.py), such as the one
+training/cfr_solver.py writes next to its strategy table. Every process maps the file once, so tournament
+workers share it, and a decision is a single hashed lookup of its information-set key.
+"""
+from game.policy_file import DEFAULT_POLICY_PATH, load_policy_file
+from game.strategy_table import get_choices, info_set_key
+from players.ai_player import AIPlayerCFR
+
+class AIPlayerPolicy(AIPlayerCFR):
+    """
+    AIPlayerPolicy plays like AIPlayerCFR, reading its mixed strategies from the policy file at policy_path
+    instead of the strategy table. Decisions the policy does not cover fall back to the rule-based heuristics.
+    """
+    def __init__(self, name, game=None):
+        super().__init__(name, game)
+        self.policy_path = DEFAULT_POLICY_PATH  # Can be set through create_ai_player(..., policy_path=...)
+
+    def get_table_strategy(self, kind, action_name, card_name, opponent):
+        """Looks the decision up in the policy file, None when there is no file or it does not have the key"""
+        policy = load_policy_file(self.policy_path)
+        if policy is None:
+            return None
+        strategy = policy.get(info_set_key(kind, action_name, card_name, [card.name for card in self.hand],
+                                           self.get_coins(), opponent.get_coins(), len(opponent.hand)))
+        return None if strategy is None else strategy[:len(get_choices(kind, action_name))]
@@ -0,0 +1,139 @@
+"""
+Registry of the AI player types. AI classes are looked up by name and only imported the first time they are
+used, so importing the game or starting a human-only table never loads the AI modules.
+Other packages can add their own AI players through the "coup.ai_players" entry point group.
+Players are built through create_ai_player, which applies per-type construction options.
+"""
+import importlib
+
+ENTRY_POINT_GROUP = "coup.ai_players"
+
+# AI name -> "module:ClassName"
+AI_PLAYERS = {
+    "AIPlayerMonte": "players.ai_player:AIPlayerMonte",
+    "AIPlayerOldMonte": "players.ai_player:AIPlayerOldMonte",
+    "AIPlayerRuleBased": "players.ai_player:AIPlayerRuleBased",
+    "AIPlayerCFR": "players.ai_player:AIPlayerCFR",
+    "AIPlayerPolicy": "players.policy_player:AIPlayerPolicy",
+    "AIPlayerRuleTable": "players.rule_table_player:AIPlayerRuleTable",
+    "RandomAIPlayer": "players.ai_player:RandomAIPlayer"
+}
+
+# The numbers used by the menus in main.py
+AI_TYPE_CODES = {
+    "1": "AIPlayerMonte",
+    "2": "AIPlayerOldMonte",
+    "3": "AIPlayerRuleBased",
+    "4": "RandomAIPlayer",
+    "5": "AIPlayerCFR",
+    "6": "AIPlayerPolicy",
+    "7": "AIPlayerRuleTable"
+}
+
+def describe_ai_types():
+    """The menu numbers and names of the AI types, as the menus and help texts list them"""
+    return ", ".join(f"{code} - {name}" for code, name in AI_TYPE_CODES.items())
+
+# Default player names used for AI-only tables, formatted with the seat number
+AI_NAME_FORMATS = {
+    "AIPlayerMonte": "AI Player Monte Carlo {seat}",
+    "AIPlayerOldMonte": "Old Monte AI Player {seat}",
+    "AIPlayerRuleBased": "Rule based AI Playe {seat}",
+    "RandomAIPlayer": "Random AI Player {seat}",
+    "AIPlayerCFR": "CFR AI Player {seat}",
+    "AIPlayerPolicy": "Policy AI Player {seat}",
+    "AIPlayerRuleTable": "Rule table AI Player {seat}"
+}
+
+# Default construction options for each AI, see configure_ai_player
+AI_OPTIONS = {}
+
+_resolved_classes = {}
+_entry_points_loaded = False
+
+def register_ai_player(name, target, name_format=None, **options):
+    """
+    Registers an AI player. target is either the class itself or a "module:ClassName" string.
+    Any keyword options become the default construction options for the AI.
+    """
+    if name_format:
+        AI_NAME_FORMATS[name] = name_format
+    if options:
+        AI_OPTIONS[name] = options
+    if isinstance(target, str):
+        AI_PLAYERS[name] = target
+        _resolved_classes.pop(name, None)
+    else:
+        AI_PLAYERS[name] = f"{target.__module__}:{target.__name__}"
+        _resolved_classes[name] = target
+
+def load_entry_points():
+    """Adds the AI players advertised by installed packages. Only done once, and only when a name is unknown"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return
+    discovered = entry_points()
+    if hasattr(discovered, "select"):
+        group = discovered.select(group=ENTRY_POINT_GROUP)
+    else:
+        group = discovered.get(ENTRY_POINT_GROUP, [])
+    for entry_point in group:
+        AI_PLAYERS.setdefault(entry_point.name, entry_point.value)
+
+def resolve_ai_name(ai_type, default=None):
+    """Turns a menu number or AI name into the registered AI name. Unknown types give the default"""
+    name = AI_TYPE_CODES.get(ai_type, ai_type)
+    if name not in AI_PLAYERS:
+        load_entry_points()
+    if name not in AI_PLAYERS:
+        if default is None:
+            raise KeyError(f"Unknown AI player type: {ai_type}")
+        return resolve_ai_name(default)
+    return name
+
+def get_ai_class(name):
+    """Returns the AI class for a name or a menu number, importing its module on first use"""
+    name = AI_TYPE_CODES.get(name, name)
+    if name in _resolved_classes:
+        return _resolved_classes[name]
+    if name not in AI_PLAYERS:
+        load_entry_points()
+    if name not in AI_PLAYERS:
+        raise KeyError(f"Unknown AI player type: {name}")
+
+    module_name, class_name = AI_PLAYERS[name].split(":")
+    ai_class = getattr(importlib.import_module(module_name), class_name)
+    _resolved_classes[name] = ai_class
+    return ai_class
+
+def get_ai_names():
+    """Returns the names of every registered AI player"""
+    load_entry_points()
+    return list(AI_PLAYERS.keys())
+
+def configure_ai_player(player, options):
+    """
+    Applies construction options to an AI player. "profile" is passed to apply_profile, any other option
+    sets the attribute of the same name, for example num_simulations or challenge_threshold.
+    """
+    for option, value in options.items():
+        if option == "profile":
+            player.apply_profile(value)
+        elif hasattr(player, option):
+            setattr(player, option, value)
+        else:
+            raise ValueError(f"{type(player).__name__} has no option '{option}'.")
+
+def create_ai_player(ai_type, name=None, seat=1, **options):
+    """Builds an AI player from a menu number or AI name, named after its seat unless a name is given"""
+    ai_name = resolve_ai_name(ai_type)
+    if name is None:
+        name = AI_NAME_FORMATS.get(ai_name, ai_name + " {seat}").format(seat=seat)
+    player = get_ai_class(ai_name)(name)
+    configure_ai_player(player, dict(AI_OPTIONS.get(ai_name, {}), **options))
+    return player
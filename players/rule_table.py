@@ -0,0 +1,165 @@
+"""
+Compiles the rules of AIPlayerRuleBased into lookup tables over a small discretised feature space: the cards in
+hand, the coins (as the costs the player can afford), the card values in use, the round and whether the player
+has card beliefs. The compiler does not restate the rules. It runs the rule methods themselves on a probe player
+for every point of the feature space, so the tables follow the rules as they change. Decisions that depend on
+more than these features, like the card beliefs or the continuous scores of the targets, are marked None and
+the table-backed player (players/rule_table_player.py) falls back to the rule methods for them.
+"""
+import itertools
+import random
+
+from cards.card import Card
+from game.rules import ACTION_RULES, CARD_NAMES
+from players.ai_player import AIPlayerRuleBased, TargetMatrix, rank_actions
+
+ROUND_CAP = 10  # Rounds from here on are compiled as this one, the rules do not change after the first few
+PROBE_OPPONENT = "Probe Opponent"
+COIN_THRESHOLDS = sorted({rules["coins_needed"] for rules in ACTION_RULES.values() if rules["coins_needed"]})
+
+def get_hand_key(hand):
+    """The card names of a hand as a sorted tuple, hand being Card objects"""
+    return tuple(sorted(card.name for card in hand))
+
+def get_coin_class(coins):
+    """How many of the action costs the coins can pay"""
+    return sum(coins >= threshold for threshold in COIN_THRESHOLDS)
+
+def iter_hands():
+    """Every hand of one or two cards, as sorted tuples of card names"""
+    for size in (1, 2):
+        yield from itertools.combinations_with_replacement(sorted(CARD_NAMES), size)
+
+class RuleProbe:
+    """Stands in for the game while the rules are compiled, exposing only the features being compiled"""
+    def __init__(self, round_number=1, num_players=4):
+        self.round_number = round_number
+        self.num_players = num_players
+
+    def get_game_state_for_ai(self, ai_player):
+        names = [ai_player.name, PROBE_OPPONENT] + [f"{PROBE_OPPONENT} {index}" for index in range(2, self.num_players)]
+        players = {name: {"name": name} for name in names}
+        return {"players": players, "action_log": [], "round": self.round_number, "all_lost_influences": []}
+
+class ProbeClaim:
+    """The parts of a claimed action that wants_to_challenge reads"""
+    def __init__(self, card_name, player):
+        self.required_card = card_name
+        self.player = player
+
+class RuleTable:
+    def __init__(self, challenge_threshold=2):
+        """
+        Compiles the tables for rule-based players with the given challenge_threshold. The rules draw from the
+        random module when they bluff, so its state is restored afterwards and seeded games are not disturbed.
+        """
+        random_state = random.getstate()
+        self.challenge_threshold = challenge_threshold
+        self.round_cap = max(ROUND_CAP, challenge_threshold)
+        self.probe = AIPlayerRuleBased("Probe Player", RuleProbe())
+        self.probe.challenge_threshold = challenge_threshold
+        self.probe.endgame_table = None
+        self.compile_card_values()
+        self.compile_actions()
+        self.compile_challenges()
+        self.compile_blocks()
+        random.setstate(random_state)
+
+    def set_hand(self, hand):
+        self.probe.hand = [Card(card_name) for card_name in hand]
+
+    def compile_card_values(self):
+        """The card values in use after each round, by the number of players at the table"""
+        self.card_value_sets = [dict(AIPlayerRuleBased.DEFAULT_CARD_VALUES)]
+        self.card_value_modes = {}
+        for num_players, round_number in itertools.product(range(2, 7), range(1, self.round_cap + 1)):
+            self.probe.game = RuleProbe(round_number, num_players)
+            self.probe.card_values = dict(AIPlayerRuleBased.DEFAULT_CARD_VALUES)
+            self.probe.update_card_values_based_on_round()
+            if self.probe.card_values not in self.card_value_sets:
+                self.card_value_sets.append(dict(self.probe.card_values))
+            self.card_value_modes[(num_players, round_number)] = self.card_value_sets.index(self.probe.card_values)
+
+    def get_card_value_mode(self, card_values):
+        """Index of the card values in card_value_sets, None for values the rules never set"""
+        for mode, card_value_set in enumerate(self.card_value_sets):
+            if card_values == card_value_set:
+                return mode
+        return None
+
+    def compile_actions(self):
+        """
+        The legal actions with their scores, as (action names, base scores, target weights, ranked action names).
+        An action may score the best target of its kind: the compiler scores every target 0, 1 and 2, and
+        compiles the score as its base score plus its weight times the score of the best target. Rankings that
+        depend on a target are None and made at play time. Scores that are not of that form are compiled as None.
+        The ranking is before the rule against repeating an action.
+        """
+        self.actions = {}
+        game_state = RuleProbe().get_game_state_for_ai(self.probe)
+        for hand, mode, coin_class in itertools.product(iter_hands(), range(len(self.card_value_sets)), range(len(COIN_THRESHOLDS) + 1)):
+            self.set_hand(hand)
+            self.probe.card_values = dict(self.card_value_sets[mode])
+            self.probe.coins = ([0] + COIN_THRESHOLDS)[coin_class]
+            scores = []
+            for target_score in (0.0, 1.0, 2.0):
+                target_matrix = TargetMatrix([{"name": PROBE_OPPONENT}], {action_name: [target_score] for action_name in ACTION_RULES})
+                actions = self.probe.get_available_actions(game_state, target_matrix)
+                scores.append(self.probe.evaluate_actions(game_state, actions, target_matrix))
+            action_names = tuple(action.action_name for action in actions)
+            base_scores = tuple(scores[0][action_name] for action_name in action_names)
+            target_weights = tuple(scores[1][action_name] - scores[0][action_name] for action_name in action_names)
+            if any(scores[2][action_name] != base + 2 * weight for action_name, base, weight in zip(action_names, base_scores, target_weights)):
+                self.actions[(hand, mode, coin_class)] = None
+            elif any(target_weights):
+                self.actions[(hand, mode, coin_class)] = (action_names, base_scores, target_weights, None)
+            else:
+                ranked_actions = tuple(action.action_name for action in rank_actions(actions, scores[0], []))
+                self.actions[(hand, mode, coin_class)] = (action_names, base_scores, target_weights, ranked_actions)
+
+    def compile_challenges(self):
+        """
+        Whether to challenge a claimed card, by hand, round and whether the player has card beliefs. A decision
+        that depends on the beliefs is None: the compiler asks with beliefs of 0 and of 1 for every card.
+        """
+        self.challenges = {}
+        claimant = AIPlayerRuleBased(PROBE_OPPONENT)
+        for card_name, hand, round_number in itertools.product(CARD_NAMES, iter_hands(), range(1, self.round_cap + 1)):
+            self.set_hand(hand)
+            self.probe.game = RuleProbe(round_number)
+            self.probe.card_probabilities = None
+            self.challenges[(card_name, hand, round_number, False)] = self.probe.wants_to_challenge(ProbeClaim(card_name, claimant))
+            decisions = set()
+            for probability in (0.0, 1.0):
+                self.probe.card_probabilities = {PROBE_OPPONENT: {name: [probability, probability] for name in CARD_NAMES}}
+                decisions.add(self.probe.wants_to_challenge(ProbeClaim(card_name, claimant)))
+            self.challenges[(card_name, hand, round_number, True)] = decisions.pop() if len(decisions) == 1 else None
+        self.probe.card_probabilities = None
+
+    def compile_blocks(self):
+        """
+        Whether to block each blockable action, by hand, and the card to block with. The block card is None where
+        the player holds none of the blocking cards and picks one at random to bluff.
+        """
+        self.blocks = {}
+        self.block_cards = {}
+        for action_name, rules in ACTION_RULES.items():
+            if not rules["is_blockable"]:
+                continue
+            block_options = tuple(rules["can_block"])
+            claim = ProbeClaim(rules["required_card"], None)
+            claim.action_name = action_name
+            claim.can_block = list(block_options)
+            for hand in iter_hands():
+                self.set_hand(hand)
+                self.blocks[(action_name, hand)] = self.probe.wants_to_block(claim)
+                block_card = self.probe.get_block_choice(list(block_options))
+                self.block_cards[(block_options, hand)] = block_card if block_card in hand else None
+
+_compiled_tables = {}
+
+def get_rule_table(challenge_threshold=2):
+    """Returns the tables for the challenge_threshold, compiled once per process"""
+    if challenge_threshold not in _compiled_tables:
+        _compiled_tables[challenge_threshold] = RuleTable(challenge_threshold)
+    return _compiled_tables[challenge_threshold]
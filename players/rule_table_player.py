@@ -0,0 +1,118 @@
+"""
+AI player that plays the rules of AIPlayerRuleBased from the tables compiled by players/rule_table.py. A decision
+the tables cover is a dictionary lookup on the hand, coins, card values and round, without building the game
+state, the target matrix or the Action objects of every option.
+"""
+from actions.action import ACTION_CLASSES, get_legal_targets
+from game.rules import ACTION_RULES
+from players.ai_player import AIPlayerRuleBased, update_card_beliefs
+from players.rule_table import get_coin_class, get_hand_key, get_rule_table
+
+class AIPlayerRuleTable(AIPlayerRuleBased):
+    """
+    AIPlayerRuleTable makes the same decisions as AIPlayerRuleBased, taking them from the compiled rule tables.
+    Actions whose score depends on the best target are ranked once the targets are scored. Challenges that depend
+    on its card beliefs and actions the endgame table ranks are left to the rule methods, as are any decisions the
+    tables do not have.
+    """
+    def __init__(self, name, game=None):
+        super().__init__(name, game)
+        self.rule_table = None
+        self.belief_players = None  # When set, the only opponents whose card beliefs are brought up to date
+
+    def get_rule_table(self):
+        """The tables compiled for the player's challenge_threshold, which can be set after construction"""
+        if self.rule_table is None or self.rule_table.challenge_threshold != self.challenge_threshold:
+            self.rule_table = get_rule_table(self.challenge_threshold)
+        return self.rule_table
+
+    def get_round(self):
+        return min(self.game.current_round, self.get_rule_table().round_cap)
+
+    def update_card_values_based_on_round(self):
+        rule_table = self.get_rule_table()
+        mode = rule_table.card_value_modes.get((len(self.game.players), self.get_round()))
+        if mode is None:
+            super().update_card_values_based_on_round()
+        elif mode:
+            self.card_values = dict(rule_table.card_value_sets[mode])
+
+    def update_card_probabilities(self, action_log):
+        if self.belief_players is None:
+            return super().update_card_probabilities(action_log)
+        if not self.card_probabilities or not action_log:
+            return
+        game_state = self.game.get_game_state_for_ai(self)
+        update_card_beliefs(self.card_probabilities, self.game.public_beliefs, game_state, self.get_deck_probabilities(game_state), self.belief_players)
+
+    def in_endgame(self):
+        """Whether the endgame table ranks the actions, which it does with a single opponent left"""
+        if self.endgame_table is None:
+            return False
+        return sum(1 for player in self.game.players if player is not self and not player.is_eliminated) == 1
+
+    def get_target_matrix(self):
+        """The game state and the target matrix, with the card beliefs brought up to date first as choose_action does"""
+        game_state = self.game.get_game_state_for_ai(self)
+        self.update_card_probabilities(game_state["action_log"])
+        return game_state, self.build_target_matrix(game_state)
+
+    def choose_action(self):
+        self.update_card_values_based_on_round()
+        rule_table = self.get_rule_table()
+        entry = rule_table.actions.get((get_hand_key(self.hand), rule_table.get_card_value_mode(self.card_values), get_coin_class(self.get_coins())))
+        if entry is None or self.in_endgame():
+            return super().choose_action()
+
+        action_names, base_scores, target_weights, ranked_actions = entry
+        game_state = target_matrix = None
+        if ranked_actions is None:
+            # Some scores depend on the best target, rank as rank_actions does (a stable sort)
+            game_state, target_matrix = self.get_target_matrix()
+            scores = [base_score + target_weight * target_matrix.get_best_target(action_name)[1] if target_weight else base_score
+                      for action_name, base_score, target_weight in zip(action_names, base_scores, target_weights)]
+            ranked_actions = [action_names[index] for index in sorted(range(len(action_names)), key=lambda index: scores[index], reverse=True)]
+        # The tables are compiled with a target for every action, drop those that have no legal target now
+        ranked_actions = [action_name for action_name in ranked_actions
+                          if not ACTION_RULES[action_name]["needs_target"] or get_legal_targets(self.game, self, action_name)]
+
+        # The 2nd best action goes first when the last 3 actions were the same, as in rank_actions
+        if len(self.last_actions) >= 3 and len(set(self.last_actions[-3:])) == 1:
+            action_name = ranked_actions[1]
+        else:
+            action_name = ranked_actions[0]
+        if not ACTION_RULES[action_name]["needs_target"]:
+            action = ACTION_CLASSES[action_name](self.game, self)
+        else:
+            action = ACTION_CLASSES[action_name](self.game, self, None)
+            if target_matrix is None:
+                game_state, target_matrix = self.get_target_matrix()
+            action.target = self.get_target_player(game_state, action, target_matrix)
+            if action.target is None:
+                return super().choose_action()
+        self.last_actions.append(action_name)
+        return action
+
+    def wants_to_challenge(self, action, blocker=False):
+        card_name = action if blocker else action.required_card
+        decision = self.get_rule_table().challenges.get((card_name, get_hand_key(self.hand), self.get_round(), self.card_probabilities is not None))
+        if decision is None:
+            # The decision reads only the beliefs about the claimant, so only theirs are brought up to date
+            self.belief_players = [blocker.name if blocker else action.player.name]
+            try:
+                decision = super().wants_to_challenge(action, blocker)
+            finally:
+                self.belief_players = None
+        return decision
+
+    def wants_to_block(self, action):
+        decision = self.get_rule_table().blocks.get((action.action_name, get_hand_key(self.hand)))
+        if decision is None:
+            return super().wants_to_block(action)
+        return decision
+
+    def get_block_choice(self, block_options):
+        block_card = self.get_rule_table().block_cards.get((tuple(block_options), get_hand_key(self.hand)))
+        if block_card is None:
+            return super().get_block_choice(block_options)  # Bluffs with a random card
+        return block_card
@@ -0,0 +1,317 @@
+"""
+Offline Monte Carlo counterfactual regret minimisation (MCCFR) for the challenge and block decisions, written to
+the strategy table read by AIPlayerCFR. The abstracted game is the resolution of one action between two players:
+- chance deals both hands from the deck, the coins and card counts of both players and the action;
+- the player either claims the action or takes Income instead, so bluffing is part of the equilibrium;
+- the action then runs through the resolution machine of game/rules.py: the opponent may challenge the claim,
+  then may block, and the player may challenge the block;
+- the resolved state is scored by the solved 2-player endgame (training/endgame_solver.py) with the opponent
+  to move, so every outcome is valued in win probability for the rest of the game.
+Every iteration is one external sampling traversal for each player. Batches of iterations run in parallel
+worker processes from the same regrets, the parent adds their regrets up and keeps them non-negative (regret
+matching+), and the average strategy is weighted by batch. Progress is checkpointed after every batch.
+"""
+import argparse
+import os
+import random
+import struct
+import time
+from array import array
+
+from game.rules import (ACTION_RULES, CARD_NAMES, RESOLUTION_TABLE, START, TERMINALS, CHALLENGE_WINDOW, BLOCK_WINDOW,
+                        NOT_CHALLENGED, CHALLENGER_WINS, PLAYER_WINS, PLAYER_WINS_GAME_OVER,
+                        NOT_BLOCKED, BLOCKED, BLOCKER_WINS, BLOCKER_LOSES, BLOCKER_LOSES_TARGET_ELIMINATED)
+from game.endgame_table import state_index
+from game.policy_file import DEFAULT_POLICY_PATH, write_policy_file
+from game.strategy_table import (CLAIM, CHALLENGE, BLOCK, COUNTER_CHALLENGE, DECISION_POINTS, DEFAULT_TABLE_PATH,
+                                 MAX_CHOICES, NUM_INFO_SETS, get_choices, get_key, info_set_index, iter_info_sets,
+                                 sample_choice, write_strategy_table)
+from training.endgame_solver import EndgameSolver
+
+PLAYER = 0
+OPPONENT = 1
+CLAIMED_ACTIONS = [action_name for kind, action_name, _ in DECISION_POINTS if kind == CLAIM]
+MAX_PLAYER_COINS = 9  # A player with 10 or more has to coup
+MAX_OPPONENT_COINS = 12
+
+CHECKPOINT_MAGIC = b"CPCF"
+CHECKPOINT_HEADER = struct.Struct("<4sIQQ")  # magic, information sets, batches, iterations
+
+class ResolutionState:
+    """One deal of the abstracted game: the action, both hands, both players' coins and the rest of the deck"""
+    def __init__(self, action_name, hands, coins, deck):
+        self.action_name = action_name
+        self.hands = hands
+        self.coins = coins
+        self.deck = deck
+        self.blocker_claim = None
+
+    def copy(self):
+        state = ResolutionState(self.action_name, [list(hand) for hand in self.hands], list(self.coins), list(self.deck))
+        state.blocker_claim = self.blocker_claim
+        return state
+
+def deal(rng):
+    """Chance: draws a legal action, both hands, the coins and the deck"""
+    deck = [card_name for card_name in CARD_NAMES for _ in range(3)]
+    rng.shuffle(deck)
+    hands = [[deck.pop() for _ in range(rng.randint(1, 2))] for _ in (PLAYER, OPPONENT)]
+    coins = [rng.randint(0, MAX_PLAYER_COINS), rng.randint(0, MAX_OPPONENT_COINS)]
+    action_names = [action_name for action_name in CLAIMED_ACTIONS
+                    if coins[PLAYER] >= ACTION_RULES[action_name]["coins_needed"]
+                    and not (ACTION_RULES[action_name]["steal"] and coins[OPPONENT] == 0)]
+    return ResolutionState(rng.choice(action_names), hands, coins, deck)
+
+class ResolutionSolver:
+    def __init__(self, state_values, regrets, rng=None):
+        """
+        state_values are the solved endgame values, indexed by state_index. The strategies are read from regrets,
+        and the regrets and strategy sums of the iterations are gathered in regret_updates and strategy_updates.
+        """
+        self.state_values = state_values
+        self.regrets = regrets
+        self.rng = rng if rng is not None else random.Random()
+        self.regret_updates = array("d", bytes(8 * len(regrets)))
+        self.strategy_updates = array("d", bytes(8 * len(regrets)))
+
+    def get_value(self, state):
+        """Win probability of the player once the action has resolved and the opponent is to move"""
+        player_cards, opponent_cards = len(state.hands[PLAYER]), len(state.hands[OPPONENT])
+        if not opponent_cards:
+            return 1.0
+        if not player_cards:
+            return 0.0
+        return 1.0 - self.state_values[state_index(state.coins[OPPONENT], state.coins[PLAYER], min(opponent_cards, 2), min(player_cards, 2))]
+
+    def get_strategy(self, index, num_choices):
+        """Regret matching on the regrets of an information set"""
+        start = index * MAX_CHOICES
+        positive_regrets = [max(regret, 0.0) for regret in self.regrets[start:start + num_choices]]
+        total = sum(positive_regrets)
+        if total > 0:
+            return [regret / total for regret in positive_regrets]
+        return [1.0 / num_choices] * num_choices
+
+    def lose_influence(self, state, seat, keep_cards=()):
+        """The seat loses a card, keeping the cards in keep_cards when it can"""
+        hand = state.hands[seat]
+        if hand:
+            others = [index for index, card_name in enumerate(hand) if card_name not in keep_cards]
+            hand.pop(self.rng.choice(others) if others else self.rng.randrange(len(hand)))
+
+    def swap_card(self, state, seat, card_name):
+        """Chance: a shown card goes back to the deck, which is shuffled, and a replacement is drawn"""
+        state.hands[seat].remove(card_name)
+        state.deck.append(card_name)
+        state.hands[seat].append(state.deck.pop(self.rng.randrange(len(state.deck))))
+
+    def resolve(self, state, seat, choice, window):
+        """Applies the choice taken in a window to the state and returns the outcome of the window"""
+        rules = ACTION_RULES[state.action_name]
+        if window == CHALLENGE_WINDOW:
+            if not choice:
+                return NOT_CHALLENGED
+            if rules["required_card"] in state.hands[PLAYER]:
+                self.swap_card(state, PLAYER, rules["required_card"])
+                self.lose_influence(state, OPPONENT, rules["can_block"])
+                return PLAYER_WINS_GAME_OVER if not state.hands[OPPONENT] else PLAYER_WINS
+            self.lose_influence(state, PLAYER)
+            return CHALLENGER_WINS
+        if window == BLOCK_WINDOW:
+            state.blocker_claim = choice
+            return BLOCKED if choice else NOT_BLOCKED
+        if not choice:
+            return NOT_CHALLENGED
+        if state.blocker_claim in state.hands[OPPONENT]:
+            self.swap_card(state, OPPONENT, state.blocker_claim)
+            self.lose_influence(state, PLAYER)
+            return BLOCKER_WINS
+        self.lose_influence(state, OPPONENT)
+        return BLOCKER_LOSES_TARGET_ELIMINATED if rules["needs_target"] and not state.hands[OPPONENT] else BLOCKER_LOSES
+
+    def finish(self, state, terminal):
+        """Performs the action if the resolution lets it go ahead and values the result"""
+        rules = ACTION_RULES[state.action_name]
+        if terminal["perform"]:
+            if rules["kills"]:
+                self.lose_influence(state, OPPONENT)
+            stolen_coins = min(rules["steal"], state.coins[OPPONENT])
+            state.coins[OPPONENT] -= stolen_coins
+            state.coins[PLAYER] += rules["gain"] - rules["cost"] + stolen_coins
+        return self.get_value(state)
+
+    def traverse(self, state, position, traverser):
+        """
+        External sampling: every choice of the traverser is explored, the opponent's choices and chance are
+        sampled. Returns the player's expected value from this position.
+        """
+        if position in TERMINALS:
+            return self.finish(state, TERMINALS[position])
+
+        action_name = state.action_name
+        rules = ACTION_RULES[action_name]
+        if position == START:
+            seat, kind, card_name = PLAYER, CLAIM, rules["required_card"]
+        elif position == CHALLENGE_WINDOW:
+            seat, kind, card_name = OPPONENT, CHALLENGE, rules["required_card"]
+        elif position == BLOCK_WINDOW:
+            seat, kind, card_name = OPPONENT, BLOCK, ""
+        else:
+            seat, kind, card_name = PLAYER, COUNTER_CHALLENGE, state.blocker_claim
+        other = OPPONENT if seat == PLAYER else PLAYER
+        index = info_set_index(kind, action_name, card_name, state.hands[seat], state.coins[seat], state.coins[other], len(state.hands[other]))
+        choices = get_choices(kind, action_name)
+        strategy = self.get_strategy(index, len(choices))
+
+        if seat != traverser:
+            start = index * MAX_CHOICES
+            for choice_index, probability in enumerate(strategy):
+                self.strategy_updates[start + choice_index] += probability
+            choice_index = sample_choice(strategy, self.rng)
+            return self.play_choice(state, position, seat, choices[choice_index], traverser)
+
+        values = [self.play_choice(state.copy(), position, seat, choice, traverser) for choice in choices]
+        node_value = sum(probability * value for probability, value in zip(strategy, values))
+        sign = 1.0 if seat == PLAYER else -1.0  # Values are the player's, the opponent wants them low
+        start = index * MAX_CHOICES
+        for choice_index, value in enumerate(values):
+            self.regret_updates[start + choice_index] += sign * (value - node_value)
+        return node_value
+
+    def play_choice(self, state, position, seat, choice, traverser):
+        if position == START:
+            if not choice:
+                state.coins[PLAYER] += ACTION_RULES["Income"]["gain"]
+                return self.get_value(state)
+            return self.traverse(state, RESOLUTION_TABLE[state.action_name][START], traverser)
+        outcome = self.resolve(state, seat, choice, position)
+        return self.traverse(state, RESOLUTION_TABLE[state.action_name][(position, outcome)], traverser)
+
+    def run(self, iterations):
+        """Runs the iterations, one traversal for each player on every deal"""
+        for _ in range(iterations):
+            state = deal(self.rng)
+            for traverser in (PLAYER, OPPONENT):
+                self.traverse(state.copy(), START, traverser)
+
+_worker_state_values = None
+
+def init_worker(state_values):
+    global _worker_state_values
+    _worker_state_values = state_values
+
+def run_batch(task):
+    """Runs a worker's share of a batch from the shared regrets. Returns its regret and strategy updates"""
+    regrets, iterations, seed = task
+    solver = ResolutionSolver(_worker_state_values, regrets, random.Random(seed))
+    solver.run(iterations)
+    return solver.regret_updates, solver.strategy_updates
+
+def write_checkpoint(path, regrets, strategy_sums, batches, iterations):
+    """Writes the checkpoint atomically so an interrupted run never leaves a broken one behind"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as checkpoint_file:
+        checkpoint_file.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, NUM_INFO_SETS, batches, iterations))
+        regrets.tofile(checkpoint_file)
+        strategy_sums.tofile(checkpoint_file)
+    os.replace(temp_path, path)
+
+def read_checkpoint(path):
+    """Returns the regrets, strategy sums, batches and iterations of a checkpoint, or None if it does not match"""
+    with open(path, "rb") as checkpoint_file:
+        magic, num_info_sets, batches, iterations = CHECKPOINT_HEADER.unpack(checkpoint_file.read(CHECKPOINT_HEADER.size))
+        if magic != CHECKPOINT_MAGIC or num_info_sets != NUM_INFO_SETS:
+            return None
+        regrets, strategy_sums = array("d"), array("d")
+        regrets.fromfile(checkpoint_file, NUM_INFO_SETS * MAX_CHOICES)
+        strategy_sums.fromfile(checkpoint_file, NUM_INFO_SETS * MAX_CHOICES)
+    return regrets, strategy_sums, batches, iterations
+
+def get_average_strategies(strategy_sums):
+    """Normalises the strategy sums of every information set, leaving the ones never reached at 0"""
+    strategies = array("d", bytes(8 * len(strategy_sums)))
+    for start in range(0, len(strategy_sums), MAX_CHOICES):
+        total = sum(strategy_sums[start:start + MAX_CHOICES])
+        if total > 0:
+            for index in range(start, start + MAX_CHOICES):
+                strategies[index] = strategy_sums[index] / total
+    return strategies
+
+def get_policies(strategies):
+    """The average strategies of the information sets that were reached, keyed for a policy file"""
+    policies = {}
+    for index, info_set in enumerate(iter_info_sets()):
+        strategy = strategies[index * MAX_CHOICES:(index + 1) * MAX_CHOICES]
+        if any(strategy):
+            policies[get_key(info_set)] = list(strategy)
+    return policies
+
+def train(batches=50, iterations_per_batch=20000, workers=None, output=DEFAULT_TABLE_PATH,
+          checkpoint_path=os.path.join("training_runs", "cfr_checkpoint.bin"), draw_chance=0.01, seed=0,
+          policy_output=DEFAULT_POLICY_PATH):
+    """
+    Runs MCCFR, resuming from the checkpoint if there is one, and writes the average strategy to the table
+    and to the policy file after every batch.
+    """
+    folder = os.path.dirname(checkpoint_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    checkpoint = read_checkpoint(checkpoint_path) if os.path.exists(checkpoint_path) else None
+    if checkpoint:
+        regrets, strategy_sums, batch, total_iterations = checkpoint
+        print(f"Resuming from batch {batch}.")
+    else:
+        regrets = array("d", bytes(8 * NUM_INFO_SETS * MAX_CHOICES))
+        strategy_sums = array("d", bytes(8 * NUM_INFO_SETS * MAX_CHOICES))
+        batch, total_iterations = 0, 0
+
+    endgame_solver = EndgameSolver(draw_chance)
+    endgame_solver.solve()
+    workers = workers or os.cpu_count()
+    shares = [iterations_per_batch // workers + (worker < iterations_per_batch % workers) for worker in range(workers)]
+
+    from multiprocessing import Pool  # Only the parent process needs the pool, spawned workers skip this import
+    with Pool(workers, initializer=init_worker, initargs=(endgame_solver.state_values,)) as pool:
+        while batch < batches:
+            start_time = time.time()
+            tasks = [(regrets, share, f"{seed}-{batch}-{worker}") for worker, share in enumerate(shares) if share]
+            results = pool.map(run_batch, tasks)
+            batch += 1
+            total_iterations += iterations_per_batch
+            for regret_updates, strategy_updates in results:
+                for index, update in enumerate(regret_updates):
+                    if update:
+                        regrets[index] += update
+                for index, update in enumerate(strategy_updates):
+                    if update:
+                        strategy_sums[index] += batch * update  # Later batches, played from better regrets, weigh more
+            for index, regret in enumerate(regrets):
+                if regret < 0:
+                    regrets[index] = 0.0
+            elapsed = time.time() - start_time
+
+            write_checkpoint(checkpoint_path, regrets, strategy_sums, batch, total_iterations)
+            strategies = get_average_strategies(strategy_sums)
+            write_strategy_table(output, strategies)
+            write_policy_file(policy_output, get_policies(strategies), MAX_CHOICES)
+            mean_regret = sum(regrets) / total_iterations
+            print(f"Batch {batch}/{batches}: {total_iterations} iterations, mean positive regret {mean_regret:.5f}, "
+                  f"{iterations_per_batch / elapsed:.0f} iterations/s")
+
+    print(f"Strategy table saved to {output}, policy file saved to {policy_output}.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the challenge and block decisions with MCCFR and write the strategy table used by AIPlayerCFR.")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20000, help="Iterations per batch, shared between the workers")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to every core")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--checkpoint", default=os.path.join("training_runs", "cfr_checkpoint.bin"))
+    parser.add_argument("--policy-output", default=DEFAULT_POLICY_PATH, help="The same strategies as a hashed policy file")
+    parser.add_argument("--draw-chance", type=float, default=0.01, help="Chance after every turn that the game ends in a draw")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    train(args.batches, args.iterations, args.workers, args.output, args.checkpoint, args.draw_chance, args.seed, args.policy_output)
+
+if __name__ == "__main__":
+    main()
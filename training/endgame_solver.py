@@ -0,0 +1,130 @@
+"""
+Offline solver for 2-player endgames. A public state is the coins and the number of cards of both players, which
+is small enough to solve completely by retrograde analysis: layers with fewer cards left are solved first, and the
+states inside a layer, which can reach each other through coins changing hands, are solved by value iteration.
+
+The solved game is an approximation of the real one:
+- challenges are not modelled, so any action can be claimed;
+- a block is assumed to be honest, so it happens with the probability that the blocker's hidden cards include a
+  blocking character, given only how many cards they hold;
+- the round limit is modelled as a small chance after every turn that the game ends in a draw, worth 0.5.
+"""
+import argparse
+import time
+from math import comb
+
+from game.endgame_table import ACTION_NAMES, DEFAULT_TABLE_PATH, MAX_COINS, NUM_STATES, state_index, write_endgame_table
+from game.rules import ACTION_RULES, FORCED_COUP_COINS
+
+COPIES_PER_CARD = 3
+DECK_SIZE = 15
+
+def get_block_probability(can_block, num_cards):
+    """Chance that a random hand of num_cards holds at least one of the blocking characters"""
+    if not can_block:
+        return 0.0
+    other_cards = DECK_SIZE - COPIES_PER_CARD * len(can_block)
+    return 1 - comb(other_cards, num_cards) / comb(DECK_SIZE, num_cards)
+
+def get_outcomes(action_name, my_coins, opponent_coins, opponent_cards):
+    """
+    Returns the (probability, my coins, opponent coins, opponent cards) outcomes of the action,
+    or None if the action cannot be taken.
+    """
+    rules = ACTION_RULES[action_name]
+    if my_coins < rules["coins_needed"] or (rules["steal"] and opponent_coins == 0):
+        return None
+    blocked = get_block_probability(rules["can_block"], opponent_cards) if rules["is_blockable"] else 0.0
+    stolen_coins = min(rules["steal"], opponent_coins)
+    performed = (1 - blocked,
+                 my_coins + rules["gain"] - rules["cost"] + stolen_coins,
+                 opponent_coins - stolen_coins,
+                 opponent_cards - 1 if rules["kills"] else opponent_cards)
+    if blocked:
+        # A blocked action changes nothing, Assassinate is only paid for when it goes ahead
+        return [performed, (blocked, my_coins, opponent_coins, opponent_cards)]
+    return [performed]
+
+class EndgameSolver:
+    def __init__(self, draw_chance=0.01, tolerance=1e-10):
+        self.draw_chance = draw_chance
+        self.tolerance = tolerance
+        self.state_values = [0.5] * NUM_STATES
+        self.action_values = [{} for _ in range(NUM_STATES)]
+
+    def get_turn_value(self, my_coins, opponent_coins, my_cards, opponent_cards):
+        """Value of starting a turn in the state, including the forced coup"""
+        if my_coins >= FORCED_COUP_COINS:
+            if opponent_cards == 1:
+                return 1.0
+            return self.get_best_value(my_coins - ACTION_RULES["Coup"]["cost"], opponent_coins, my_cards, opponent_cards - 1)
+        return self.get_best_value(my_coins, opponent_coins, my_cards, opponent_cards)
+
+    def get_best_value(self, my_coins, opponent_coins, my_cards, opponent_cards):
+        action_values = self.action_values[state_index(my_coins, opponent_coins, my_cards, opponent_cards)]
+        return max(action_values.values())
+
+    def evaluate_action(self, action_name, my_coins, opponent_coins, my_cards, opponent_cards):
+        """Expected win probability of the action, or None if it cannot be taken"""
+        outcomes = get_outcomes(action_name, my_coins, opponent_coins, opponent_cards)
+        if outcomes is None:
+            return None
+        value = 0.0
+        for probability, new_coins, new_opponent_coins, new_opponent_cards in outcomes:
+            if new_opponent_cards == 0:
+                value += probability
+            else:
+                opponent_value = self.state_values[state_index(new_opponent_coins, new_coins, new_opponent_cards, my_cards)]
+                value += probability * (self.draw_chance * 0.5 + (1 - self.draw_chance) * (1 - opponent_value))
+        return value
+
+    def solve_layer(self, states):
+        """Value iteration over the states of one layer, until no value moves by more than the tolerance"""
+        iterations = 0
+        while True:
+            iterations += 1
+            largest_change = 0.0
+            for my_coins, opponent_coins, my_cards, opponent_cards in states:
+                index = state_index(my_coins, opponent_coins, my_cards, opponent_cards)
+                action_values = {}
+                for action_name in ACTION_NAMES:
+                    value = self.evaluate_action(action_name, my_coins, opponent_coins, my_cards, opponent_cards)
+                    if value is not None:
+                        action_values[action_name] = value
+                self.action_values[index] = action_values
+            for my_coins, opponent_coins, my_cards, opponent_cards in states:
+                index = state_index(my_coins, opponent_coins, my_cards, opponent_cards)
+                value = self.get_turn_value(my_coins, opponent_coins, my_cards, opponent_cards)
+                largest_change = max(largest_change, abs(value - self.state_values[index]))
+                self.state_values[index] = value
+            if largest_change < self.tolerance:
+                return iterations
+
+    def solve(self):
+        """Solves every layer, fewest cards first. Returns the number of sweeps each layer needed"""
+        sweeps = {}
+        for total_cards in (2, 3, 4):
+            layer = [(my_cards, total_cards - my_cards) for my_cards in (1, 2) if 1 <= total_cards - my_cards <= 2]
+            states = [(my_coins, opponent_coins, my_cards, opponent_cards)
+                      for my_cards, opponent_cards in layer
+                      for my_coins in range(MAX_COINS + 1)
+                      for opponent_coins in range(MAX_COINS + 1)]
+            sweeps[total_cards] = self.solve_layer(states)
+        return sweeps
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve 2-player endgames and write the lookup table used by the AI players.")
+    parser.add_argument("--output", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--draw-chance", type=float, default=0.01, help="Chance after every turn that the game ends in a draw")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    solver = EndgameSolver(args.draw_chance)
+    sweeps = solver.solve()
+    write_endgame_table(args.output, solver.state_values, solver.action_values)
+    print(f"Solved {NUM_STATES} states in {time.time() - start_time:.1f}s "
+          f"(sweeps per layer: {', '.join(f'{cards} cards: {count}' for cards, count in sweeps.items())}).")
+    print(f"Endgame table saved to {args.output}.")
+
+if __name__ == "__main__":
+    main()
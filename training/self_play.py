@@ -0,0 +1,186 @@
+"""
+Self-play training for AIPlayerMonte. Uses the cross-entropy method to tune the action weights, card values
+and thresholds, evaluating every candidate in parallel headless games that share the same random seeds.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import time
+
+from cards.deck import Deck
+from game.game import Game
+from game.rules import CARD_NAMES
+from players.ai_player import AIPlayerMonte
+
+ACTION_NAMES = ["Income", "Foreign Aid", "Coup", "Tax", "Assassinate", "Steal", "Exchange"]
+# bluff_threshold is not used by any AIPlayerMonte decision yet, so it is kept in the profile but not searched
+THRESHOLD_NAMES = ["challenge_threshold", "block_threshold"]
+
+def get_parameter_names():
+    """Returns the names of the searched parameters in the order they appear in a vector"""
+    names = [("action_weights", name) for name in ACTION_NAMES]
+    names += [("card_values", name) for name in CARD_NAMES]
+    names += [(name, None) for name in THRESHOLD_NAMES]
+    return names
+
+def profile_to_vector(profile):
+    """Flattens a profile into a list of floats"""
+    vector = []
+    for group, name in get_parameter_names():
+        vector.append(float(profile[group][name] if name else profile[group]))
+    return vector
+
+def vector_to_profile(vector):
+    """Builds a profile from a vector. Thresholds are kept between 0 and 1 and weights are kept positive"""
+    profile = AIPlayerMonte("Profile").get_profile()
+    for value, (group, name) in zip(vector, get_parameter_names()):
+        if name:
+            profile[group][name] = max(value, 0.0)
+        else:
+            profile[group] = min(max(value, 0.0), 1.0)
+    return profile
+
+def load_profile(path):
+    """Loads a profile written by the trainer, ready for AIPlayerMonte.apply_profile"""
+    with open(path) as profile_file:
+        return json.load(profile_file)
+
+def write_json(path, data):
+    """Writes the file atomically so an interrupted run never leaves a broken checkpoint behind"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as output_file:
+        json.dump(data, output_file, indent=2)
+    os.replace(temp_path, path)
+
+def play_headless_game(profiles, seed, max_rounds=100):
+    """
+    Plays one game between AIPlayerMonte seats using the given profiles, without any console output.
+    The same seed always deals the same cards. Returns the winning seat, or None if there was no single winner.
+    """
+    random.seed(seed)
+    game = Game(Deck(random.Random(seed)), log_window=50)  # Only the summaries of older entries are needed
+    game.max_rounds = max_rounds
+    for seat, profile in enumerate(profiles):
+        player = AIPlayerMonte(f"Seat {seat + 1}")
+        player.apply_profile(profile)
+        game.players.append(player)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        game.setup()
+        game.setup_ai_players()
+        game.play_game()
+
+    remaining_players = game.players_remaining()
+    if len(remaining_players) == 1:
+        return game.players.index(remaining_players[0])
+    return None
+
+def evaluate_candidate(task):
+    """
+    Plays the candidate against the incumbent on every seed, rotating the candidate's seat.
+    Returns the candidate's win rate.
+    """
+    vector, incumbent_profile, seeds, num_players = task
+    candidate_profile = vector_to_profile(vector)
+    wins = 0
+    for game_index, seed in enumerate(seeds):
+        candidate_seat = game_index % num_players
+        profiles = [incumbent_profile] * num_players
+        profiles[candidate_seat] = candidate_profile
+        if play_headless_game(profiles, seed) == candidate_seat:
+            wins += 1
+    return wins / len(seeds)
+
+def initial_state(seed):
+    """Starts the search around the hand-picked AIPlayerMonte constants"""
+    mean = profile_to_vector(AIPlayerMonte("Default").get_profile())
+    std = [max(abs(value) * 0.5, 0.1) for value in mean]
+    return {"generation": 0, "mean": mean, "std": std, "seed": seed, "history": []}
+
+def train(generations=20, population=16, games_per_candidate=40, num_players=2, elite_fraction=0.25,
+          workers=None, output_folder="training_runs", seed=0):
+    """
+    Runs the cross-entropy method, resuming from the checkpoint in output_folder if there is one.
+    Each generation samples a population of parameter vectors around the current mean and scores them
+    against the current mean in self-play. All candidates in a generation share the same game seeds,
+    so differences in fitness come from the parameters rather than the deal.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+    checkpoint_path = os.path.join(output_folder, "checkpoint.json")
+    profile_path = os.path.join(output_folder, "monte_profile.json")
+    history_path = os.path.join(output_folder, "convergence.csv")
+
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as checkpoint_file:
+            state = json.load(checkpoint_file)
+        print(f"Resuming from generation {state['generation']}.")
+    else:
+        state = initial_state(seed)
+
+    num_elites = max(1, int(population * elite_fraction))
+    workers = workers or os.cpu_count()
+
+    from multiprocessing import Pool  # Only the parent process needs the pool, spawned workers skip this import
+    with Pool(workers) as pool:
+        while state["generation"] < generations:
+            generation = state["generation"]
+            rng = random.Random(f"{state['seed']}-{generation}")
+            seeds = [rng.randrange(2 ** 31) for _ in range(games_per_candidate)]
+            candidates = [[rng.gauss(mean, std) for mean, std in zip(state["mean"], state["std"])] for _ in range(population)]
+            incumbent_profile = vector_to_profile(state["mean"])
+
+            start_time = time.time()
+            fitnesses = pool.map(evaluate_candidate, [(candidate, incumbent_profile, seeds, num_players) for candidate in candidates])
+            elapsed = time.time() - start_time
+            games_per_second = population * games_per_candidate / elapsed if elapsed > 0 else 0.0
+
+            ranked = sorted(zip(fitnesses, candidates), key=lambda result: result[0], reverse=True)
+            elites = [candidate for _, candidate in ranked[:num_elites]]
+            dimensions = range(len(state["mean"]))
+            state["mean"] = [sum(elite[i] for elite in elites) / num_elites for i in dimensions]
+            # Keep a small floor on the spread so the search does not collapse early
+            state["std"] = [max((sum((elite[i] - state["mean"][i]) ** 2 for elite in elites) / num_elites) ** 0.5,
+                                0.02 * max(abs(state["mean"][i]), 1.0)) for i in dimensions]
+            state["generation"] = generation + 1
+            state["history"].append({
+                "generation": generation + 1,
+                "best_fitness": ranked[0][0],
+                "elite_fitness": sum(fitness for fitness, _ in ranked[:num_elites]) / num_elites,
+                "mean_fitness": sum(fitnesses) / population,
+                "mean_std": sum(state["std"]) / len(state["std"]),
+                "games": population * games_per_candidate,
+                "games_per_second": games_per_second
+            })
+            write_json(checkpoint_path, state)
+            write_json(profile_path, vector_to_profile(state["mean"]))
+
+            print(f"Generation {generation + 1}/{generations}: best win rate {ranked[0][0]:.2f}, "
+                  f"elite win rate {state['history'][-1]['elite_fitness']:.2f}, {games_per_second:.1f} games/s")
+
+    with open(history_path, "w", newline="") as history_file:
+        writer = csv.DictWriter(history_file, fieldnames=list(state["history"][0].keys()) if state["history"] else ["generation"])
+        writer.writeheader()
+        writer.writerows(state["history"])
+
+    print(f"Best profile saved to {profile_path}, convergence curve saved to {history_path}.")
+    return vector_to_profile(state["mean"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune AIPlayerMonte parameters through self-play.")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--games", type=int, default=40, help="Games played by each candidate per generation")
+    parser.add_argument("--players", type=int, default=2, choices=[2, 3, 4])
+    parser.add_argument("--elite-fraction", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to every core")
+    parser.add_argument("--output", default="training_runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    train(args.generations, args.population, args.games, args.players, args.elite_fraction, args.workers, args.output, args.seed)
+
+if __name__ == "__main__":
+    main()